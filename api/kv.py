@@ -1,8 +1,8 @@
 import json
 import os
-from typing import Any, Dict, Optional
+from typing import Any, Dict, List, Optional, Tuple
 
-import requests
+from app.httpclient import get_session
 
 
 def _kv_config() -> Optional[Dict[str, str]]:
@@ -32,7 +32,7 @@ def kv_get_json(key: str) -> Optional[Any]:
         return None
     # Upstash/Vercel KV REST GET
     url = f"{cfg['url']}/get/{key}"
-    r = requests.get(url, headers={"Authorization": f"Bearer {cfg['token']}"}, timeout=10)
+    r = get_session().get(url, headers={"Authorization": f"Bearer {cfg['token']}"}, timeout=10)
     if r.status_code == 404:
         return None
     r.raise_for_status()
@@ -56,7 +56,7 @@ def kv_set_json(key: str, value: Any, ttl_seconds: Optional[int] = None) -> None
     if ttl_seconds and ttl_seconds > 0:
         body["ex"] = ttl_seconds
     url = f"{cfg['url']}/set/{key}"
-    r = requests.post(
+    r = get_session().post(
         url,
         headers={"Authorization": f"Bearer {cfg['token']}", "Content-Type": "application/json"},
         data=json.dumps(body),
@@ -64,3 +64,135 @@ def kv_set_json(key: str, value: Any, ttl_seconds: Optional[int] = None) -> None
     )
     r.raise_for_status()
 
+
+class KVError(Exception):
+    pass
+
+
+def kv_pipeline(commands: List[List[Any]], transaction: bool = False) -> List[Any]:
+    """Run several commands in one REST round trip; results in command order.
+
+    transaction=True sends them as MULTI/EXEC so they apply atomically.
+    """
+    cfg = _kv_config()
+    if not cfg or not commands:
+        return []
+    url = f"{cfg['url']}/{'multi-exec' if transaction else 'pipeline'}"
+    r = get_session().post(
+        url,
+        headers={"Authorization": f"Bearer {cfg['token']}", "Content-Type": "application/json"},
+        data=json.dumps([[str(a) for a in cmd] for cmd in commands]),
+        timeout=10,
+    )
+    r.raise_for_status()
+    data = r.json()
+    if isinstance(data, dict) and data.get("error"):
+        raise KVError(str(data["error"]))
+    out = []
+    for cmd, rep in zip(commands, data):
+        if rep.get("error"):
+            raise KVError(f"{cmd[0]} failed: {rep['error']}")
+        out.append(rep.get("result"))
+    return out
+
+
+# History as a Redis list (newest first) plus a set of its tx hashes. New items
+# are pushed only if SADD says the tx is unseen, and whatever LTRIM drops also
+# leaves the set, so overlapping runs never duplicate or lose entries. On the
+# first run it folds in the history and run count of the legacy single-blob state key.
+# The block cursor only ever moves forward, whatever order runs finish in.
+# KEYS: history list, seen set, meta hash, legacy key.
+# ARGV: cap, cursor ("" to leave it), then tx/json pairs (oldest first).
+_RECORD_SCRIPT = """
+local cap = tonumber(ARGV[1])
+local function push(tx, item)
+  if redis.call('SADD', KEYS[2], tx) == 1 then
+    redis.call('LPUSH', KEYS[1], item)
+    return 1
+  end
+  return 0
+end
+if redis.call('EXISTS', KEYS[3]) == 0 then
+  local legacy = redis.call('GET', KEYS[4])
+  if legacy then
+    local prev = cjson.decode(legacy)
+    redis.call('HSET', KEYS[3], 'runs', tonumber(prev['runs']) or 0)
+    local hist = prev['history']
+    if type(hist) ~= 'table' then hist = {} end
+    for i = #hist, 1, -1 do
+      if hist[i]['tx'] then push(hist[i]['tx'], cjson.encode(hist[i])) end
+    end
+  end
+end
+local cursor = tonumber(ARGV[2])
+if cursor and cursor > (tonumber(redis.call('HGET', KEYS[3], 'cursor_block')) or -1) then
+  redis.call('HSET', KEYS[3], 'cursor_block', cursor)
+end
+local added = 0
+for i = 3, #ARGV, 2 do
+  added = added + push(ARGV[i], ARGV[i + 1])
+end
+for _, item in ipairs(redis.call('LRANGE', KEYS[1], cap, -1)) do
+  redis.call('SREM', KEYS[2], cjson.decode(item)['tx'])
+end
+redis.call('LTRIM', KEYS[1], 0, cap - 1)
+return added
+"""
+
+
+def _keys(prefix: str) -> Tuple[str, str, str, str]:
+    return f"{prefix}:history", f"{prefix}:seen", f"{prefix}:meta", f"{prefix}:state"
+
+
+def kv_record_scan(
+    items: List[Dict[str, Any]],
+    meta: Dict[str, Any],
+    cap: int,
+    cursor: Optional[int] = None,
+    prefix: str = "scanner",
+) -> Tuple[int, int]:
+    """Apply one scan's deltas atomically in a single round trip.
+
+    items: new results, newest first. meta: scalar fields to overwrite
+    (latest, last_run_utc, ...). cursor: highest fully-scanned block.
+    Returns (history entries added, total runs).
+    """
+    history_key, seen_key, meta_key, legacy_key = _keys(prefix)
+    argv: List[Any] = [int(cap), "" if cursor is None else int(cursor)]
+    for item in reversed(items):
+        if item and item.get("tx"):
+            argv += [item["tx"], json.dumps(item)]
+    fields: List[Any] = []
+    for k, v in meta.items():
+        fields += [k, json.dumps(v)]
+    commands: List[List[Any]] = [["EVAL", _RECORD_SCRIPT, 4, history_key, seen_key, meta_key, legacy_key] + argv]
+    if fields:
+        commands.append(["HSET", meta_key] + fields)
+    commands.append(["HINCRBY", meta_key, "runs", 1])
+    results = kv_pipeline(commands, transaction=True)
+    return int(results[0] or 0), int(results[-1] or 0)
+
+
+def kv_get_cursor(prefix: str = "scanner") -> Optional[int]:
+    cfg = _kv_config()
+    if not cfg:
+        return None
+    value = kv_pipeline([["HGET", _keys(prefix)[2], "cursor_block"]])[0]
+    return int(value) if value is not None else None
+
+
+def kv_load_state(cap: int, prefix: str = "scanner") -> Optional[Dict[str, Any]]:
+    """Meta fields plus history (newest first) in one round trip; None if never written."""
+    history_key, _, meta_key, legacy_key = _keys(prefix)
+    raw_meta, raw_hist = kv_pipeline([["HGETALL", meta_key], ["LRANGE", history_key, 0, int(cap) - 1]])
+    if not raw_meta:
+        # Not migrated yet: fall back to the legacy single-blob state
+        return kv_get_json(legacy_key)
+    state: Dict[str, Any] = {}
+    for k, v in zip(raw_meta[::2], raw_meta[1::2]):
+        try:
+            state[k] = json.loads(v)
+        except ValueError:
+            state[k] = v
+    state["history"] = [json.loads(item) for item in raw_hist or []]
+    return state
@@ -1,42 +1,65 @@
 """
 Vercel serverless endpoint: returns latest scanner state.
 
-If KV is configured, reads persisted state. Otherwise, does a quick on-demand scan.
+If KV is configured, reads persisted state. Otherwise scans on demand, warm-
+started from the cursor and history a previous request left in /tmp, so only
+a cold container pays for the MAX_PAGES_ON_DEMAND-page sweep.
 """
 
 import os
 import time
-from typing import Any, Dict
 
 from flask import jsonify
 
-from app.scan import scan_latest_created_contract
-from api.kv import kv_available, kv_get_json
+from app.history import History
+from app.trace_cache import default_cache
+from app.warm import load_local, save_local, scan_step, trace_cache_path
+from api.kv import kv_available, kv_load_state
+
+# Before the first scan, so the cache is opened on its /tmp file
+default_cache(trace_cache_path())
 
 
 def handler(request):
+    history_max = int(os.environ.get("HISTORY_MAX", "50"))
     if kv_available():
-        state = kv_get_json("scanner:state") or {}
+        state = kv_load_state(history_max) or {}
         return jsonify(state)
 
-    # Fallback: run a quick scan (reduced pages) to return something without KV
-    latest = scan_latest_created_contract(
-        api_key=os.environ.get("ETHERSCAN_API_KEY"),
+    # Fallback: incremental scan from the /tmp cursor (reduced pages when cold)
+    local = load_local()
+    found, cursor = scan_step(
+        local.get("cursor_block"),
+        api_key=os.environ.get("ETHERSCAN_API_KEYS") or os.environ.get("ETHERSCAN_API_KEY"),
         deployer=os.environ.get("DEPLOYER"),
         chain_id=int(os.environ.get("CHAIN_ID", "8453")),
         max_pages=int(os.environ.get("MAX_PAGES_ON_DEMAND", "3")),
     )
+    hist = History(history_max)
+    hist.replace(local.get("history") or [])
+    hist.add(found)
     now_utc = time.strftime("%Y-%m-%d %H:%M:%S", time.gmtime())
+    local.update(
+        {
+            "cursor_block": cursor,
+            "latest": found[0] if found else local.get("latest"),
+            "history": hist.to_dicts(),
+            "runs": int(local.get("runs", 0)) + 1,
+            "last_run_utc": now_utc,
+        }
+    )
+    save_local(local)
     return jsonify(
         {
-            "latest": latest,
+            "latest": local["latest"],
             "last_run_utc": now_utc,
             "last_error": None,
-            "runs": 1,
-            "history": [latest] if latest else [],
+            "runs": local["runs"],
+            "history": local["history"],
+            "cursor_block": cursor,
             "chain_id": int(os.environ.get("CHAIN_ID", "8453")),
             "deployer": os.environ.get("DEPLOYER") or "0x048ef1062cbb39B338Ac2685dA72adf104b4cEF5",
-            "history_max": int(os.environ.get("HISTORY_MAX", "50")),
+            "history_max": history_max,
             "interval_seconds": int(os.environ.get("SCAN_INTERVAL_SECONDS", "10")),
             "kv": False,
         }
@@ -1,75 +1,120 @@
 """
 Vercel serverless endpoint: triggers one scan and stores results in KV (if configured).
 
-Cron: vercel.json includes a schedule to call this every minute.
+Cron: vercel.json includes a schedule to call this every minute. The block
+cursor is kept in KV (or /tmp on a warm container), so a run only asks for
+blocks after it; see app/warm.py. /tmp also keeps the txs already reported
+from blocks the cursor has not passed yet, which the next run reads again.
+
+Cron cannot fire more than once a minute, so with SCAN_LOOP_SECONDS set one
+invocation keeps scanning every SCAN_LOOP_INTERVAL seconds (default 10)
+until that budget runs out, committing after each pass. A pass only starts
+if the slowest pass so far would still finish inside the budget, and the
+loop stops at the first error.
 """
 
 import os
 import time
-from typing import Any, Dict, List
+from typing import Any, Dict, List, Optional, Set, Tuple
 
-from app.scan import scan_latest_created_contract
-from api.kv import kv_available, kv_get_json, kv_set_json
+from app.scan import ScanError
+from app.trace_cache import default_cache
+from app.warm import load_local, save_local, scan_step, trace_cache_path
+from api.kv import kv_available, kv_get_cursor, kv_record_scan
 
+# Before the first scan, so the cache is opened on its /tmp file
+default_cache(trace_cache_path())
 
-def _dedupe_cap(history: List[Dict[str, Any]], cap: int) -> List[Dict[str, Any]]:
-    seen = set()
-    out: List[Dict[str, Any]] = []
-    for item in history:
-        tx = item.get("tx")
-        if not tx or tx in seen:
-            continue
-        seen.add(tx)
-        out.append(item)
-        if len(out) >= cap:
-            break
-    return out
+
+def _commit(
+    found: List[Dict[str, Any]],
+    cursor: Optional[int],
+    returned: Set[str],
+    err: Optional[str],
+    kv: bool,
+    local: Dict[str, Any],
+    history_max: int,
+) -> Tuple[int, int]:
+    """Persist one pass; returns (history entries added, total runs)."""
+    local["cursor_block"] = cursor
+    local["returned_txs"] = sorted(returned)
+    save_local(local)
+    if not kv:
+        return 0, 1
+    # Only this pass's deltas go up; dedupe and trimming happen in Redis, atomically
+    meta: Dict[str, Any] = {
+        "last_run_utc": time.strftime("%Y-%m-%d %H:%M:%S", time.gmtime()),
+        "last_error": err,
+        "chain_id": int(os.environ.get("CHAIN_ID", "8453")),
+        "deployer": os.environ.get("DEPLOYER") or "0x048ef1062cbb39B338Ac2685dA72adf104b4cEF5",
+        "history_max": history_max,
+        "interval_seconds": int(os.environ.get("SCAN_INTERVAL_SECONDS", "10")),
+    }
+    if found:
+        meta["latest"] = found[0]
+    return kv_record_scan(found, meta, history_max, cursor=cursor)
 
 
 def handler(request):  # Vercel Python uses `handler`
+    started = time.time()
     history_max = int(os.environ.get("HISTORY_MAX", "50"))
+    loop_seconds = float(os.environ.get("SCAN_LOOP_SECONDS", "0"))
+    loop_interval = max(1.0, float(os.environ.get("SCAN_LOOP_INTERVAL", "10")))
+    deadline = started + loop_seconds
+    kv = kv_available()
+    local = load_local()
 
-    latest = scan_latest_created_contract(
-        api_key=os.environ.get("ETHERSCAN_API_KEY"),
-        deployer=os.environ.get("DEPLOYER"),
-        chain_id=int(os.environ.get("CHAIN_ID", "8453")),
-    )
+    cursor = kv_get_cursor() if kv else None
+    if cursor is None:
+        cursor = local.get("cursor_block")
+    # Txs already reported from blocks above the cursor, so re-read blocks don't report them again
+    returned: Set[str] = set(local.get("returned_txs") or [])
 
-    now_utc = time.strftime("%Y-%m-%d %H:%M:%S", time.gmtime())
+    latest: Optional[Dict[str, Any]] = None
+    err: Optional[str] = None
     runs = 1
-    history: List[Dict[str, Any]] = []
-
-    if kv_available():
-        prev = kv_get_json("scanner:state") or {}
-        runs = int(prev.get("runs", 0)) + 1
-        history = prev.get("history", [])
-        prev_latest = prev.get("latest") or {}
-        if latest and latest.get("tx") and latest.get("tx") != prev_latest.get("tx"):
-            history.insert(0, latest)
-            history = _dedupe_cap(history, history_max)
-        state = {
-            "latest": latest,
-            "last_run_utc": now_utc,
-            "last_error": None,
-            "runs": runs,
-            "history": history,
-            "chain_id": int(os.environ.get("CHAIN_ID", "8453")),
-            "deployer": os.environ.get("DEPLOYER") or "0x048ef1062cbb39B338Ac2685dA72adf104b4cEF5",
-            "history_max": history_max,
-            "interval_seconds": int(os.environ.get("SCAN_INTERVAL_SECONDS", "10")),
-        }
-        kv_set_json("scanner:state", state)
+    added = 0
+    passes = 0
+    slowest = 0.0
+    while True:
+        t0 = time.time()
+        found: List[Dict[str, Any]] = []
+        try:
+            found, cursor = scan_step(
+                cursor,
+                api_key=os.environ.get("ETHERSCAN_API_KEYS") or os.environ.get("ETHERSCAN_API_KEY"),
+                deployer=os.environ.get("DEPLOYER"),
+                chain_id=int(os.environ.get("CHAIN_ID", "8453")),
+                returned=returned,
+            )
+        except ScanError as e:
+            err = str(e)
+        n, runs = _commit(found, cursor, returned, err, kv, local, history_max)
+        added += n
+        latest = found[0] if found else latest
+        passes += 1
+        slowest = max(slowest, time.time() - t0)
+        if err or loop_seconds <= 0:
+            break
+        next_start = t0 + loop_interval
+        if next_start + slowest * 1.5 > deadline:
+            break  # another pass might not finish before the function is killed
+        time.sleep(max(0.0, next_start - time.time()))
 
     # Response
     from flask import jsonify
 
     return jsonify(
         {
-            "ok": True,
+            "ok": err is None,
+            "error": err,
             "latest": latest,
-            "last_run_utc": now_utc,
+            "last_run_utc": time.strftime("%Y-%m-%d %H:%M:%S", time.gmtime()),
             "runs": runs,
-            "history_added": bool(latest),
-            "kv": kv_available(),
+            "passes": passes,
+            "elapsed_seconds": round(time.time() - started, 2),
+            "history_added": added > 0,
+            "cursor_block": cursor,
+            "kv": kv,
         }
     )
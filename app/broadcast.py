@@ -0,0 +1,94 @@
+"""In-process event fan-out for live UI updates (/api/stream).
+
+The scanner publishes small events (a new deployment, a status change) into
+a bounded ring; every viewer waits on one shared condition and reads the
+events after its last seen sequence number. Publishing is one append and
+one wake-up however many viewers are connected, and a viewer that
+reconnects with its last id catches up without gaps. A viewer whose own
+target's events already left the ring gets a "reset" and reloads the full
+state; other targets' traffic never pushes it out.
+"""
+
+import threading
+import time
+from collections import deque
+from typing import Any, Deque, Dict, List, Optional, Tuple
+
+
+class Broadcaster:
+    def __init__(self, maxlen: int = 1024, max_clients: int = 48):
+        self.max_clients = max(0, int(max_clients))
+        self._events: Deque[Tuple[int, str, str, Dict[str, Any]]] = deque(maxlen=max(1, int(maxlen)))
+        self._cond = threading.Condition()
+        self._seq = 0
+        self._evicted: Dict[str, int] = {}  # key -> seq of its newest event that left the ring
+        self._clients = 0
+        self.rejected = 0
+
+    @property
+    def seq(self) -> int:
+        return self._seq
+
+    def publish(self, key: str, kind: str, data: Dict[str, Any], seq: Optional[int] = None) -> int:
+        """Append an event; `seq` (a follower mirroring the leader's feed) keeps ids equal across workers."""
+        with self._cond:
+            self._seq = max(self._seq + 1, int(seq or 0))
+            if len(self._events) == self._events.maxlen:
+                old_seq, old_key = self._events[0][:2]
+                self._evicted[old_key] = old_seq
+            self._events.append((self._seq, key, kind, data))
+            self._cond.notify_all()
+            return self._seq
+
+    def wait(
+        self, key: str, after: int, timeout: float
+    ) -> Tuple[Optional[List[Tuple[int, str, Dict[str, Any]]]], int]:
+        """Events for `key` newer than `after`, waiting up to `timeout` for one.
+
+        Returns (events, position): position is the sequence number the caller
+        has now seen everything up to, events for other keys included, so a
+        viewer of a quiet target keeps up with the ring. Events is None when
+        an event for `key` newer than `after` has left the ring (the caller
+        must resync).
+        """
+        deadline = time.time() + max(0.0, timeout)
+        with self._cond:
+            while True:
+                if self._evicted.get(key, 0) > after:
+                    return None, self._seq
+                out = self._since(key, after)
+                remaining = deadline - time.time()
+                if out or remaining <= 0:
+                    return out, self._seq
+                # Events for other targets wake us too; skip past them and keep waiting
+                after = max(after, self._seq)
+                self._cond.wait(remaining)
+
+    def _since(self, key: str, after: int) -> List[Tuple[int, str, Dict[str, Any]]]:
+        return [(seq, kind, data) for seq, k, kind, data in self._events if seq > after and k == key]
+
+    def wake_all(self) -> None:
+        with self._cond:
+            self._cond.notify_all()
+
+    # --- connection slots: each open stream holds a server thread ---
+    def try_join(self) -> bool:
+        with self._cond:
+            if self._clients >= self.max_clients:
+                self.rejected += 1
+                return False
+            self._clients += 1
+            return True
+
+    def leave(self) -> None:
+        with self._cond:
+            self._clients = max(0, self._clients - 1)
+
+    def stats(self) -> Dict[str, Any]:
+        with self._cond:
+            return {
+                "clients": self._clients,
+                "max_clients": self.max_clients,
+                "rejected": self.rejected,
+                "seq": self._seq,
+            }
@@ -0,0 +1,83 @@
+"""Persistent block cursors: highest fully-processed block per (chain, deployer).
+
+kind="backfill" keeps a second marker per pair: the bootstrap backfill still
+has to scan every block at or below it. Next to it, kind="backfill_skip"
+counts the marker block's txs already read and kind="backfill_found" the
+deployments the backfill has found so far.
+"""
+
+import json
+import os
+import tempfile
+import threading
+from typing import Dict, Optional
+
+
+def _default_path() -> str:
+    return os.environ.get("CURSOR_FILE") or os.path.join(
+        tempfile.gettempdir(), "contract-scanner-cursors.json"
+    )
+
+
+def cursor_key(chain_id: int, deployer: str, kind: str = "") -> str:
+    key = f"{int(chain_id)}:{deployer.lower()}"
+    return f"{kind}:{key}" if kind else key
+
+
+class CursorStore:
+    """Small JSON-file backed map of cursor key -> block number.
+
+    Writes go to a temp file and are renamed into place so a crash never leaves
+    a half-written file behind. Pass path="" to keep cursors in memory only.
+    """
+
+    def __init__(self, path: Optional[str] = None):
+        self.path = _default_path() if path is None else path
+        self._lock = threading.Lock()
+        self._data: Dict[str, int] = {}
+        self._load()
+
+    def _load(self) -> None:
+        if not self.path or not os.path.exists(self.path):
+            return
+        try:
+            with open(self.path, "r", encoding="utf-8") as f:
+                raw = json.load(f)
+            self._data = {str(k): int(v) for k, v in raw.items()}
+        except Exception as e:  # corrupt/unreadable: start fresh
+            print(f"[cursor] ignoring unreadable cursor file {self.path}: {e}")
+            self._data = {}
+
+    def _flush(self) -> None:
+        if not self.path:
+            return
+        d = os.path.dirname(os.path.abspath(self.path))
+        try:
+            fd, tmp = tempfile.mkstemp(prefix=".cursor-", dir=d)
+            with os.fdopen(fd, "w", encoding="utf-8") as f:
+                json.dump(self._data, f)
+            os.replace(tmp, self.path)
+        except OSError as e:
+            print(f"[cursor] failed to persist cursors to {self.path}: {e}")
+
+    def reload(self) -> None:
+        """Re-read the file, e.g. after another process has been writing it."""
+        with self._lock:
+            self._load()
+
+    def get(self, chain_id: int, deployer: str, kind: str = "") -> Optional[int]:
+        with self._lock:
+            return self._data.get(cursor_key(chain_id, deployer, kind))
+
+    def set(self, chain_id: int, deployer: str, block: int, kind: str = "") -> None:
+        key = cursor_key(chain_id, deployer, kind)
+        with self._lock:
+            if self._data.get(key) == int(block):
+                return
+            self._data[key] = int(block)
+            self._flush()
+
+    def clear(self, chain_id: int, deployer: str, kind: str = "") -> None:
+        with self._lock:
+            if self._data.pop(cursor_key(chain_id, deployer, kind), None) is not None:
+                self._flush()
@@ -0,0 +1,255 @@
+"""Durable store of every detected deployment (SQLite, WAL mode).
+
+The in-memory history is capped at HISTORY_MAX; this keeps everything,
+keyed by (chain_id, tx) and indexed by deployer + block, so history survives
+restarts and can be range-queried. Scanner threads only call add(),
+confirm() and remove(), which queue writes for a background writer that
+commits them in order, in batches; readers use their own connections, which
+WAL lets run alongside the writer.
+
+Env: EVENTS_FILE (default: <tmp>/contract-scanner-events.db; "" disables
+the store), EVENTS_FLUSH_SECONDS (max delay before a batch is written,
+default 0.5).
+"""
+
+import os
+import queue
+import sqlite3
+import tempfile
+import threading
+import time
+from typing import Any, Dict, List, Optional, Tuple
+
+
+_SCHEMA = (
+    "CREATE TABLE IF NOT EXISTS events ("
+    " chain_id INTEGER NOT NULL, deployer TEXT NOT NULL, tx TEXT NOT NULL,"
+    " contract TEXT NOT NULL, block INTEGER NOT NULL, utc TEXT,"
+    " status TEXT NOT NULL DEFAULT 'confirmed', quiet INTEGER NOT NULL DEFAULT 0,"
+    " PRIMARY KEY (chain_id, tx))",
+    "CREATE INDEX IF NOT EXISTS events_by_deployer ON events (chain_id, deployer, block DESC)",
+    "CREATE INDEX IF NOT EXISTS events_by_block ON events (chain_id, block)",
+)
+
+_COLUMNS = "contract, tx, block, utc, status, quiet"
+
+_WRITES = {
+    "add": "INSERT OR IGNORE INTO events (chain_id, deployer, tx, contract, block, utc, status, quiet)"
+    " VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+    "confirm": "UPDATE events SET contract = ?, block = ?, utc = ?, status = 'confirmed'"
+    " WHERE chain_id = ? AND tx = ?",
+    "remove": "DELETE FROM events WHERE chain_id = ? AND tx = ?",
+}
+
+# (write kind, statement args)
+_Write = Tuple[str, Tuple[Any, ...]]
+
+
+def _default_path() -> str:
+    return os.environ.get("EVENTS_FILE", os.path.join(tempfile.gettempdir(), "contract-scanner-events.db"))
+
+
+def _to_result(row: Tuple[Any, ...]) -> Dict[str, Any]:
+    contract, tx, block, utc, status, quiet = row
+    result: Dict[str, Any] = {"contract": contract, "tx": tx, "block": str(block), "utc": utc or "", "status": status}
+    if quiet:
+        result["quiet"] = True
+    return result
+
+
+class EventStore:
+    def __init__(self, path: Optional[str] = None, flush_seconds: Optional[float] = None):
+        self.path = _default_path() if path is None else path
+        self.flush_seconds = float(
+            flush_seconds if flush_seconds is not None else os.environ.get("EVENTS_FLUSH_SECONDS", "0.5")
+        )
+        self._queue: "queue.Queue[Optional[_Write]]" = queue.Queue()
+        self._local = threading.local()
+        self._thread: Optional[threading.Thread] = None
+        self.written = 0
+        self.batches = 0
+        if self.path:
+            db = self._connect()
+            # WAL: readers never block the writer and vice versa
+            db.execute("PRAGMA journal_mode=WAL")
+            for stmt in _SCHEMA:
+                db.execute(stmt)
+            columns = {r[1] for r in db.execute("PRAGMA table_info(events)").fetchall()}
+            if "status" not in columns:  # store written before the confirmation stage
+                db.execute("ALTER TABLE events ADD COLUMN status TEXT NOT NULL DEFAULT 'confirmed'")
+            if "quiet" not in columns:  # store written before backfilled rows were marked
+                db.execute("ALTER TABLE events ADD COLUMN quiet INTEGER NOT NULL DEFAULT 0")
+            db.commit()
+
+    @property
+    def enabled(self) -> bool:
+        return bool(self.path)
+
+    def _connect(self) -> sqlite3.Connection:
+        db = getattr(self._local, "db", None)
+        if db is None:
+            db = sqlite3.connect(self.path, timeout=10)
+            db.execute("PRAGMA synchronous=NORMAL")
+            self._local.db = db
+        return db
+
+    # --- writes ---
+    def start(self) -> None:
+        if not self.enabled or self._thread is not None:
+            return
+        self._thread = threading.Thread(target=self._writer, name="events-writer", daemon=True)
+        self._thread.start()
+
+    def add(self, chain_id: int, deployer: str, items: List[Dict[str, Any]]) -> None:
+        """Queue results for the writer thread; never blocks on disk."""
+        if not self.enabled:
+            return
+        for item in items:
+            if not item.get("tx") or not item.get("contract"):
+                continue
+            self._queue.put(
+                (
+                    "add",
+                    (
+                        int(chain_id),
+                        deployer.lower(),
+                        str(item["tx"]).lower(),
+                        str(item["contract"]).lower(),
+                        int(item.get("block") or 0),
+                        item.get("utc"),
+                        str(item.get("status") or "confirmed"),
+                        1 if item.get("quiet") else 0,
+                    ),
+                )
+            )
+
+    def confirm(self, chain_id: int, items: List[Dict[str, Any]]) -> None:
+        """Mark pending deployments confirmed, with their re-validated block and contract."""
+        if not self.enabled:
+            return
+        for item in items:
+            self._queue.put(
+                (
+                    "confirm",
+                    (
+                        str(item["contract"]).lower(),
+                        int(item.get("block") or 0),
+                        item.get("utc"),
+                        int(chain_id),
+                        str(item["tx"]).lower(),
+                    ),
+                )
+            )
+
+    def remove(self, chain_id: int, items: List[Dict[str, Any]]) -> None:
+        """Forget deployments whose tx was reorged out."""
+        if not self.enabled:
+            return
+        for item in items:
+            self._queue.put(("remove", (int(chain_id), str(item["tx"]).lower())))
+
+    def stop(self, timeout: float = 5.0) -> None:
+        if self._thread is not None:
+            self._queue.put(None)
+            self._thread.join(timeout)
+            self._thread = None
+
+    def _writer(self) -> None:
+        db = self._connect()
+        done = False
+        while not done:
+            row = self._queue.get()
+            if row is None:
+                break
+            batch = [row]
+            # Gather whatever else arrives within the flush window into one commit
+            deadline = time.time() + self.flush_seconds
+            while len(batch) < 500:
+                try:
+                    nxt = self._queue.get(timeout=max(0.0, deadline - time.time()))
+                except queue.Empty:
+                    break
+                if nxt is None:
+                    done = True
+                    break
+                batch.append(nxt)
+            try:
+                with db:
+                    # In queue order, one executemany per run of same-kind writes
+                    start = 0
+                    for i in range(1, len(batch) + 1):
+                        if i == len(batch) or batch[i][0] != batch[start][0]:
+                            db.executemany(_WRITES[batch[start][0]], [args for _kind, args in batch[start:i]])
+                            start = i
+                self.written += len(batch)
+                self.batches += 1
+            except sqlite3.Error as e:
+                print(f"[events] failed to write {len(batch)} event(s) to {self.path}: {e}")
+
+    # --- reads ---
+    def recent(self, chain_id: int, deployer: str, limit: int = 50) -> List[Dict[str, str]]:
+        """Latest `limit` deployments for the pair, newest first."""
+        return self.range(chain_id, deployer, limit=limit)
+
+    def range(
+        self,
+        chain_id: int,
+        deployer: str,
+        from_block: Optional[int] = None,
+        to_block: Optional[int] = None,
+        limit: int = 100,
+    ) -> List[Dict[str, str]]:
+        """Deployments with from_block <= block <= to_block, newest first."""
+        if not self.enabled:
+            return []
+        sql = f"SELECT {_COLUMNS} FROM events WHERE chain_id = ? AND deployer = ?"
+        args: List[Any] = [int(chain_id), deployer.lower()]
+        if from_block is not None:
+            sql += " AND block >= ?"
+            args.append(int(from_block))
+        if to_block is not None:
+            sql += " AND block <= ?"
+            args.append(int(to_block))
+        sql += " ORDER BY block DESC, tx DESC LIMIT ?"
+        args.append(int(limit))
+        return [_to_result(r) for r in self._connect().execute(sql, args).fetchall()]
+
+    def page(
+        self,
+        chain_id: int,
+        deployer: str,
+        since_block: Optional[int] = None,
+        before: Optional[Tuple[int, str]] = None,
+        limit: int = 100,
+    ) -> List[Dict[str, str]]:
+        """Keyset page, newest first: blocks > since_block, strictly older than `before` (block, tx)."""
+        if not self.enabled:
+            return []
+        sql = f"SELECT {_COLUMNS} FROM events WHERE chain_id = ? AND deployer = ?"
+        args: List[Any] = [int(chain_id), deployer.lower()]
+        if since_block is not None:
+            sql += " AND block > ?"
+            args.append(int(since_block))
+        if before is not None:
+            sql += " AND (block < ? OR (block = ? AND tx < ?))"
+            args.extend([int(before[0]), int(before[0]), before[1].lower()])
+        sql += " ORDER BY block DESC, tx DESC LIMIT ?"
+        args.append(int(limit))
+        return [_to_result(r) for r in self._connect().execute(sql, args).fetchall()]
+
+    def max_block(self, chain_id: int, deployer: str) -> Optional[int]:
+        if not self.enabled:
+            return None
+        row = self._connect().execute(
+            "SELECT MAX(block) FROM events WHERE chain_id = ? AND deployer = ?",
+            (int(chain_id), deployer.lower()),
+        ).fetchone()
+        return row[0] if row else None
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "enabled": self.enabled,
+            "queued": self._queue.qsize(),
+            "written": self.written,
+            "batches": self.batches,
+        }
@@ -0,0 +1,216 @@
+"""Bounded, deduplicated deployment history.
+
+A deque of slots holding compact records (newest on the left) plus a
+tx-hash index, so inserting, deduplicating, evicting, updating and removing
+a deployment is O(1) whatever HISTORY_MAX is, instead of rebuilding the
+whole list on every change. A removed record leaves an empty slot that
+iteration skips; they are compacted once they make up half the deque.
+Pending deployments are indexed separately, so the confirmation stage never
+walks the whole history. Backfilled (older) results go through merge(),
+which places them by block.
+"""
+
+from collections import deque
+from itertools import islice
+from typing import Any, Deque, Dict, Iterable, Iterator, List, Optional, Tuple
+
+
+class Deployment:
+    """One detected deployment; same fields as the scan result dicts, plus its
+    confirmation status ("pending" until CONFIRMATIONS blocks deep, then "confirmed")
+    and `quiet` for bootstrap/backfill results, which are never alerted or retracted."""
+
+    __slots__ = ("contract", "tx", "block", "utc", "status", "quiet")
+
+    def __init__(
+        self, contract: str, tx: str, block: str, utc: str, status: str = "confirmed", quiet: bool = False
+    ):
+        self.contract = contract
+        self.tx = tx
+        self.block = block
+        self.utc = utc
+        self.status = status
+        self.quiet = quiet
+
+    @classmethod
+    def from_dict(cls, item: Dict[str, Any]) -> "Deployment":
+        return cls(
+            str(item.get("contract") or ""),
+            str(item.get("tx") or ""),
+            str(item.get("block") or ""),
+            str(item.get("utc") or ""),
+            str(item.get("status") or "confirmed"),
+            bool(item.get("quiet")),
+        )
+
+    def to_dict(self) -> Dict[str, Any]:
+        d: Dict[str, Any] = {
+            "contract": self.contract, "tx": self.tx, "block": self.block, "utc": self.utc, "status": self.status
+        }
+        if self.quiet:
+            d["quiet"] = True
+        return d
+
+
+def _block(rec: Deployment) -> int:
+    return int(rec.block) if rec.block.isdigit() else 0
+
+
+def encode(obj: Any) -> Any:
+    """json.dumps `default=` hook for Deployment records."""
+    if isinstance(obj, Deployment):
+        return obj.to_dict()
+    raise TypeError(f"Object of type {type(obj).__name__} is not JSON serializable")
+
+
+class _Slot:
+    """A history position; update() swaps its record, remove() empties it."""
+
+    __slots__ = ("rec",)
+
+    def __init__(self, rec: Optional[Deployment]):
+        self.rec = rec
+
+
+class History:
+    def __init__(self, maxlen: int = 50):
+        self.maxlen = max(1, int(maxlen))
+        self._items: Deque[_Slot] = deque()
+        self._index: Dict[str, _Slot] = {}
+        self._pending: Dict[str, Deployment] = {}
+        self._empty = 0  # removed slots still in _items
+
+    def __len__(self) -> int:
+        return len(self._index)
+
+    def __contains__(self, tx: object) -> bool:
+        return tx in self._index
+
+    def __iter__(self) -> Iterator[Deployment]:
+        return (slot.rec for slot in self._items if slot.rec is not None)
+
+    def _track(self, rec: Deployment) -> None:
+        if rec.status == "pending":
+            self._pending[rec.tx] = rec
+        else:
+            self._pending.pop(rec.tx, None)
+
+    def _trim(self) -> None:
+        """Evict past maxlen and drop empty slots at either end, so both ends hold records."""
+        items = self._items
+        while items and (len(self._index) > self.maxlen or items[-1].rec is None):
+            rec = items.pop().rec
+            if rec is None:
+                self._empty -= 1
+            else:
+                self._index.pop(rec.tx, None)
+                self._pending.pop(rec.tx, None)
+        while items and items[0].rec is None:
+            items.popleft()
+            self._empty -= 1
+
+    def _push(self, rec: Deployment) -> None:
+        slot = _Slot(rec)
+        self._items.appendleft(slot)
+        self._index[rec.tx] = slot
+        self._track(rec)
+        self._trim()
+
+    def add(self, items: Iterable[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        """Insert results given newest first; returns the ones not seen before (newest first)."""
+        fresh: List[Dict[str, Any]] = []
+        seen = set()
+        for item in items:
+            tx = item.get("tx")
+            if not tx or tx in self._index or tx in seen:
+                continue
+            seen.add(tx)
+            fresh.append(item)
+        # Push oldest first so the newest ends up at the left
+        for item in reversed(fresh):
+            self._push(Deployment.from_dict(item))
+        return fresh
+
+    def merge(self, items: Iterable[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        """Insert results of any age in block order (newest block on the left);
+        returns the ones not seen before. Results older than a full history
+        are not kept."""
+        fresh: List[Dict[str, Any]] = []
+        for item in items:
+            tx = item.get("tx")
+            if not tx or tx in self._index:
+                continue
+            rec = Deployment.from_dict(item)
+            block = _block(rec)
+            newest = self.newest()
+            if newest is None or block >= _block(newest):
+                fresh.append(item)
+                self._push(rec)
+                continue
+            oldest = self._items[-1].rec
+            if len(self) >= self.maxlen and oldest is not None and block <= _block(oldest):
+                continue
+            fresh.append(item)
+            # Backfill lands near the old end, so search from the right
+            i = len(self._items)
+            while i > 0:
+                prev = self._items[i - 1].rec
+                if prev is not None and _block(prev) >= block:
+                    break
+                i -= 1
+            slot = _Slot(rec)
+            self._items.insert(i, slot)
+            self._index[rec.tx] = slot
+            self._track(rec)
+            self._trim()
+        return fresh
+
+    def replace(self, items: Iterable[Dict[str, Any]]) -> None:
+        """Reset to `items` (newest first), deduplicated and capped."""
+        self._items.clear()
+        self._index.clear()
+        self._pending.clear()
+        self._empty = 0
+        self.add(items)
+
+    def update(self, item: Dict[str, Any]) -> bool:
+        """Swap in a new record for item["tx"] at the same position (records
+        already handed to snapshots are never mutated); False if not present."""
+        slot = self._index.get(item.get("tx") or "")
+        if slot is None:
+            return False
+        rec = Deployment.from_dict(item)
+        slot.rec = rec
+        self._track(rec)
+        return True
+
+    def remove(self, tx: str) -> bool:
+        slot = self._index.pop(tx, None)
+        if slot is None:
+            return False
+        self._pending.pop(tx, None)
+        slot.rec = None
+        self._empty += 1
+        if self._empty > 64 and self._empty * 2 > len(self._items):
+            self._items = deque(s for s in self._items if s.rec is not None)
+            self._empty = 0
+        self._trim()
+        return True
+
+    def newest(self) -> Optional[Deployment]:
+        return self._items[0].rec if self._items else None
+
+    def head(self, n: int) -> Tuple[Deployment, ...]:
+        """The newest `n` records; costs O(n), not O(len)."""
+        return tuple(islice(self, max(0, int(n))))
+
+    def pending(self) -> Tuple[Deployment, ...]:
+        """Records still waiting for confirmation, from the pending index."""
+        return tuple(self._pending.values())
+
+    def records(self) -> Tuple[Deployment, ...]:
+        """Immutable copy, newest first (records are shared, not copied); O(len)."""
+        return tuple(self)
+
+    def to_dicts(self, limit: Optional[int] = None) -> List[Dict[str, str]]:
+        return [rec.to_dict() for rec in (self if limit is None else islice(self, limit))]
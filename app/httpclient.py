@@ -0,0 +1,68 @@
+"""Process-wide pooled HTTP session shared by Etherscan, KV and Telegram calls.
+
+Reusing one session keeps TCP/TLS connections alive between calls instead of
+paying a handshake per request. Tunables (env):
+  HTTP_POOL_CONNECTIONS  distinct hosts to keep pools for (default 10)
+  HTTP_POOL_SIZE         keep-alive connections per host (default 32)
+  HTTP_RETRIES           transport retries on connect/read errors, 429 and 5xx (default 3)
+  HTTP_BACKOFF           exponential backoff factor in seconds (default 0.4)
+Retries on status codes only apply to idempotent methods, so a POST (e.g. a
+Telegram message) is never sent twice by the pool itself. Each retry is
+counted in scanner_http_retries_total.
+"""
+
+import os
+import threading
+from typing import Optional
+
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+from app import metrics
+
+
+_session: Optional[requests.Session] = None
+_lock = threading.Lock()
+
+
+class _CountingRetry(Retry):
+    """Retry that counts every retry it allows (urllib3 otherwise retries silently)."""
+
+    def increment(self, method=None, url=None, response=None, error=None, _pool=None, _stacktrace=None):  # type: ignore[override]
+        new = super().increment(method, url, response, error, _pool, _stacktrace)  # raises once exhausted
+        reason = str(response.status) if response is not None and error is None else "error"
+        metrics.HTTP_RETRIES.inc(getattr(_pool, "host", None) or "unknown", reason)
+        return new
+
+
+def _build_session() -> requests.Session:
+    retries = int(os.environ.get("HTTP_RETRIES", "3"))
+    retry = _CountingRetry(
+        total=retries,
+        connect=retries,
+        read=retries,
+        status=retries,
+        backoff_factor=float(os.environ.get("HTTP_BACKOFF", "0.4")),
+        status_forcelist=(429, 500, 502, 503, 504),
+        raise_on_status=False,
+    )
+    adapter = HTTPAdapter(
+        pool_connections=int(os.environ.get("HTTP_POOL_CONNECTIONS", "10")),
+        pool_maxsize=int(os.environ.get("HTTP_POOL_SIZE", "32")),
+        max_retries=retry,
+    )
+    s = requests.Session()
+    s.mount("https://", adapter)
+    s.mount("http://", adapter)
+    s.headers.update({"Connection": "keep-alive", "User-Agent": "contract-scanner"})
+    return s
+
+
+def get_session() -> requests.Session:
+    global _session
+    if _session is None:
+        with _lock:
+            if _session is None:
+                _session = _build_session()
+    return _session
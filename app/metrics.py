@@ -0,0 +1,223 @@
+"""Minimal Prometheus metrics (text exposition format), no extra dependency.
+
+Counters and histograms are plain dicts keyed by label values behind one
+lock each, cheap enough for the scan hot path: an observation is a bisect
+and a few additions. Values that already live elsewhere (cache sizes,
+queue depth, cursors) are read at scrape time through callbacks instead of
+being mirrored on every change. Served by the web app at /metrics.
+"""
+
+import threading
+from bisect import bisect_left
+from typing import Callable, Dict, Iterator, List, Optional, Sequence, Tuple
+
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0)
+LAG_BUCKETS = (1.0, 2.0, 5.0, 10.0, 15.0, 30.0, 60.0, 120.0, 300.0, 600.0, 1800.0, 3600.0)
+
+_Labels = Tuple[str, ...]
+_Sample = Tuple[str, Dict[str, str], float]
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _format(name: str, labels: Dict[str, str], value: float) -> str:
+    if labels:
+        inner = ",".join(f'{k}="{_escape(str(v))}"' for k, v in labels.items())
+        name = f"{name}{{{inner}}}"
+    if value == int(value) and abs(value) < 1e15:
+        return f"{name} {int(value)}"
+    return f"{name} {value!r}"
+
+
+class _Metric:
+    kind = "untyped"
+
+    def __init__(self, name: str, help_text: str, labels: Sequence[str] = ()):
+        self.name = name
+        self.help = help_text
+        self.labels = tuple(labels)
+        self._lock = threading.Lock()
+
+    def _label_dict(self, values: _Labels) -> Dict[str, str]:
+        return dict(zip(self.labels, values))
+
+    def samples(self) -> Iterator[_Sample]:
+        return iter(())
+
+    def render(self) -> List[str]:
+        lines = [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} {self.kind}"]
+        lines.extend(_format(n, lbl, v) for n, lbl, v in self.samples())
+        return lines
+
+
+class Counter(_Metric):
+    kind = "counter"
+
+    def __init__(self, name: str, help_text: str, labels: Sequence[str] = ()):
+        super().__init__(name, help_text, labels)
+        self._values: Dict[_Labels, float] = {}
+
+    def inc(self, *labels: str, amount: float = 1.0) -> None:
+        with self._lock:
+            self._values[labels] = self._values.get(labels, 0.0) + amount
+
+    def samples(self) -> Iterator[_Sample]:
+        with self._lock:
+            items = list(self._values.items())
+        for labels, value in items:
+            yield self.name, self._label_dict(labels), value
+
+
+class Histogram(_Metric):
+    kind = "histogram"
+
+    def __init__(
+        self,
+        name: str,
+        help_text: str,
+        labels: Sequence[str] = (),
+        buckets: Sequence[float] = LATENCY_BUCKETS,
+    ):
+        super().__init__(name, help_text, labels)
+        self.buckets = tuple(sorted(buckets))
+        # labels -> [per-bucket counts (+Inf last), sum, count]
+        self._values: Dict[_Labels, list] = {}
+
+    def observe(self, value: float, *labels: str) -> None:
+        i = bisect_left(self.buckets, value)
+        with self._lock:
+            st = self._values.get(labels)
+            if st is None:
+                st = self._values[labels] = [[0] * (len(self.buckets) + 1), 0.0, 0]
+            st[0][i] += 1
+            st[1] += value
+            st[2] += 1
+
+    def samples(self) -> Iterator[_Sample]:
+        with self._lock:
+            items = [(labels, list(st[0]), st[1], st[2]) for labels, st in self._values.items()]
+        for labels, counts, total, count in items:
+            base = self._label_dict(labels)
+            running = 0
+            for bound, n in zip(self.buckets + (float("inf"),), counts):
+                running += n
+                le = "+Inf" if bound == float("inf") else repr(bound)
+                yield f"{self.name}_bucket", {**base, "le": le}, running
+            yield f"{self.name}_sum", base, total
+            yield f"{self.name}_count", base, count
+
+
+class Callback(_Metric):
+    """Gauge or counter whose samples are read from `fn` at scrape time."""
+
+    def __init__(
+        self,
+        name: str,
+        help_text: str,
+        fn: Callable[[], Dict[_Labels, Optional[float]]],
+        labels: Sequence[str] = (),
+        kind: str = "gauge",
+    ):
+        super().__init__(name, help_text, labels)
+        self.kind = kind
+        self.fn = fn
+
+    def samples(self) -> Iterator[_Sample]:
+        try:
+            values = self.fn()
+        except Exception as e:  # a broken callback must not break the scrape
+            print(f"[metrics] {self.name} callback failed: {e}")
+            return
+        for labels, value in values.items():
+            if value is not None:
+                yield self.name, self._label_dict(labels), float(value)
+
+
+_registry: Dict[str, _Metric] = {}
+_registry_lock = threading.Lock()
+
+
+def _register(metric: _Metric, replace: bool = False) -> _Metric:
+    with _registry_lock:
+        existing = _registry.get(metric.name)
+        if existing is not None and not replace:
+            return existing
+        _registry[metric.name] = metric
+        return metric
+
+
+def counter(name: str, help_text: str, labels: Sequence[str] = ()) -> Counter:
+    return _register(Counter(name, help_text, labels))  # type: ignore[return-value]
+
+
+def histogram(
+    name: str, help_text: str, labels: Sequence[str] = (), buckets: Sequence[float] = LATENCY_BUCKETS
+) -> Histogram:
+    return _register(Histogram(name, help_text, labels, buckets))  # type: ignore[return-value]
+
+
+def callback(
+    name: str,
+    help_text: str,
+    fn: Callable[[], Dict[_Labels, Optional[float]]],
+    labels: Sequence[str] = (),
+    kind: str = "gauge",
+) -> None:
+    """Register (or replace) a scrape-time metric."""
+    _register(Callback(name, help_text, fn, labels, kind), replace=True)
+
+
+def render() -> str:
+    with _registry_lock:
+        metrics = sorted(_registry.values(), key=lambda m: m.name)
+    lines: List[str] = []
+    for m in metrics:
+        lines.extend(m.render())
+    return "\n".join(lines) + "\n"
+
+
+# --- Scanner-wide metrics, shared by app.scan, app.rpc, app.notify and app.web ---
+
+ETHERSCAN_REQUESTS = counter(
+    "scanner_etherscan_requests_total",
+    "Etherscan HTTP calls by action and outcome (ok, rate_limited, invalid_key, quota, error)",
+    ("action", "outcome"),
+)
+ETHERSCAN_SECONDS = histogram(
+    "scanner_etherscan_request_seconds", "Latency of single Etherscan HTTP calls", ("action",)
+)
+RPC_REQUESTS = counter("scanner_rpc_requests_total", "JSON-RPC calls by method and outcome", ("method", "outcome"))
+RPC_SECONDS = histogram("scanner_rpc_request_seconds", "Latency of JSON-RPC HTTP calls", ("method",))
+STAGE_SECONDS = histogram(
+    "scanner_stage_seconds",
+    "Time per scan stage: txlist page, internal lookup (per tx or sweep)",
+    ("stage",),
+)
+HTTP_RETRIES = counter(
+    "scanner_http_retries_total",
+    "Transport retries made by the shared HTTP session, by host and reason (error, or the HTTP status)",
+    ("host", "reason"),
+)
+SCAN_SECONDS = histogram("scanner_scan_seconds", "Wall-clock time of a full scan tick", ("backend", "outcome"))
+DETECTION_LAG = histogram(
+    "scanner_detection_lag_seconds",
+    "Block timestamp to detection time for new deployments",
+    ("chain_id",),
+    LAG_BUCKETS,
+)
+CONFIRMATIONS = counter(
+    "scanner_confirmations_total",
+    "Pending deployments settled by re-validation: confirmed, or reorged out",
+    ("outcome",),
+)
+PREFILTER = counter(
+    "scanner_prefilter_total",
+    "Parent txs by local verdict: create (top-level), skip (cannot deploy), lookup (internal traces fetched)",
+    ("verdict",),
+)
+NOTIFY_DELIVERIES = counter("scanner_notify_total", "Alert delivery attempts by outcome", ("outcome",))
+NOTIFY_SECONDS = histogram(
+    "scanner_notify_delivery_seconds", "Submit to delivered latency of alerts", buckets=LAG_BUCKETS
+)
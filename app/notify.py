@@ -0,0 +1,249 @@
+"""Outbound alert delivery, decoupled from the scan loop.
+
+The scanner only calls NotificationQueue.submit(), which never blocks: the
+message goes into a bounded in-memory queue and onto a small on-disk spool.
+Worker threads deliver it, retrying transient failures with exponential
+backoff and honouring Telegram's 429 `retry_after` (which pauses all workers,
+since the limit is per bot/chat). A message leaves the spool only once it
+is delivered or rejected outright, so alerts survive restarts. stop() and
+start() hand delivery over between workers (see app/shared.py): only the
+lease holder drains the spool.
+"""
+
+import json
+import os
+import queue
+import tempfile
+import threading
+import time
+import uuid
+from typing import Any, Callable, Dict, List, Optional
+
+from app import metrics
+from app.httpclient import get_session
+
+
+class DeliveryError(Exception):
+    def __init__(self, message: str, retry_after: Optional[float] = None, permanent: bool = False):
+        super().__init__(message)
+        self.retry_after = retry_after
+        self.permanent = permanent
+
+
+def telegram_post(token: str, payload: Dict[str, Any], timeout: int = 10) -> None:
+    """sendMessage via the shared HTTP pool; raises DeliveryError on failure."""
+    url = f"https://api.telegram.org/bot{token}/sendMessage"
+    try:
+        r = get_session().post(url, json=payload, timeout=timeout)
+    except Exception as e:  # network: retry later
+        raise DeliveryError(f"sendMessage failed: {e}")
+    if r.ok:
+        return
+    retry_after: Optional[float] = None
+    try:
+        retry_after = float((r.json().get("parameters") or {}).get("retry_after"))
+    except Exception:
+        retry_after = None
+    if r.status_code == 429:
+        raise DeliveryError(f"sendMessage rate limited: {r.text[:200]}", retry_after=retry_after or 1.0)
+    # Other 4xx (bad markup, chat not found, bot blocked) won't fix themselves
+    permanent = 400 <= r.status_code < 500
+    raise DeliveryError(f"sendMessage failed: {r.status_code} {r.text[:200]}", permanent=permanent)
+
+
+def _default_spool() -> str:
+    return os.environ.get("NOTIFY_SPOOL_FILE") or os.path.join(
+        tempfile.gettempdir(), "contract-scanner-notify-spool.json"
+    )
+
+
+class NotificationQueue:
+    def __init__(
+        self,
+        sender: Callable[[Dict[str, Any]], None],
+        workers: int = 1,
+        maxsize: int = 1000,
+        max_attempts: int = 8,
+        spool_path: Optional[str] = None,
+    ):
+        self.sender = sender
+        self.workers = max(1, int(workers))
+        self.max_attempts = max(1, int(max_attempts))
+        self.spool_path = _default_spool() if spool_path is None else spool_path
+        self._queue: "queue.Queue[str]" = queue.Queue(maxsize=max(1, int(maxsize)))
+        self._pending: Dict[str, Dict[str, Any]] = {}  # id -> {"payload", "attempts", "dead", "ts"}
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._paused_until = 0.0
+        self._threads: List[threading.Thread] = []
+        self._restored: List[str] = []
+        self.delivered = 0
+        self.failed = 0
+        self.retries = 0
+        self.overflowed = 0
+
+    # --- spool ---
+    def _load_spool(self) -> None:
+        if not self.spool_path or not os.path.exists(self.spool_path):
+            return
+        try:
+            with open(self.spool_path, "r", encoding="utf-8") as f:
+                raw = json.load(f)
+        except Exception as e:
+            print(f"[notify] ignoring unreadable spool {self.spool_path}: {e}")
+            return
+        for mid, entry in raw.items():
+            # Dead letters get another round of attempts after a restart
+            self._pending[mid] = {
+                "payload": entry["payload"],
+                "attempts": 0,
+                "dead": False,
+                "ts": entry.get("ts") or time.time(),
+            }
+            self._restored.append(mid)
+        if self._pending:
+            print(f"[notify] {len(self._pending)} undelivered message(s) restored from spool")
+
+    def _flush_spool(self) -> None:
+        if not self.spool_path:
+            return
+        d = os.path.dirname(os.path.abspath(self.spool_path))
+        try:
+            fd, tmp = tempfile.mkstemp(prefix=".notify-", dir=d)
+            with os.fdopen(fd, "w", encoding="utf-8") as f:
+                json.dump(self._pending, f)
+            os.replace(tmp, self.spool_path)
+        except OSError as e:
+            print(f"[notify] failed to write spool {self.spool_path}: {e}")
+
+    # --- producer side ---
+    def start(self) -> None:
+        """Restore the spool and start delivering.
+
+        The spool is read here rather than at construction, so a worker that
+        only becomes the sender later (see app/shared.py) resumes what the
+        previous one left undelivered.
+        """
+        if self._threads:
+            return
+        # A fresh event per term: a worker of the last term still inside a send exits after it
+        self._stop = threading.Event()
+        with self._lock:
+            self._pending.clear()  # the spool is authoritative; another worker may have sent since
+            self._load_spool()
+        for i in range(self.workers):
+            t = threading.Thread(target=self._worker, args=(self._stop,), name=f"notify-{i}", daemon=True)
+            t.start()
+            self._threads.append(t)
+        restored, self._restored = self._restored, []
+        for mid in restored:
+            self._enqueue(mid)
+
+    def submit(self, payload: Dict[str, Any]) -> str:
+        """Queue a message for delivery; never blocks the caller."""
+        mid = uuid.uuid4().hex
+        with self._lock:
+            self._pending[mid] = {"payload": payload, "attempts": 0, "dead": False, "ts": time.time()}
+            self._flush_spool()
+        self._enqueue(mid)
+        return mid
+
+    def _enqueue(self, mid: str) -> None:
+        try:
+            self._queue.put_nowait(mid)
+        except queue.Full:
+            # Still spooled; it is retried after the next restart
+            self.overflowed += 1
+            with self._lock:
+                self._pending[mid]["dead"] = True
+                self._flush_spool()
+            print("[notify] queue full; message kept in spool only")
+
+    def stop(self, timeout: float = 5.0) -> None:
+        """Stop delivering, e.g. when this worker loses the leader lease.
+
+        Undelivered messages stay in the spool for whoever calls start() next.
+        """
+        self._stop.set()
+        for t in self._threads:
+            t.join(timeout)
+        self._threads = []
+        while True:
+            try:
+                self._queue.get_nowait()
+            except queue.Empty:
+                break
+            self._queue.task_done()
+
+    # --- consumer side ---
+    def _worker(self, stop: threading.Event) -> None:
+        while not stop.is_set():
+            try:
+                mid = self._queue.get(timeout=0.5)
+            except queue.Empty:
+                continue
+            try:
+                self._deliver(mid, stop)
+            finally:
+                self._queue.task_done()
+
+    def _deliver(self, mid: str, stop: threading.Event) -> None:
+        while not stop.is_set():
+            wait = self._paused_until - time.time()
+            if wait > 0:
+                stop.wait(wait)
+                continue
+            with self._lock:
+                entry = self._pending.get(mid)
+                if entry is None:
+                    return
+                entry["attempts"] += 1
+                attempts = entry["attempts"]
+                payload = entry["payload"]
+            err: Optional[DeliveryError] = None
+            try:
+                self.sender(payload)
+            except DeliveryError as e:
+                err = e
+            except Exception as e:  # unexpected sender failure: treat as transient
+                err = DeliveryError(str(e))
+            if err is not None:
+                if err.retry_after:
+                    self._paused_until = max(self._paused_until, time.time() + err.retry_after)
+                if err.permanent or attempts >= self.max_attempts:
+                    self.failed += 1
+                    metrics.NOTIFY_DELIVERIES.inc("failed")
+                    print(f"[notify] giving up after {attempts} attempt(s): {err}")
+                    with self._lock:
+                        if err.permanent:
+                            self._pending.pop(mid, None)
+                        else:
+                            entry["dead"] = True
+                        self._flush_spool()
+                    return
+                self.retries += 1
+                metrics.NOTIFY_DELIVERIES.inc("retry")
+                backoff = err.retry_after or min(60.0, 0.5 * (2 ** (attempts - 1)))
+                print(f"[notify] attempt {attempts} failed ({err}); retrying in {backoff:.1f}s")
+                stop.wait(backoff)
+                continue
+            with self._lock:
+                self._pending.pop(mid, None)
+                self._flush_spool()
+            self.delivered += 1
+            metrics.NOTIFY_DELIVERIES.inc("delivered")
+            metrics.NOTIFY_SECONDS.observe(time.time() - entry["ts"])
+            return
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            dead = sum(1 for e in self._pending.values() if e["dead"])
+            return {
+                "queued": self._queue.qsize(),
+                "pending": len(self._pending) - dead,
+                "dead": dead,
+                "delivered": self.delivered,
+                "failed": self.failed,
+                "retries": self.retries,
+                "overflowed": self.overflowed,
+            }
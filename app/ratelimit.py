@@ -0,0 +1,293 @@
+"""Token-bucket pacing for Etherscan calls, one bucket per API key.
+
+Every request takes a token first, so a burst of lookups is spread evenly over
+the key's quota instead of tripping "Max rate limit reached". When Etherscan
+still answers with a rate-limit payload the bucket backs off adaptively:
+the effective rate is halved and refilling pauses for an exponentially
+growing interval; each successful call then recovers the rate gradually.
+
+With several keys (ETHERSCAN_API_KEYS) a KeyPool hands each request the key
+whose bucket is ready first, preferring the most daily quota left, so
+throughput grows with the number of keys. A key that hits its daily quota
+sits out until the next UTC day; an invalid key sits out for a cooldown.
+
+Calls made inside `with background():` (the bootstrap backfill) are paced by
+a separate share of each pool's rate and always yield to foreground calls
+that are waiting for a token, so head tracking keeps first claim on the budget.
+
+Env: ETHERSCAN_RPS (calls/sec per key, default 5 — the free tier),
+ETHERSCAN_BURST (bucket capacity, default 1 so calls are evenly spaced),
+ETHERSCAN_DAILY_LIMIT (calls per key per UTC day, default 100000),
+ETHERSCAN_KEY_COOLDOWN (seconds an invalid key is left out, default 3600),
+BACKFILL_SHARE (most of a pool's rate background calls may use, default 0.5).
+"""
+
+import calendar
+import os
+import re
+import threading
+import time
+from contextlib import contextmanager
+from typing import Any, Dict, Iterator, List, Optional
+
+
+_priority = threading.local()
+
+
+@contextmanager
+def background() -> Iterator[None]:
+    """Run the calls in this block (this thread only) at background priority."""
+    previous = getattr(_priority, "background", False)
+    _priority.background = True
+    try:
+        yield
+    finally:
+        _priority.background = previous
+
+
+def in_background() -> bool:
+    return getattr(_priority, "background", False)
+
+
+def _utc_day() -> str:
+    return time.strftime("%Y-%m-%d", time.gmtime())
+
+
+class TokenBucket:
+    def __init__(
+        self,
+        rate: float,
+        burst: float = 1.0,
+        min_rate: Optional[float] = None,
+        daily_limit: int = 0,
+    ):
+        self.rate = float(rate)
+        self.burst = max(1.0, float(burst))
+        self.min_rate = float(min_rate) if min_rate else max(0.2, self.rate / 16)
+        self._effective = self.rate
+        self._tokens = self.burst
+        self._updated = time.monotonic()
+        self._paused_until = 0.0
+        self._backoff = 0.0
+        self._lock = threading.Lock()
+        self.acquired = 0
+        self.waited_seconds = 0.0
+        self.rate_limit_hits = 0
+        # Key-level quota (0 = unlimited) and rotation state, used by KeyPool
+        self.daily_limit = max(0, int(daily_limit))
+        self.used_today = 0
+        self._day = _utc_day()
+        self.disabled_until = 0.0  # wall clock
+        self.disabled_reason: Optional[str] = None
+        self.errors = 0
+
+    def _refill(self, now: float) -> None:
+        start = max(self._updated, self._paused_until)
+        if now > start:
+            self._tokens = min(self.burst, self._tokens + (now - start) * self._effective)
+        self._updated = max(self._updated, now)
+
+    def try_acquire(self) -> float:
+        """Take a token if one is ready (returns 0.0), else the seconds until one is."""
+        with self._lock:
+            now = time.monotonic()
+            self._refill(now)
+            if self._tokens >= 1.0 and now >= self._paused_until:
+                self._tokens -= 1.0
+                self.acquired += 1
+                self._count_use()
+                return 0.0
+            return max(0.001, self._paused_until - now, (1.0 - self._tokens) / self._effective)
+
+    def acquire(self) -> float:
+        """Block until a token is available; returns the seconds spent waiting."""
+        waited = 0.0
+        while True:
+            delay = self.try_acquire()
+            if delay <= 0.0:
+                self.note_wait(waited)
+                return waited
+            time.sleep(delay)
+            waited += delay
+
+    def note_wait(self, seconds: float) -> None:
+        with self._lock:
+            self.waited_seconds += seconds
+
+    # --- daily quota and rotation (caller holds the lock unless noted) ---
+    def _roll_day(self) -> None:
+        day = _utc_day()
+        if day != self._day:
+            self._day, self.used_today = day, 0
+            if self.disabled_reason == "daily quota":
+                self.disabled_until, self.disabled_reason = 0.0, None
+
+    def _count_use(self) -> None:
+        self._roll_day()
+        self.used_today += 1
+
+    def usable(self) -> bool:
+        """Not sitting out and with daily quota left. Takes the lock."""
+        with self._lock:
+            self._roll_day()
+            if self.disabled_until > time.time():
+                return False
+            return not self.daily_limit or self.used_today < self.daily_limit
+
+    def remaining_today(self) -> Optional[int]:
+        with self._lock:
+            return max(0, self.daily_limit - self.used_today) if self.daily_limit else None
+
+    def disable(self, seconds: float, reason: str) -> None:
+        """Take the key out of rotation for `seconds`. Takes the lock."""
+        with self._lock:
+            self.errors += 1
+            self.disabled_until = max(self.disabled_until, time.time() + seconds)
+            self.disabled_reason = reason
+
+    def exhaust(self) -> None:
+        """Etherscan says the daily quota is spent: sit out until the next UTC day."""
+        tomorrow = calendar.timegm(time.strptime(_utc_day(), "%Y-%m-%d")) + 86400
+        self.disable(tomorrow - time.time(), "daily quota")
+
+    def penalize(self) -> float:
+        """Rate-limit response seen: halve the rate and pause refills. Returns the pause."""
+        with self._lock:
+            self.rate_limit_hits += 1
+            self._effective = max(self.min_rate, self._effective / 2)
+            self._backoff = min(30.0, self._backoff * 2 if self._backoff else 1.0)
+            now = time.monotonic()
+            self._refill(now)
+            self._tokens = 0.0
+            self._paused_until = max(self._paused_until, now + self._backoff)
+            return self._backoff
+
+    def reward(self) -> None:
+        """Successful call: recover the rate additively and relax the backoff."""
+        with self._lock:
+            if self._effective < self.rate:
+                self._effective = min(self.rate, self._effective + self.rate / 20)
+            self._backoff = self._backoff / 2 if self._backoff > 0.05 else 0.0
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                "rate": self.rate,
+                "effective_rate": round(self._effective, 3),
+                "acquired": self.acquired,
+                "throttle_wait_seconds": round(self.waited_seconds, 3),
+                "rate_limit_hits": self.rate_limit_hits,
+                "used_today": self.used_today,
+                "daily_limit": self.daily_limit or None,
+                "errors": self.errors,
+                "disabled": self.disabled_reason if self.disabled_until > time.time() else None,
+            }
+
+
+_buckets: Dict[str, TokenBucket] = {}
+_buckets_lock = threading.Lock()
+
+
+def limiter_for(api_key: str) -> TokenBucket:
+    with _buckets_lock:
+        bucket = _buckets.get(api_key)
+        if bucket is None:
+            bucket = TokenBucket(
+                rate=float(os.environ.get("ETHERSCAN_RPS", "5")),
+                burst=float(os.environ.get("ETHERSCAN_BURST", "1")),
+                daily_limit=int(os.environ.get("ETHERSCAN_DAILY_LIMIT", "100000")),
+            )
+            _buckets[api_key] = bucket
+        return bucket
+
+
+class KeyPool:
+    """Spreads requests over several API keys, each paced by its own bucket."""
+
+    def __init__(self, keys: List[str]):
+        self.keys = list(dict.fromkeys(k for k in keys if k))
+        self._buckets = [limiter_for(k) for k in self.keys]
+        share = float(os.environ.get("BACKFILL_SHARE", "0.5"))
+        self._background = TokenBucket(max(0.1, share * sum(b.rate for b in self._buckets)))
+        self._lock = threading.Lock()
+        self._foreground = 0  # foreground callers inside acquire()
+
+    def acquire(self) -> Optional[str]:
+        """Block until some key has a token and return it; None when no key is usable at all."""
+        if in_background():
+            self._background.acquire()
+            return self._acquire(background=True)
+        with self._lock:
+            self._foreground += 1
+        try:
+            return self._acquire(background=False)
+        finally:
+            with self._lock:
+                self._foreground -= 1
+
+    def _acquire(self, background: bool) -> Optional[str]:
+        waited = 0.0
+        while True:
+            if background and self._foreground:
+                time.sleep(0.05)  # a foreground call is waiting: it goes first
+                waited += 0.05
+                continue
+            usable = [(k, b) for k, b in zip(self.keys, self._buckets) if b.usable()]
+            if not usable:
+                return None
+            # Most daily quota left first; unlimited keys count as full
+            usable.sort(key=lambda kb: -(kb[1].remaining_today() or float("inf")))
+            delays = []
+            for key, bucket in usable:
+                delay = bucket.try_acquire()
+                if delay <= 0.0:
+                    bucket.note_wait(waited)
+                    return key
+                delays.append(delay)
+            pause = min(min(delays), 1.0)
+            time.sleep(pause)
+            waited += pause
+
+    def invalid(self, key: str) -> None:
+        limiter_for(key).disable(float(os.environ.get("ETHERSCAN_KEY_COOLDOWN", "3600")), "invalid key")
+        print(f"[ratelimit] key {_mask(key)} rejected as invalid; out of rotation")
+
+    def exhausted(self, key: str) -> None:
+        limiter_for(key).exhaust()
+        print(f"[ratelimit] key {_mask(key)} spent its daily quota; out of rotation until 00:00 UTC")
+
+
+_pools: Dict[str, KeyPool] = {}
+
+
+def split_keys(spec: str) -> List[str]:
+    return [k for k in re.split(r"[,\s]+", spec or "") if k]
+
+
+def key_pool(spec: str) -> KeyPool:
+    """Pool for a key or a comma/whitespace separated list of keys."""
+    with _buckets_lock:
+        pool = _pools.get(spec)
+    if pool is None:
+        pool = KeyPool(split_keys(spec))
+        with _buckets_lock:
+            pool = _pools.setdefault(spec, pool)
+    return pool
+
+
+def _mask(api_key: str) -> str:
+    return f"…{api_key[-4:]}" if len(api_key) > 4 else "…"
+
+
+def limiter_stats() -> Dict[str, Any]:
+    """Per-key stats (keys masked) plus totals, for the state/metrics endpoints."""
+    with _buckets_lock:
+        items = list(_buckets.items())
+    per_key = {_mask(k): b.stats() for k, b in items}
+    return {
+        "keys": per_key,
+        "throttle_wait_seconds": round(sum(v["throttle_wait_seconds"] for v in per_key.values()), 3),
+        "rate_limit_hits": sum(v["rate_limit_hits"] for v in per_key.values()),
+        "used_today": sum(v["used_today"] for v in per_key.values()),
+        "keys_active": sum(1 for v in per_key.values() if not v["disabled"]),
+    }
@@ -0,0 +1,182 @@
+"""JSON-RPC detection backend: factory event logs instead of Etherscan traces.
+
+Factories such as Zora's coin factory emit an event per deployment, so a
+node's `eth_getLogs` filtered by factory address and event topic finds new
+contracts directly, at chain head and without Etherscan's indexing lag or
+rate limits. Results have the same {contract, tx, block, utc} shape as
+app.scan and the incremental scan returns the same (results, cursor) pair.
+
+Env: RPC_URL (or RPC_URL_<chain_id>), RPC_EVENT_TOPIC (topic0 of the
+deployment event), RPC_CONTRACT_FIELD ("topic:N" or "data:N", where the new
+contract address sits in the log; default "topic:1"), RPC_FACTORY (defaults
+to the watched deployer address), RPC_LOG_RANGE (blocks per eth_getLogs
+call, default 2000; halved while the node rejects a range as too large).
+"""
+
+import itertools
+import time
+from typing import Any, Dict, List, Optional, Tuple
+
+from app import metrics
+from app.httpclient import get_session
+from app.scan import ScanError, _get_env
+
+
+_ids = itertools.count(1)
+
+
+def rpc_url_for(chain_id: int) -> Optional[str]:
+    return _get_env(f"RPC_URL_{int(chain_id)}") or _get_env("RPC_URL")
+
+
+def _rpc_batch(url: str, calls: List[Tuple[str, List[Any]]], timeout: int = 12) -> List[Any]:
+    """Send JSON-RPC calls as one batch; results in call order."""
+    if not calls:
+        return []
+    body = [{"jsonrpc": "2.0", "id": next(_ids), "method": m, "params": p} for m, p in calls]
+    method = calls[0][0]
+    t0 = time.perf_counter()
+    try:
+        r = get_session().post(url, json=body if len(body) > 1 else body[0], timeout=timeout)
+        r.raise_for_status()
+        data = r.json()
+    except Exception as e:  # broad: network, decoding, etc.
+        metrics.RPC_REQUESTS.inc(method, "error")
+        raise ScanError(f"RPC failed: {e}")
+    finally:
+        metrics.RPC_SECONDS.observe(time.perf_counter() - t0, method)
+    metrics.RPC_REQUESTS.inc(method, "ok")
+    replies = data if isinstance(data, list) else [data]
+    by_id = {rep.get("id"): rep for rep in replies if isinstance(rep, dict)}
+    out = []
+    for req in body:
+        rep = by_id.get(req["id"])
+        if rep is None:
+            raise ScanError(f"RPC {req['method']}: no reply")
+        if rep.get("error"):
+            raise ScanError(f"RPC {req['method']} error: {rep['error']}")
+        out.append(rep.get("result"))
+    return out
+
+
+def _rpc(url: str, method: str, params: List[Any], timeout: int = 12) -> Any:
+    return _rpc_batch(url, [(method, params)], timeout)[0]
+
+
+def block_number(url: str, timeout: int = 12) -> int:
+    return int(_rpc(url, "eth_blockNumber", [], timeout), 16)
+
+
+def block_times(url: str, blocks: List[int], timeout: int = 12) -> Dict[int, int]:
+    calls = [("eth_getBlockByNumber", [hex(b), False]) for b in blocks]
+    out: Dict[int, int] = {}
+    for b, blk in zip(blocks, _rpc_batch(url, calls, timeout)):
+        out[b] = int((blk or {}).get("timestamp") or "0x0", 16)
+    return out
+
+
+def _is_range_error(e: ScanError) -> bool:
+    """eth_getLogs refused for its block span or result count (each provider words it differently)."""
+    text = str(e).lower()
+    return "eth_getlogs" in text and any(
+        s in text for s in ("range", "too many", "more than", "limit exceeded", "-32005")
+    )
+
+
+def _log_contract(log: Dict[str, Any], field: str) -> Optional[str]:
+    """New contract address from a log per RPC_CONTRACT_FIELD ("topic:N" / "data:N")."""
+    kind, _, idx = field.partition(":")
+    n = int(idx or 0)
+    if kind == "topic":
+        topics = log.get("topics") or []
+        word = topics[n][2:] if n < len(topics) else ""
+    elif kind == "data":
+        data = (log.get("data") or "0x")[2:]
+        word = data[n * 64:(n + 1) * 64]
+    else:
+        raise ScanError(f"Unknown RPC_CONTRACT_FIELD {field!r} (expected topic:N or data:N)")
+    if len(word) != 64:
+        return None
+    addr = "0x" + word[24:].lower()
+    return None if addr == "0x" + "0" * 40 else addr
+
+
+def log_to_result(lg: Dict[str, Any], field: str, ts: int) -> Optional[Dict[str, str]]:
+    """Result dict for a deployment log (None if the log carries no address)."""
+    addr = _log_contract(lg, field)
+    if not addr or not lg.get("transactionHash"):
+        return None
+    return {
+        "contract": addr,
+        "tx": lg["transactionHash"],
+        "block": str(int(lg["blockNumber"], 16)),
+        "utc": time.strftime("%Y-%m-%d %H:%M:%S", time.gmtime(ts)),
+    }
+
+
+def scan_logs_created_contracts(
+    since_block: int,
+    factory: str,
+    rpc_url: Optional[str] = None,
+    chain_id: int = 8453,
+    topic: Optional[str] = None,
+    contract_field: Optional[str] = None,
+    max_range: Optional[int] = None,
+    max_chunks: int = 10,
+    head: Optional[int] = None,
+    timeout: int = 12,
+) -> Tuple[List[Dict[str, str]], int]:
+    """Deployments logged by `factory` in blocks after `since_block`.
+
+    Polls eth_getLogs in chunks of `max_range` blocks up to the head (at most
+    `max_chunks` per call). A chunk the node rejects as too large is split in
+    half, and the smaller span is kept for the rest of the call. Returns
+    (results newest-first, cursor) where cursor is the last block fully covered.
+    """
+    url = rpc_url or rpc_url_for(chain_id)
+    if not url:
+        raise ScanError("RPC_URL is not set")
+    topic = topic or _get_env("RPC_EVENT_TOPIC")
+    if not topic:
+        raise ScanError("RPC_EVENT_TOPIC is not set")
+    field = contract_field or _get_env("RPC_CONTRACT_FIELD", "topic:1") or "topic:1"
+    step = int(max_range or _get_env("RPC_LOG_RANGE", "2000") or 2000)
+
+    head = block_number(url, timeout) if head is None else int(head)
+    cursor = int(since_block)
+    logs: List[Dict[str, Any]] = []
+    chunks = 0
+    while chunks < max_chunks and cursor < head:
+        lo, hi = cursor + 1, min(head, cursor + step)
+        try:
+            chunk = _rpc(
+                url,
+                "eth_getLogs",
+                [{"fromBlock": hex(lo), "toBlock": hex(hi), "address": factory, "topics": [topic]}],
+                timeout,
+            )
+        except ScanError as e:
+            if hi == lo or not _is_range_error(e):
+                raise
+            step = (hi - lo + 1) // 2
+            continue
+        chunks += 1
+        logs.extend(lg for lg in chunk or [] if not lg.get("removed"))
+        cursor = hi
+
+    found: List[Tuple[int, int, Dict[str, Any]]] = []
+    seen = set()
+    for lg in logs:
+        txh = lg.get("transactionHash")
+        if not _log_contract(lg, field) or not txh or txh in seen:
+            continue  # first deployment per tx, like the Etherscan backend
+        seen.add(txh)
+        found.append((int(lg["blockNumber"], 16), int(lg.get("logIndex") or "0x0", 16), lg))
+    times = block_times(url, sorted({b for b, _, _ in found}), timeout)
+
+    results: List[Dict[str, str]] = []
+    for blk, _, lg in sorted(found, key=lambda f: (f[0], f[1]), reverse=True):
+        res = log_to_result(lg, field, times.get(blk, 0))
+        if res:
+            results.append(res)
+    return results, cursor
@@ -1,12 +1,22 @@
 import os
+import re
+import threading
 import time
-from typing import Any, Dict, Optional
+from collections import deque
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Any, Dict, FrozenSet, Iterator, List, Optional, Set, Tuple
 
 import requests
 
+from app import metrics
+from app.httpclient import get_session
+from app.ratelimit import in_background, key_pool, limiter_for
+from app.trace_cache import TraceCache, default_cache
 
-# Default API base supports multi-chain via chainid param
-ETHERSCAN_V2 = "https://api.etherscan.io/v2/api"
+
+# Default API base supports multi-chain via chainid param; ETHERSCAN_API_URL
+# points the scanner elsewhere (a proxy, or the bench/ stub)
+ETHERSCAN_V2 = os.environ.get("ETHERSCAN_API_URL") or "https://api.etherscan.io/v2/api"
 
 
 class ScanError(Exception):
@@ -18,18 +28,96 @@ def _get_env(name: str, default: Optional[str] = None) -> Optional[str]:
     return v if v is not None and v != "" else default
 
 
-def _get_json(url: str, tries: int = 3, timeout: int = 12) -> Dict[str, Any]:
-    last_exc: Optional[Exception] = None
-    with requests.Session() as s:
-        for i in range(tries):
-            try:
-                r = s.get(url, timeout=timeout)
-                r.raise_for_status()
-                return r.json()
-            except Exception as e:  # broad: network, decoding, etc.
-                last_exc = e
-                time.sleep(0.4 + i * 0.4)
-    raise ScanError(f"HTTP failed: {last_exc}")
+def _get_json(url: str, timeout: int = 12) -> Dict[str, Any]:
+    # Connect/read errors, 429 and 5xx are retried with backoff by the shared pool
+    try:
+        r = get_session().get(url, timeout=timeout)
+        r.raise_for_status()
+        return r.json()
+    except Exception as e:  # broad: network, decoding, etc.
+        raise ScanError(f"HTTP failed: {e}")
+
+
+def _error_text(data: Dict[str, Any]) -> str:
+    if data.get("status") != "0":
+        return ""
+    return f"{data.get('message') or ''} {data.get('result') or ''}".lower()
+
+
+def _is_rate_limited(data: Dict[str, Any]) -> bool:
+    """Etherscan signals throttling in-band: status "0" with a rate-limit message."""
+    return "rate limit" in _error_text(data)
+
+
+def _key_problem(data: Dict[str, Any]) -> Optional[str]:
+    """"invalid_key" or "quota" when the answer is about the API key itself, else None."""
+    text = _error_text(data)
+    if "invalid api key" in text or "missing/invalid" in text:
+        return "invalid_key"
+    if "daily" in text and "limit" in text:
+        return "quota"
+    return None
+
+
+def _etherscan_get(
+    api_key: str,
+    params: Dict[str, Any],
+    timeout: int = 12,
+    api_base: str = ETHERSCAN_V2,
+) -> Dict[str, Any]:
+    """GET an Etherscan endpoint through the key's token bucket.
+
+    `api_key` may list several keys (see ETHERSCAN_API_KEYS); each attempt
+    then uses whichever key is ready first. Rate-limit payloads make that
+    key's bucket back off and the call is retried, up to RATE_LIMIT_RETRIES
+    times (default 5); invalid or exhausted keys leave the rotation and the
+    call moves on to another key.
+    """
+    pool = key_pool(api_key)
+    retries = int(_get_env("RATE_LIMIT_RETRIES", "5") or 5)
+    action = str(params.get("action"))
+    attempts = 0
+    while attempts <= retries:
+        key = pool.acquire()
+        if key is None:
+            raise ScanError("No usable Etherscan API key (daily quota spent or key rejected)")
+        limiter = limiter_for(key)
+        url = requests.Request("GET", api_base, params={**params, "apikey": key}).prepare().url
+        t0 = time.perf_counter()
+        try:
+            data = _get_json(url, timeout=timeout)
+        except ScanError:
+            metrics.ETHERSCAN_REQUESTS.inc(action, "error")
+            raise
+        finally:
+            metrics.ETHERSCAN_SECONDS.observe(time.perf_counter() - t0, action)
+        problem = _key_problem(data)
+        if problem == "quota" or (problem and len(pool.keys) > 1):
+            # A lone invalid key is passed through so the error says what is wrong
+            metrics.ETHERSCAN_REQUESTS.inc(action, problem)
+            if problem == "quota":
+                pool.exhausted(key)
+            else:
+                pool.invalid(key)
+            continue
+        if not _is_rate_limited(data):
+            metrics.ETHERSCAN_REQUESTS.inc(action, "ok")
+            limiter.reward()
+            return data
+        metrics.ETHERSCAN_REQUESTS.inc(action, "rate_limited")
+        attempts += 1
+        pause = limiter.penalize()
+        print(f"[scan] rate limited on {params.get('action')}; backing off {pause:.1f}s")
+    raise ScanError(f"Etherscan rate limit persisted after {retries} retries ({params.get('action')})")
+
+
+def _is_empty_result(data: Dict[str, Any]) -> bool:
+    """Etherscan answers an empty range with status "0" rather than an empty list."""
+    return (
+        data.get("status") == "0"
+        and data.get("result") == []
+        and "no transactions found" in str(data.get("message") or "").lower()
+    )
 
 
 def _fetch_txs_page(
@@ -40,22 +128,27 @@ def _fetch_txs_page(
     page_size: int = 100,
     timeout: int = 12,
     api_base: str = ETHERSCAN_V2,
+    start_block: int = 0,
+    sort: str = "desc",
+    end_block: int = 99999999,
 ) -> Any:
-    """Recent normal transactions (descending) for the deployer."""
+    """Normal transactions for the deployer in [start_block, end_block] (descending by default)."""
     params = {
         "chainid": chain_id,
         "module": "account",
         "action": "txlist",
         "address": deployer,
-        "startblock": 0,
-        "endblock": 99999999,
+        "startblock": start_block,
+        "endblock": end_block,
         "page": page,
         "offset": page_size,
-        "sort": "desc",
-        "apikey": api_key,
+        "sort": sort,
     }
-    url = requests.Request("GET", api_base, params=params).prepare().url
-    data = _get_json(url, timeout=timeout)
+    t0 = time.perf_counter()
+    data = _etherscan_get(api_key, params, timeout, api_base)
+    metrics.STAGE_SECONDS.observe(time.perf_counter() - t0, "txlist")
+    if _is_empty_result(data):
+        return []
     if data.get("status") != "1" or not isinstance(data.get("result"), list):
         raise ScanError(f"Etherscan error (txlist): {data}")
     return data["result"]
@@ -74,16 +167,328 @@ def _fetch_internal_for_tx(
         "module": "account",
         "action": "txlistinternal",
         "txhash": txhash,
-        "apikey": api_key,
     }
-    url = requests.Request("GET", api_base, params=params).prepare().url
-    data = _get_json(url, timeout=timeout)
+    data = _etherscan_get(api_key, params, timeout, api_base)
     # When there are no internal traces, many explorers respond with status "0"/"No transactions found".
-    if data.get("status") != "1":
+    if _is_empty_result(data):
+        return []
+    # Anything else that isn't a result list (rate limit, bad key, ...) must not
+    # read as "no CREATE": that verdict gets cached and the cursor moves past it.
+    if data.get("status") != "1" or not isinstance(data.get("result"), list):
+        raise ScanError(f"Etherscan error (txlistinternal): {data}")
+    return data["result"]
+
+
+def _fetch_internal_for_address(
+    api_key: str,
+    chain_id: int,
+    address: str,
+    start_block: int,
+    end_block: int,
+    page: int,
+    page_size: int = 1000,
+    timeout: int = 12,
+    api_base: str = ETHERSCAN_V2,
+) -> Any:
+    """One page of internal txs involving `address` within [start_block, end_block]."""
+    params = {
+        "chainid": chain_id,
+        "module": "account",
+        "action": "txlistinternal",
+        "address": address,
+        "startblock": start_block,
+        "endblock": end_block,
+        "page": page,
+        "offset": page_size,
+        "sort": "asc",
+    }
+    data = _etherscan_get(api_key, params, timeout, api_base)
+    if _is_empty_result(data):
         return []
+    if data.get("status") != "1" or not isinstance(data.get("result"), list):
+        raise ScanError(f"Etherscan error (txlistinternal): {data}")
     return data["result"]
 
 
+def _first_create(tx: Dict[str, Any], internals: Any) -> Optional[Dict[str, str]]:
+    """First internal CREATE/CREATE2 with a non-zero contractAddress, as a result dict."""
+    for it in internals:
+        caddr = (it.get("contractAddress") or "").lower()
+        if not caddr or caddr == "0x0000000000000000000000000000000000000000":
+            continue
+        typ = (it.get("type") or "").lower()
+        # Accept when type is "create" or "create2" (some explorers omit it)
+        if typ not in ("create", "create2", ""):
+            continue
+        # Use internal timestamp if present; otherwise parent tx's
+        ts = int(it.get("timeStamp") or tx.get("timeStamp") or 0)
+        return {
+            "contract": "0x" + caddr[2:] if caddr.startswith("0x") else caddr,
+            "tx": tx.get("hash"),
+            "block": tx.get("blockNumber"),
+            "utc": time.strftime("%Y-%m-%d %H:%M:%S", time.gmtime(ts)),
+        }
+    return None
+
+
+_LOOKUP = object()  # _local_verdict: only the internal traces can tell
+
+
+def _hex_set(name: str, width: int) -> FrozenSet[str]:
+    """Comma/whitespace separated hex values from env, lowercased and 0x-prefixed."""
+    out = set()
+    for part in re.split(r"[,\s]+", _get_env(name, "") or ""):
+        part = part.lower()
+        if part:
+            out.add((part if part.startswith("0x") else "0x" + part)[: 2 + width])
+    return frozenset(out)
+
+
+def _local_verdict(
+    tx: Dict[str, Any], factories: FrozenSet[str], selectors: FrozenSet[str]
+) -> Any:
+    """What txlist alone says about a parent tx: a result dict, None (deploys
+    nothing) or _LOOKUP when its internal traces must be fetched."""
+    if tx.get("isError") == "1" or tx.get("txreceipt_status") == "0":
+        return None  # reverted: whatever it created was rolled back
+    if not tx.get("to") and tx.get("contractAddress"):
+        # Top-level create: the deployed address is already in the txlist row
+        return _first_create(tx, [{"contractAddress": tx["contractAddress"], "type": "create"}])
+    if factories and (tx.get("to") or "").lower() not in factories:
+        return None
+    if selectors:
+        selector = (tx.get("methodId") or (tx.get("input") or "")[:10]).lower()
+        if selector not in selectors:
+            return None
+    return _LOOKUP
+
+
+def _settles_at(tx: Dict[str, Any]) -> float:
+    """When "no CREATE" becomes final for `tx`. txlistinternal indexing can
+    trail txlist by a few blocks, so a younger tx may still grow internal txs."""
+    return int(tx.get("timeStamp") or 0) + float(_get_env("TRACE_NEGATIVE_MIN_AGE", "30") or 0)
+
+
+def _settled(tx: Dict[str, Any]) -> bool:
+    return time.time() >= _settles_at(tx)
+
+
+def _cache_verdict(cache: TraceCache, chain_id: int, tx: Dict[str, Any], found: Optional[Dict[str, str]]) -> None:
+    """Cache a lookup; a young "no CREATE" only until it settles, then it is looked up once more."""
+    if found is None and not _settled(tx):
+        cache.put(chain_id, tx["hash"], None, expires=_settles_at(tx))
+    else:
+        cache.put(chain_id, tx["hash"], found)
+
+
+def _lookup_create(
+    api_key: str,
+    chain_id: int,
+    tx: Dict[str, Any],
+    timeout: int = 12,
+    api_base: str = ETHERSCAN_V2,
+    cache: Optional[TraceCache] = None,
+    refresh: bool = False,
+) -> Optional[Dict[str, str]]:
+    """_first_create for a parent tx, consulting the trace cache before the API.
+
+    With `refresh` only a cached CREATE is trusted, re-stamped with the block
+    and time the tx has now (a reorg can move it); "no CREATE" is fetched again.
+    """
+    cache = cache or default_cache()
+    txh = tx["hash"]
+    hit, found = cache.get(chain_id, txh)
+    if hit and found and refresh:
+        ts = int(tx.get("timeStamp") or 0)
+        return {**found, "block": tx.get("blockNumber"), "utc": time.strftime("%Y-%m-%d %H:%M:%S", time.gmtime(ts))}
+    if hit and not refresh:
+        return found
+    t0 = time.perf_counter()
+    internals = _fetch_internal_for_tx(api_key, chain_id, txh, timeout, api_base)
+    metrics.STAGE_SECONDS.observe(time.perf_counter() - t0, "internal")
+    found = _first_create(tx, internals)
+    _cache_verdict(cache, chain_id, tx, found)
+    return found
+
+
+def _sweep_creates(
+    api_key: str,
+    chain_id: int,
+    address: str,
+    start_block: int,
+    end_block: int,
+    timeout: int = 12,
+    api_base: str = ETHERSCAN_V2,
+    page_size: int = 1000,
+) -> Optional[Dict[str, List[Dict[str, Any]]]]:
+    """Internal txs of `address` over a block range, grouped by parent tx hash.
+
+    Returns None when the range holds more rows than Etherscan will page through.
+    """
+    by_tx: Dict[str, List[Dict[str, Any]]] = {}
+    # Etherscan caps page * offset at 10000 records per query
+    for page in range(1, 10000 // page_size + 1):
+        rows = _fetch_internal_for_address(
+            api_key, chain_id, address, start_block, end_block, page, page_size, timeout, api_base
+        )
+        for it in rows:
+            txh = (it.get("hash") or "").lower()
+            if txh:
+                by_tx.setdefault(txh, []).append(it)
+        if len(rows) < page_size:
+            return by_tx
+    return None
+
+
+def _iter_creates(
+    api_key: str,
+    chain_id: int,
+    txs: List[Dict[str, Any]],
+    timeout: int = 12,
+    api_base: str = ETHERSCAN_V2,
+    internal_mode: str = "tx",
+    sweep_address: Optional[str] = None,
+    refresh: bool = False,
+) -> Iterator[Tuple[Dict[str, Any], Optional[Dict[str, str]]]]:
+    """Yield (tx, first CREATE or None) for each parent tx, in the given order.
+
+    Txs that txlist already decides (see _local_verdict: reverted, top-level
+    creates, and with FACTORY_ADDRESSES / DEPLOY_SELECTORS set, calls that
+    cannot be a factory deploy) never reach txlistinternal.
+
+    internal_mode "tx" asks txlistinternal per tx hash, SCAN_CONCURRENCY
+    (default 4) at a time, so callers can still stop early. "address" resolves the whole page with a paged
+    txlistinternal?address= sweep over its block range and joins the rows to
+    the parent txs locally; it only sees CREATEs that `sweep_address` takes
+    part in, i.e. the address must be the factory that deploys. Only the
+    CREATEs a sweep finds are cached: its "no CREATE" holds for this call
+    alone, so a wrong sweep address can't outlive the scan in the cache.
+
+    `refresh` (re-validating after a reorg, where a tx may have moved blocks)
+    looks up again every tx without a cached CREATE; see _lookup_create.
+    """
+    cache = default_cache()
+    txs = [tx for tx in txs if tx.get("hash")]
+    factories = _hex_set("FACTORY_ADDRESSES", 40)
+    selectors = _hex_set("DEPLOY_SELECTORS", 8)
+    local: Dict[str, Any] = {}
+    for tx in txs:
+        verdict = _local_verdict(tx, factories, selectors)
+        if verdict is not _LOOKUP:
+            local[tx["hash"]] = verdict
+            metrics.PREFILTER.inc("create" if verdict else "skip")
+        else:
+            metrics.PREFILTER.inc("lookup")
+    if internal_mode == "address" and sweep_address:
+        pending = [
+            tx for tx in txs
+            if tx["hash"] not in local and (refresh or not cache.peek(chain_id, tx["hash"]))
+        ]
+        if pending:
+            blocks = [int(tx.get("blockNumber") or 0) for tx in pending]
+            t0 = time.perf_counter()
+            by_tx = _sweep_creates(
+                api_key, chain_id, sweep_address, min(blocks), max(blocks), timeout, api_base
+            )
+            metrics.STAGE_SECONDS.observe(time.perf_counter() - t0, "internal")
+            if by_tx is None:
+                print(f"[scan] internal sweep over blocks {min(blocks)}-{max(blocks)} too large; per-tx lookups")
+            else:
+                for tx in pending:
+                    found = _first_create(tx, by_tx.get(tx["hash"].lower(), []))
+                    local[tx["hash"]] = found
+                    if found:
+                        cache.put(chain_id, tx["hash"], found)
+    pool = _lookup_pool()
+    # Background work (backfill) looks up one tx at a time so it never holds
+    # pool workers that head tracking is waiting for
+    if pool is None or in_background() or len(txs) - len(local) <= 1:
+        for tx in txs:
+            if tx["hash"] in local:
+                yield tx, local[tx["hash"]]
+            else:
+                yield tx, _lookup_create(api_key, chain_id, tx, timeout, api_base, cache, refresh)
+        return
+
+    # Fan out over a bounded window of lookups (the token bucket still paces
+    # the actual calls) and yield strictly in input order. When the caller
+    # stops early, lookups that haven't started yet are cancelled.
+    window = _pool_workers
+    inflight: "deque[Tuple[Dict[str, Any], Optional[Future], Any]]" = deque()
+    busy = 0
+    todo = iter(txs)
+    try:
+        while True:
+            while busy < window:
+                tx = next(todo, None)
+                if tx is None:
+                    break
+                if tx["hash"] in local:
+                    inflight.append((tx, None, local[tx["hash"]]))
+                    continue
+                fut = pool.submit(_lookup_create, api_key, chain_id, tx, timeout, api_base, cache, refresh)
+                inflight.append((tx, fut, None))
+                busy += 1
+            if not inflight:
+                return
+            tx, fut, found = inflight.popleft()
+            if fut is not None:
+                busy -= 1
+                found = fut.result()
+            yield tx, found
+    finally:
+        for _tx, fut, _found in inflight:
+            if fut is not None:
+                fut.cancel()
+
+
+_pool: Optional[ThreadPoolExecutor] = None
+_pool_workers = 0
+_pool_lock = threading.Lock()
+
+
+def _lookup_pool() -> Optional[ThreadPoolExecutor]:
+    """Shared executor for internal-trace lookups; None when SCAN_CONCURRENCY <= 1."""
+    global _pool, _pool_workers
+    workers = int(_get_env("SCAN_CONCURRENCY", "4") or 4)
+    if workers <= 1:
+        return None
+    with _pool_lock:
+        if _pool is None:
+            _pool = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="trace-lookup")
+            _pool_workers = workers
+        return _pool
+
+
+def _resolve_mode(
+    internal_mode: Optional[str], sweep_address: Optional[str], deployer: str
+) -> Tuple[str, str]:
+    """(internal mode, sweep address); the address is "" in tx mode.
+
+    Address mode has no default sweep address: internal CREATE rows name the
+    factory, not the tx sender, so sweeping an EOA or relayer deployer would
+    read every tx as "no CREATE".
+    """
+    mode = (internal_mode or _get_env("INTERNAL_MODE") or "tx").strip().lower()
+    if mode not in ("tx", "address"):
+        raise ScanError(f"Unknown internal_mode {mode!r} (expected 'tx' or 'address')")
+    if mode == "tx":
+        return mode, ""
+    sweep_address = sweep_address or _get_env("SWEEP_ADDRESS")
+    if not sweep_address:
+        raise ScanError("INTERNAL_MODE=address needs SWEEP_ADDRESS (the factory contract that deploys)")
+    return mode, sweep_address.lower()
+
+
+def _resolve_args(api_key: Optional[str], deployer: Optional[str]) -> Tuple[str, str]:
+    api_key = api_key or _get_env("ETHERSCAN_API_KEYS") or _get_env("ETHERSCAN_API_KEY")
+    if not api_key:
+        raise ScanError("ETHERSCAN_API_KEY is not set")
+
+    deployer = (deployer or _get_env("DEPLOYER") or "0x048ef1062cbb39B338Ac2685dA72adf104b4cEF5").lower()
+    return api_key, deployer
+
+
 def scan_latest_created_contract(
     api_key: Optional[str] = None,
     deployer: Optional[str] = None,
@@ -92,42 +497,29 @@ def scan_latest_created_contract(
     page_size: int = 100,
     timeout: int = 12,
     api_base: str = ETHERSCAN_V2,
+    internal_mode: Optional[str] = None,
+    sweep_address: Optional[str] = None,
 ) -> Optional[Dict[str, str]]:
     """Walk recent parent txs → return first internal CREATE/CREATE2 with a contractAddress.
 
     Returns a dict with keys: contract, tx, block, utc; or None if not found.
+    `internal_mode` ("tx" or "address", default INTERNAL_MODE env or "tx") picks
+    how internal traces are fetched; see _iter_creates. `sweep_address`
+    defaults to SWEEP_ADDRESS env and is required in address mode.
     """
-    api_key = api_key or _get_env("ETHERSCAN_API_KEY")
-    if not api_key:
-        raise ScanError("ETHERSCAN_API_KEY is not set")
-
-    deployer = (deployer or _get_env("DEPLOYER") or "0x048ef1062cbb39B338Ac2685dA72adf104b4cEF5").lower()
+    api_key, deployer = _resolve_args(api_key, deployer)
+    internal_mode, sweep_address = _resolve_mode(internal_mode, sweep_address, deployer)
 
     for page in range(1, max_pages + 1):
         txs = _fetch_txs_page(api_key, chain_id, deployer, page, page_size, timeout, api_base)
-        for tx in txs:
-            txh = tx.get("hash")
-            if not txh:
-                continue
-            internals = _fetch_internal_for_tx(api_key, chain_id, txh, timeout, api_base)
-            # Look for internal creates with a non-zero contractAddress
-            for it in internals:
-                caddr = (it.get("contractAddress") or "").lower()
-                if not caddr or caddr == "0x0000000000000000000000000000000000000000":
-                    continue
-                typ = (it.get("type") or "").lower()
-                # Accept when type is "create" or "create2" (some explorers omit it)
-                if typ not in ("create", "create2", ""):
-                    continue
-                # Use internal timestamp if present; otherwise parent tx's
-                ts = int(it.get("timeStamp") or tx.get("timeStamp") or 0)
-                return {
-                    "contract": "0x" + caddr[2:] if caddr.startswith("0x") else caddr,
-                    "tx": txh,
-                    "block": tx.get("blockNumber"),
-                    "utc": time.strftime("%Y-%m-%d %H:%M:%S", time.gmtime(ts)),
-                }
-        time.sleep(0.12)  # polite to API
+        creates = _iter_creates(
+            api_key, chain_id, txs, timeout, api_base, internal_mode, sweep_address
+        )
+        for _tx, found in creates:
+            if found:
+                return found
+        if len(txs) < page_size:
+            break  # no older txs left
     return None
 
 
@@ -140,53 +532,222 @@ def scan_recent_created_contracts(
     timeout: int = 12,
     api_base: str = ETHERSCAN_V2,
     limit: int = 5,
+    internal_mode: Optional[str] = None,
+    sweep_address: Optional[str] = None,
 ):
     """Collect up to `limit` recent CREATE/CREATE2 contract deployments.
 
     Returns a list of dicts like scan_latest_created_contract, most recent first.
+    With internal_mode="address" a page of 100 parent txs costs one (or a few)
+    internal-trace requests instead of 100.
     """
-    api_key = api_key or _get_env("ETHERSCAN_API_KEY")
-    if not api_key:
-        raise ScanError("ETHERSCAN_API_KEY is not set")
-
-    deployer = (deployer or _get_env("DEPLOYER") or "0x048ef1062cbb39B338Ac2685dA72adf104b4cEF5").lower()
+    api_key, deployer = _resolve_args(api_key, deployer)
+    internal_mode, sweep_address = _resolve_mode(internal_mode, sweep_address, deployer)
 
     results = []
     seen_txs = set()
 
     for page in range(1, max_pages + 1):
-        txs = _fetch_txs_page(api_key, chain_id, deployer, page, page_size, timeout, api_base)
-        for tx in txs:
-            txh = tx.get("hash")
-            if not txh or txh in seen_txs:
-                continue
-            internals = _fetch_internal_for_tx(api_key, chain_id, txh, timeout, api_base)
-            found = None
-            for it in internals:
-                caddr = (it.get("contractAddress") or "").lower()
-                if not caddr or caddr == "0x0000000000000000000000000000000000000000":
-                    continue
-                typ = (it.get("type") or "").lower()
-                if typ not in ("create", "create2", ""):
-                    continue
-                ts = int(it.get("timeStamp") or tx.get("timeStamp") or 0)
-                found = {
-                    "contract": "0x" + caddr[2:] if caddr.startswith("0x") else caddr,
-                    "tx": txh,
-                    "block": tx.get("blockNumber"),
-                    "utc": time.strftime("%Y-%m-%d %H:%M:%S", time.gmtime(ts)),
-                }
-                break  # only first CREATE per tx
+        page_txs = _fetch_txs_page(api_key, chain_id, deployer, page, page_size, timeout, api_base)
+        txs = [tx for tx in page_txs if tx.get("hash") not in seen_txs]
+        creates = _iter_creates(
+            api_key, chain_id, txs, timeout, api_base, internal_mode, sweep_address
+        )
+        for tx, found in creates:
             if found:
-                seen_txs.add(txh)
-                results.insert(0, found)  # build oldest->newest then reinsert for newest-first after loop
-                # We'll normalize order to newest-first after loop anyway
-                # But inserting reversed may be confusing; we'll handle below
-                pass
+                seen_txs.add(tx["hash"])
+                results.append(found)  # txlist is newest-first, so results are too
             if len(results) >= limit:
-                # results collected in reverse page/tx order; sort newest-first by utc string lex order works (YYYY-mm-dd HH:MM:SS)
-                results_sorted = sorted(results, key=lambda r: r.get("utc") or "", reverse=True)
-                return results_sorted
-        time.sleep(0.12)
+                return results
+        if len(page_txs) < page_size:
+            break
+
+    return results
+
+
+_TXLIST_CAP = 10000  # Etherscan answers at most page * offset <= 10000 rows per query
+
 
-    return sorted(results, key=lambda r: r.get("utc") or "", reverse=True)
+def scan_created_contracts_before(
+    before_block: int,
+    api_key: Optional[str] = None,
+    deployer: Optional[str] = None,
+    chain_id: int = 8453,
+    page_size: int = 100,
+    timeout: int = 12,
+    api_base: str = ETHERSCAN_V2,
+    internal_mode: Optional[str] = None,
+    sweep_address: Optional[str] = None,
+    limit: Optional[int] = None,
+    skip: int = 0,
+) -> Tuple[List[Dict[str, str]], Optional[Tuple[int, int]]]:
+    """One backfill step: deployments among the deployer's txs at or below `before_block`.
+
+    `skip` is how many txs of `before_block` earlier steps already read.
+    Returns (results newest-first, (block, skip) for the next step), the
+    latter None once the deployer's oldest tx has been read. The position is
+    exact whether the step stopped at `limit` results or at the end of a
+    page, so no tx is read twice. Past the 10000-row cap of one query, the
+    rest of an oversized block is read oldest first (skip >= 10000), which
+    may read some of its txs again (History.merge drops the repeats); only a
+    block with more than 20000 of the deployer's txs loses its middle.
+    """
+    api_key, deployer = _resolve_args(api_key, deployer)
+    internal_mode, sweep_address = _resolve_mode(internal_mode, sweep_address, deployer)
+    before_block = int(before_block)
+    skip = max(0, int(skip))
+    ascending = skip >= _TXLIST_CAP
+    read_before = skip - _TXLIST_CAP if ascending else skip
+    page = read_before // page_size + 1
+
+    if ascending:
+        txs = _fetch_txs_page(
+            api_key, chain_id, deployer, page, page_size, timeout, api_base,
+            start_block=before_block, sort="asc", end_block=before_block,
+        )
+    else:
+        txs = _fetch_txs_page(
+            api_key, chain_id, deployer, page, page_size, timeout, api_base, end_block=before_block
+        )
+    todo = txs[read_before % page_size:]
+    results: List[Dict[str, str]] = []
+    read = 0
+    for tx, found in _iter_creates(api_key, chain_id, todo, timeout, api_base, internal_mode, sweep_address):
+        read += 1
+        if found:
+            results.append(found)
+        if limit is not None and len(results) >= limit:
+            break
+    done_page = read >= len(todo)
+
+    if ascending:
+        if done_page and len(txs) < page_size:
+            return results, (before_block - 1, 0) if before_block > 0 else None
+        if (read_before + read) // page_size * page_size + page_size > _TXLIST_CAP:
+            print(f"[scan] block {before_block}: read up to {_TXLIST_CAP} txs from each end; any between them are skipped")
+            return results, (before_block - 1, 0) if before_block > 0 else None
+        return results, (before_block, skip + read)
+
+    if done_page and len(txs) < page_size:
+        return results, None
+    # Where the next step starts: the first unread tx, or just past this page
+    edge = todo[read] if not done_page else txs[-1]
+    block = int(edge.get("blockNumber") or 0)
+    if block == before_block:
+        taken = skip + read
+    else:
+        taken = sum(1 for tx in todo[:read] if int(tx.get("blockNumber") or 0) == block)
+    if taken // page_size * page_size + page_size > _TXLIST_CAP:
+        print(f"[scan] block {block} holds more than {_TXLIST_CAP} txs; reading the rest of it oldest first")
+        return results, (block, _TXLIST_CAP)
+    return results, (block, taken)
+
+
+def latest_tx_block(
+    api_key: Optional[str] = None,
+    deployer: Optional[str] = None,
+    chain_id: int = 8453,
+    timeout: int = 12,
+    api_base: str = ETHERSCAN_V2,
+) -> Optional[int]:
+    """Block of the deployer's newest normal tx, or None if it has none yet."""
+    api_key, deployer = _resolve_args(api_key, deployer)
+    txs = _fetch_txs_page(api_key, chain_id, deployer, 1, 1, timeout, api_base)
+    if not txs:
+        return None
+    return int(txs[0].get("blockNumber") or 0)
+
+
+def chain_head(
+    api_key: Optional[str] = None,
+    chain_id: int = 8453,
+    timeout: int = 12,
+    api_base: str = ETHERSCAN_V2,
+) -> int:
+    """Current block number of the chain (Etherscan's eth_blockNumber proxy)."""
+    api_key, _deployer = _resolve_args(api_key, None)
+    params = {"chainid": chain_id, "module": "proxy", "action": "eth_blockNumber"}
+    data = _etherscan_get(api_key, params, timeout, api_base)
+    try:
+        return int(str(data.get("result")), 16)
+    except ValueError:
+        raise ScanError(f"Etherscan error (eth_blockNumber): {data}")
+
+
+def scan_new_created_contracts(
+    since_block: int,
+    api_key: Optional[str] = None,
+    deployer: Optional[str] = None,
+    chain_id: int = 8453,
+    max_pages: int = 10,
+    page_size: int = 100,
+    timeout: int = 12,
+    api_base: str = ETHERSCAN_V2,
+    internal_mode: Optional[str] = None,
+    sweep_address: Optional[str] = None,
+    end_block: int = 99999999,
+    refresh: bool = False,
+    returned: Optional[Set[str]] = None,
+) -> Tuple[List[Dict[str, str]], int]:
+    """Incremental scan: deployments in blocks after `since_block` (up to `end_block`).
+
+    Walks txlist oldest-first from `since_block + 1`, so in steady state this is a
+    single request returning few (or no) txs. Returns (results newest-first, cursor)
+    where cursor is the highest block whose txs were all processed (`end_block`
+    itself once a bounded range is read to its end); a full last page may end
+    mid-block, so that block is left for the next call. So is
+    any tx whose traces came back empty while younger than
+    TRACE_NEGATIVE_MIN_AGE (default 30s): once that age has passed it is
+    looked up again, rather than missed for good if txlistinternal was still
+    catching up. A bounded range with `refresh` (trust only cached CREATEs,
+    re-stamped with the tx's current block) is how pending deployments are
+    re-validated after a reorg.
+
+    Blocks left for the next call are read again, so pass the same
+    `returned` set on every call to get each deployment once: it holds the
+    txs already returned from blocks above the cursor, which are skipped,
+    and is updated in place.
+    """
+    api_key, deployer = _resolve_args(api_key, deployer)
+    internal_mode, sweep_address = _resolve_mode(internal_mode, sweep_address, deployer)
+
+    results: List[Dict[str, str]] = []
+    cursor = int(since_block)
+    factories = _hex_set("FACTORY_ADDRESSES", 40)
+    selectors = _hex_set("DEPLOY_SELECTORS", 8)
+    unsettled: Optional[int] = None  # block of the oldest tx to look up again
+    above: Dict[str, int] = {}  # every CREATE read, tx -> block, for `returned`
+    for page in range(1, max_pages + 1):
+        txs = _fetch_txs_page(
+            api_key, chain_id, deployer, page, page_size, timeout, api_base,
+            start_block=int(since_block) + 1, sort="asc", end_block=end_block,
+        )
+        creates = _iter_creates(
+            api_key, chain_id, txs, timeout, api_base, internal_mode, sweep_address, refresh
+        )
+        for tx, found in creates:
+            if found:
+                txh = found["tx"].lower()
+                above[txh] = int(found.get("block") or 0)
+                if returned is None or txh not in returned:
+                    results.append(found)
+            elif (
+                unsettled is None
+                and not _settled(tx)
+                and _local_verdict(tx, factories, selectors) is _LOOKUP
+            ):
+                unsettled = int(tx.get("blockNumber") or 0)
+        if txs:
+            last_block = int(txs[-1].get("blockNumber") or 0)
+            cursor = max(cursor, last_block if len(txs) < page_size else last_block - 1)
+        if len(txs) < page_size and end_block != 99999999:
+            cursor = max(cursor, int(end_block))  # a bounded range was read to its end, txs or not
+        if len(txs) < page_size or unsettled is not None:
+            break
+    if unsettled is not None:
+        cursor = max(int(since_block), min(cursor, unsettled - 1))
+    if returned is not None:
+        returned.clear()
+        returned.update(txh for txh, block in above.items() if block > cursor)
+    results.reverse()
+    return results, cursor
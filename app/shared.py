@@ -0,0 +1,202 @@
+"""Cross-worker coordination for gunicorn -w N (SQLite, WAL mode).
+
+Every worker runs create_app, but only the holder of a lease scans, streams
+and sends alerts. The leader writes each new snapshot (only when latest or
+history changed) and every live event, status ticks included, into this
+file; the other workers poll it and serve the same
+/api/latest, /api/history and /api/stream (same ETags, same event ids)
+without calling Etherscan themselves. If the leader stops renewing, a
+follower takes over once the lease expires; a lease left behind by a dead
+process on this host is taken over at once.
+
+Env: SHARED_STATE_FILE (default: <tmp>/contract-scanner-shared.db when
+WEB_CONCURRENCY > 1, as gunicorn.conf.py exports from the real worker count,
+or under a gunicorn that exports no count; otherwise "", which means no
+coordination: this worker always leads), LEADER_TTL_SECONDS (default 15),
+SHARED_POLL_SECONDS (follower poll interval, default 0.25).
+"""
+
+import json
+import os
+import socket
+import sqlite3
+import tempfile
+import threading
+import time
+from typing import Any, Dict, List, Optional, Tuple
+
+from app.history import encode
+
+
+_SCHEMA = (
+    "CREATE TABLE IF NOT EXISTS lease (name TEXT PRIMARY KEY, holder TEXT NOT NULL, expires REAL NOT NULL)",
+    "CREATE TABLE IF NOT EXISTS snapshots (key TEXT PRIMARY KEY, etag TEXT NOT NULL, body BLOB NOT NULL)",
+    "CREATE TABLE IF NOT EXISTS feed ("
+    " seq INTEGER PRIMARY KEY, key TEXT NOT NULL, kind TEXT NOT NULL, data TEXT NOT NULL)",
+)
+
+_LEASE = "scanner"
+
+# (seq, target key, kind, data)
+FeedRow = Tuple[int, str, str, Dict[str, Any]]
+
+
+def _default_path() -> str:
+    path = os.environ.get("SHARED_STATE_FILE")
+    if path is not None:
+        return path
+    workers = os.environ.get("WEB_CONCURRENCY")
+    if workers is None:
+        # gunicorn without gunicorn.conf.py: the worker count is unknown, so
+        # coordinate rather than risk one leader per worker
+        if not os.environ.get("SERVER_SOFTWARE", "").startswith("gunicorn/"):
+            return ""
+    elif int(workers or 1) <= 1:
+        return ""  # a single worker has nobody to coordinate with
+    return os.path.join(tempfile.gettempdir(), "contract-scanner-shared.db")
+
+
+def _holder_is_dead(holder: str) -> bool:
+    """True if `holder` names a process on this host that no longer exists."""
+    host, _, rest = holder.partition(":")
+    pid = rest.partition(":")[0]
+    if os.name != "posix" or host != socket.gethostname() or not pid.isdigit():
+        return False
+    try:
+        os.kill(int(pid), 0)
+    except ProcessLookupError:
+        return True
+    except OSError:
+        return False
+    return False
+
+
+class SharedState:
+    def __init__(self, path: Optional[str] = None, ttl: Optional[float] = None, feed_max: int = 1024):
+        self.path = _default_path() if path is None else path
+        self.ttl = float(ttl if ttl is not None else os.environ.get("LEADER_TTL_SECONDS", "15"))
+        self.poll_seconds = float(os.environ.get("SHARED_POLL_SECONDS", "0.25"))
+        self.feed_max = max(1, int(feed_max))
+        self.holder = f"{socket.gethostname()}:{os.getpid()}:{time.time():.6f}"
+        self.is_leader = not self.enabled
+        self.elections = 0
+        self._expires = 0.0
+        self._local = threading.local()
+        if self.enabled:
+            db = self._connect()
+            db.execute("PRAGMA journal_mode=WAL")
+            for stmt in _SCHEMA:
+                db.execute(stmt)
+            db.commit()
+
+    @property
+    def enabled(self) -> bool:
+        return bool(self.path)
+
+    def _connect(self) -> sqlite3.Connection:
+        db = getattr(self._local, "db", None)
+        if db is None:
+            db = sqlite3.connect(self.path, timeout=10)
+            db.execute("PRAGMA synchronous=NORMAL")
+            self._local.db = db
+        return db
+
+    # --- lease ---
+    def try_lead(self) -> bool:
+        """Take or renew the lease; returns whether this process leads now."""
+        if not self.enabled:
+            return True
+        now = time.time()
+        db = self._connect()
+        try:
+            db.execute("BEGIN IMMEDIATE")
+            row = db.execute("SELECT holder, expires FROM lease WHERE name = ?", (_LEASE,)).fetchone()
+            leading = row is None or row[0] == self.holder or row[1] < now or _holder_is_dead(row[0])
+            if leading:
+                db.execute(
+                    "INSERT OR REPLACE INTO lease (name, holder, expires) VALUES (?, ?, ?)",
+                    (_LEASE, self.holder, now + self.ttl),
+                )
+            db.commit()
+        except sqlite3.Error as e:
+            db.rollback()
+            print(f"[shared] lease renewal failed: {e}")
+            # Keep leading only while the lease we already hold is valid
+            leading = self.is_leader and time.time() < self._expires
+        else:
+            if leading:
+                self._expires = now + self.ttl
+        if leading and not self.is_leader:
+            self.elections += 1
+        self.is_leader = leading
+        return leading
+
+    def release(self) -> None:
+        if not self.enabled or not self.is_leader:
+            return
+        self.is_leader = False
+        try:
+            db = self._connect()
+            with db:
+                db.execute("DELETE FROM lease WHERE name = ? AND holder = ?", (_LEASE, self.holder))
+        except sqlite3.Error as e:
+            print(f"[shared] lease release failed: {e}")
+
+    # --- leader side ---
+    def put(self, key: str, etag: str, body: Optional[bytes], feed: List[FeedRow]) -> None:
+        """Store a target's snapshot body (None: unchanged) and the events it produced, in one transaction."""
+        if not self.enabled or not self.is_leader or (body is None and not feed):
+            return
+        try:
+            db = self._connect()
+            with db:
+                if body is not None:
+                    db.execute(
+                        "INSERT OR REPLACE INTO snapshots (key, etag, body) VALUES (?, ?, ?)",
+                        (key, etag, sqlite3.Binary(body)),
+                    )
+                if feed:
+                    db.executemany(
+                        "INSERT OR REPLACE INTO feed (seq, key, kind, data) VALUES (?, ?, ?, ?)",
+                        [(seq, k, kind, json.dumps(data, default=encode)) for seq, k, kind, data in feed],
+                    )
+                    db.execute("DELETE FROM feed WHERE seq <= ?", (feed[-1][0] - self.feed_max,))
+        except sqlite3.Error as e:
+            print(f"[shared] failed to publish {key}: {e}")
+
+    def last_seq(self) -> int:
+        if not self.enabled:
+            return 0
+        row = self._connect().execute("SELECT MAX(seq) FROM feed").fetchone()
+        return int(row[0] or 0)
+
+    # --- follower side ---
+    def changed_snapshots(self, etags: Dict[str, str]) -> List[Tuple[str, str, bytes]]:
+        """(key, etag, body) for every stored snapshot whose etag differs from `etags`."""
+        if not self.enabled:
+            return []
+        db = self._connect()
+        out: List[Tuple[str, str, bytes]] = []
+        for key, etag in db.execute("SELECT key, etag FROM snapshots").fetchall():
+            if etags.get(key) == etag:
+                continue
+            row = db.execute("SELECT etag, body FROM snapshots WHERE key = ?", (key,)).fetchone()
+            if row is not None:
+                out.append((key, row[0], bytes(row[1])))
+        return out
+
+    def feed_after(self, seq: int, limit: int = 1000) -> List[FeedRow]:
+        if not self.enabled:
+            return []
+        rows = self._connect().execute(
+            "SELECT seq, key, kind, data FROM feed WHERE seq > ? ORDER BY seq LIMIT ?", (int(seq), int(limit))
+        ).fetchall()
+        return [(s, k, kind, json.loads(data)) for s, k, kind, data in rows]
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "enabled": self.enabled,
+            "leader": self.is_leader,
+            "elections": self.elections,
+            "holder": self.holder,
+        }
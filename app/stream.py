@@ -0,0 +1,156 @@
+"""Push-based detection over a WebSocket JSON-RPC subscription.
+
+Subscribes to `newHeads` and to `logs` filtered by factory address and event
+topic, so a deployment is reported as soon as the node sees its block
+instead of on the next poll. Block timestamps come from the newHeads
+stream itself. On every (re)connect `on_connect` runs first so the caller
+can fill the gap with the polling backend; after a disconnect the stream
+retries with exponential backoff (1s .. 30s).
+
+Needs the `websocket-client` package; env: RPC_WS_URL or RPC_WS_URL_<chain_id>.
+"""
+
+import json
+import threading
+import time
+from typing import Any, Callable, Dict, List, Optional
+
+from app.rpc import log_to_result
+from app.scan import _get_env
+
+
+def ws_url_for(chain_id: int) -> Optional[str]:
+    return _get_env(f"RPC_WS_URL_{int(chain_id)}") or _get_env("RPC_WS_URL")
+
+
+class LogStream:
+    def __init__(
+        self,
+        ws_url: str,
+        factory: str,
+        topic: str,
+        contract_field: str,
+        on_connect: Callable[[], None],
+        on_head: Callable[[int], None],
+        on_found: Callable[[List[Dict[str, str]]], None],
+        stop_event: threading.Event,
+        name: str = "stream",
+        idle_timeout: float = 30.0,
+    ):
+        self.ws_url = ws_url
+        self.factory = factory
+        self.topic = topic
+        self.contract_field = contract_field
+        self.on_connect = on_connect
+        self.on_head = on_head
+        self.on_found = on_found
+        self.stop_event = stop_event
+        self.name = name
+        self.idle_timeout = idle_timeout
+        self.connected = False
+        self.reconnects = 0
+        self.messages = 0
+        self.last_lag_seconds: Optional[float] = None
+        self._head_times: Dict[int, int] = {}
+        self._thread: Optional[threading.Thread] = None
+        self._ws: Any = None
+
+    def start(self) -> None:
+        self._thread = threading.Thread(target=self._run, name=self.name, daemon=True)
+        self._thread.start()
+
+    def stop(self, timeout: float = 5.0) -> None:
+        """Set the stop event and wait for the thread; closing the socket ends a blocked recv."""
+        self.stop_event.set()
+        ws = self._ws
+        if ws is not None:
+            try:
+                ws.close()
+            except Exception:
+                pass
+        if self._thread is not None:
+            self._thread.join(timeout)
+            self._thread = None
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "connected": self.connected,
+            "reconnects": self.reconnects,
+            "messages": self.messages,
+            "last_lag_seconds": self.last_lag_seconds,
+        }
+
+    def _run(self) -> None:
+        import websocket  # websocket-client; imported here so polling-only setups don't need it
+
+        backoff = 1.0
+        while not self.stop_event.is_set():
+            ws = None
+            try:
+                ws = self._ws = websocket.create_connection(self.ws_url, timeout=self.idle_timeout)
+                subs = self._subscribe(ws)
+                self.connected = True
+                print(f"[stream] {self.name} connected")
+                # Fill whatever we missed while disconnected before consuming pushes
+                self.on_connect()
+                backoff = 1.0
+                while not self.stop_event.is_set():
+                    self._handle(json.loads(ws.recv()), subs)
+            except Exception as e:  # network, timeout, protocol: reconnect
+                if self.stop_event.is_set():
+                    break
+                self.reconnects += 1
+                print(f"[stream] {self.name} disconnected ({e}); reconnecting in {backoff:.0f}s")
+            finally:
+                self.connected = False
+                self._ws = None
+                if ws is not None:
+                    try:
+                        ws.close()
+                    except Exception:
+                        pass
+            self.stop_event.wait(backoff)
+            backoff = min(30.0, backoff * 2)
+
+    def _subscribe(self, ws: Any) -> Dict[str, str]:
+        """eth_subscribe newHeads + logs; returns subscription id -> kind."""
+        requests = [
+            (1, "newHeads", ["newHeads"]),
+            (2, "logs", ["logs", {"address": self.factory, "topics": [self.topic]}]),
+        ]
+        for rid, _kind, params in requests:
+            ws.send(json.dumps({"jsonrpc": "2.0", "id": rid, "method": "eth_subscribe", "params": params}))
+        kinds = {rid: kind for rid, kind, _ in requests}
+        subs: Dict[str, str] = {}
+        while len(subs) < len(requests):
+            msg = json.loads(ws.recv())
+            if msg.get("id") in kinds:
+                if msg.get("error"):
+                    raise RuntimeError(f"eth_subscribe {kinds[msg['id']]} failed: {msg['error']}")
+                subs[msg["result"]] = kinds[msg["id"]]
+        return subs
+
+    def _handle(self, msg: Dict[str, Any], subs: Dict[str, str]) -> None:
+        params = msg.get("params") or {}
+        kind = subs.get(params.get("subscription"))
+        result = params.get("result")
+        if not kind or not isinstance(result, dict):
+            return
+        self.messages += 1
+        if kind == "newHeads":
+            number = int(result["number"], 16)
+            self._head_times[number] = int(result.get("timestamp") or "0x0", 16)
+            for old in [b for b in self._head_times if b < number - 64]:
+                del self._head_times[old]
+            # Logs for a head are pushed alongside it, so everything before it is complete
+            self.on_head(number - 1)
+            return
+        if result.get("removed"):
+            return
+        block = int(result["blockNumber"], 16)
+        now = time.time()
+        ts = self._head_times.get(block) or int(now)
+        found = log_to_result(result, self.contract_field, ts)
+        if found:
+            self.last_lag_seconds = round(now - ts, 3)
+            self.on_found([found])
@@ -0,0 +1,221 @@
+"""Watch list: the (chain, deployer) pairs one scanner process watches.
+
+Configured with WATCHLIST, a comma/whitespace separated list of
+`chain_id:deployer` entries (a bare address uses CHAIN_ID), or WATCHLIST_FILE,
+a JSON list of `{"chain_id": 8453, "deployer": "0x..", "interval_seconds": 10,
+"backend": "rpc"}` objects (interval and backend optional; backend defaults
+to SCAN_BACKEND). Without either, the single CHAIN_ID/DEPLOYER
+pair is watched as before.
+"""
+
+import json
+import os
+import re
+import threading
+import time
+from typing import Any, Dict, List, Optional, Set, Tuple
+
+from app.history import Deployment, History, encode
+
+
+DEFAULT_DEPLOYER = "0x048ef1062cbb39B338Ac2685dA72adf104b4cEF5"
+
+# Block explorer per chain id, for links in the UI and alerts
+EXPLORERS = {
+    1: "https://etherscan.io",
+    10: "https://optimistic.etherscan.io",
+    8453: "https://basescan.org",
+    42161: "https://arbiscan.io",
+    7777777: "https://explorer.zora.energy",
+}
+
+# zora.co/coin/<slug>:<address> prefix per chain id
+ZORA_SLUGS = {
+    1: "eth",
+    8453: "base",
+    7777777: "zora",
+}
+
+_ADDRESS_RE = re.compile(r"^0x[0-9a-fA-F]{40}$")
+
+# Part of every ETag, so a restarted process never matches a client's old copy
+_BOOT_ID = format(int(time.time()), "x")
+
+
+class Snapshot:
+    """Immutable published view of a target's state for the read endpoints.
+
+    Built by the scanner under the target lock and swapped in with a single
+    attribute assignment; readers take no lock. The JSON body is encoded at
+    most once per version, on first request. state["history"] is only the
+    newest LATEST_HISTORY records; `pending` is every unconfirmed one.
+    """
+
+    __slots__ = ("state", "version", "etag", "pending", "_full", "_slim")
+
+    def __init__(self, state: Dict[str, Any], etag: str, pending: Tuple[Deployment, ...] = ()):
+        self.state = state
+        self.version = state.get("version", 0)
+        self.etag = etag
+        self.pending = pending
+        self._full: Optional[bytes] = None
+        self._slim: Optional[bytes] = None
+
+    def body(self, with_history: bool = True) -> bytes:
+        # A race here only means two threads encode the same bytes once each
+        if with_history:
+            if self._full is None:
+                self._full = json.dumps(
+                    self.state, sort_keys=True, separators=(",", ":"), default=encode
+                ).encode("utf-8")
+            return self._full
+        if self._slim is None:
+            slim = {k: v for k, v in self.state.items() if k != "history"}
+            self._slim = json.dumps(slim, sort_keys=True, separators=(",", ":")).encode("utf-8")
+        return self._slim
+
+
+class Target:
+    """One watched (chain, deployer) pair with its own state, history and schedule."""
+
+    def __init__(
+        self,
+        chain_id: int,
+        deployer: str,
+        interval_seconds: int,
+        backend: str = "etherscan",
+        history_max: int = 50,
+        latest_history: int = 50,
+    ):
+        self.chain_id = int(chain_id)
+        self.deployer = deployer.lower()
+        self.interval_seconds = int(interval_seconds)
+        self.backend = backend  # "etherscan" (txlist + internal traces) or "rpc" (eth_getLogs)
+        self.explorer = EXPLORERS.get(self.chain_id, "https://blockscan.com")
+        self.lock = threading.Lock()  # guards state
+        self.scan_lock = threading.Lock()  # one scan/gap fill at a time
+        self.next_due = 0.0
+        self.running = False
+        self.stream: Optional[Any] = None  # app.stream.LogStream when pushing live
+        self.returned: Set[str] = set()  # txs the Etherscan scan already reported above the cursor
+        self.misses: Dict[str, int] = {}  # pending tx -> consecutive confirmation re-reads without it
+        self.history = History(history_max)  # recent results, most recent first; guarded by lock
+        self.latest_history = int(latest_history)  # newest records published in /api/latest
+        self.snapshot: Snapshot
+        self.state: Dict[str, Any] = {
+            "latest": None,  # type: Optional[Dict[str, Any]]
+            "started_at": time.strftime("%Y-%m-%d %H:%M:%S", time.gmtime()),
+            "version": 0,  # bumped when latest or history changes; ETag of /api/latest
+            "history_version": 0,  # bumped only when history changes
+            "chain_id": self.chain_id,
+            "deployer": self.deployer,
+            "explorer": self.explorer,
+            "interval_seconds": self.interval_seconds,
+            "backend": self.backend,
+        }
+        # Run counters and stats change every tick, so they stay out of the
+        # versioned snapshot (/api/status, "status" events); replaced whole, never mutated
+        self.status: Dict[str, Any] = {
+            "last_run_utc": None,  # type: Optional[str]
+            "last_error": None,  # type: Optional[str]
+            "runs": 0,
+            "cursor_block": None,  # highest fully-processed block for the deployer
+            "backfill_block": None,  # bootstrap backfill still to scan blocks <= this; None when done
+            "trace_cache": None,  # internal-trace cache size and hit/miss counters
+            "rate_limit": None,  # per-key token bucket: throttle wait time, rate-limit hits
+            "notify": None,  # alert delivery queue: pending, delivered, retries
+            "events": None,  # durable event store writer: queued, written, batches
+        }
+        self.publish()
+
+    @property
+    def key(self) -> str:
+        return f"{self.chain_id}:{self.deployer}"
+
+    def publish(self, etag: Optional[str] = None) -> None:
+        """Swap in a snapshot of the current state; call with `lock` held after a change.
+
+        `etag` is given when mirroring another worker's snapshot (app/shared.py),
+        whose history_size is kept: a follower only holds the published head.
+        Costs O(latest_history + pending), not O(history).
+        """
+        view = dict(self.state)
+        view["history"] = self.history.head(self.latest_history)
+        if etag is None:
+            view["history_size"] = len(self.history)
+        self.snapshot = Snapshot(
+            view,
+            etag or f"{_BOOT_ID}-{self.chain_id}-{self.deployer}-{view.get('version', 0)}",
+            self.history.pending(),
+        )
+
+    def summary(self) -> Dict[str, Any]:
+        state, status = self.snapshot.state, self.status
+        return {
+            "chain_id": self.chain_id,
+            "deployer": self.deployer,
+            "latest": state.get("latest"),
+            "last_run_utc": status.get("last_run_utc"),
+            "last_error": status.get("last_error"),
+            "runs": status.get("runs"),
+            "history_size": state.get("history_size", 0),
+        }
+
+
+def _parse_entry(entry: str, default_chain_id: int) -> Optional[Dict[str, Any]]:
+    entry = entry.strip()
+    if not entry:
+        return None
+    chain_part, _, addr = entry.rpartition(":")
+    chain_id = int(chain_part) if chain_part else default_chain_id
+    if not _ADDRESS_RE.match(addr):
+        raise ValueError(f"invalid watch list entry {entry!r} (expected chain_id:0xaddress)")
+    return {"chain_id": chain_id, "deployer": addr}
+
+
+def load_watchlist(
+    default_chain_id: int,
+    default_deployer: Optional[str],
+    default_interval: int,
+    history_max: int = 50,
+    latest_history: int = 50,
+) -> List[Target]:
+    entries: List[Dict[str, Any]] = []
+    path = os.environ.get("WATCHLIST_FILE")
+    if path:
+        with open(path, "r", encoding="utf-8") as f:
+            raw = json.load(f)
+        for item in raw:
+            if isinstance(item, str):
+                parsed = _parse_entry(item, default_chain_id)
+                if parsed:
+                    entries.append(parsed)
+            else:
+                entries.append(dict(item))
+    for part in re.split(r"[,\s]+", os.environ.get("WATCHLIST") or ""):
+        parsed = _parse_entry(part, default_chain_id)
+        if parsed:
+            entries.append(parsed)
+    if not entries:
+        entries.append({"chain_id": default_chain_id, "deployer": default_deployer or DEFAULT_DEPLOYER})
+
+    default_backend = (os.environ.get("SCAN_BACKEND") or "etherscan").strip().lower()
+    targets: List[Target] = []
+    seen = set()
+    for e in entries:
+        backend = str(e.get("backend") or default_backend).lower()
+        if backend not in ("etherscan", "rpc"):
+            raise ValueError(f"unknown scan backend {backend!r} (expected etherscan or rpc)")
+        t = Target(
+            int(e.get("chain_id") or default_chain_id),
+            str(e["deployer"]),
+            int(e.get("interval_seconds") or default_interval),
+            backend,
+            history_max,
+            latest_history,
+        )
+        if t.key in seen:
+            continue
+        seen.add(t.key)
+        targets.append(t)
+    return targets
@@ -0,0 +1,138 @@
+"""Cache of internal-trace lookups: (chain_id, txhash) -> created contract or "none".
+
+Internal traces of a mined tx never change, so a verdict is cached for good:
+either the result dict for its first CREATE/CREATE2, or None when it created
+nothing. The exception is a None for a tx younger than Etherscan's internal-tx
+indexing lag: it is stored with an expiry (memory only) and looked up once
+more after that (see app/scan.py _settled). Entries live in a bounded in-memory LRU, optionally backed by a
+SQLite file so they survive restarts.
+"""
+
+import json
+import os
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Dict, Optional, Tuple
+
+
+class TraceCache:
+    def __init__(self, maxsize: int = 50000, path: Optional[str] = None):
+        self.maxsize = max(1, int(maxsize))
+        self.path = path
+        self._lru: "OrderedDict[Tuple[int, str], Optional[Dict[str, Any]]]" = OrderedDict()
+        self._expires: Dict[Tuple[int, str], float] = {}  # provisional verdicts only
+        self._lock = threading.Lock()
+        self._db: Optional[sqlite3.Connection] = None
+        self.hits = 0
+        self.misses = 0
+        if path:
+            self._db = sqlite3.connect(path, check_same_thread=False)
+            self._db.execute(
+                "CREATE TABLE IF NOT EXISTS traces ("
+                " chain_id INTEGER NOT NULL, tx TEXT NOT NULL, result TEXT,"
+                " PRIMARY KEY (chain_id, tx))"
+            )
+            self._db.commit()
+
+    def get(self, chain_id: int, txhash: str) -> Tuple[bool, Optional[Dict[str, Any]]]:
+        """Returns (hit, result); result is None for a cached "no CREATE"."""
+        key = (int(chain_id), txhash.lower())
+        with self._lock:
+            if key in self._lru and self._expires.get(key, float("inf")) <= time.time():
+                del self._lru[key]
+                del self._expires[key]
+            if key in self._lru:
+                self._lru.move_to_end(key)
+                self.hits += 1
+                return True, self._lru[key]
+            if self._db is not None:
+                row = self._db.execute(
+                    "SELECT result FROM traces WHERE chain_id = ? AND tx = ?", key
+                ).fetchone()
+                if row is not None:
+                    value = json.loads(row[0]) if row[0] else None
+                    self._remember(key, value)
+                    self.hits += 1
+                    return True, value
+            self.misses += 1
+            return False, None
+
+    def peek(self, chain_id: int, txhash: str) -> bool:
+        """Whether a verdict is cached, without touching the LRU order or the hit/miss counters."""
+        key = (int(chain_id), txhash.lower())
+        with self._lock:
+            if key in self._lru:
+                return self._expires.get(key, float("inf")) > time.time()
+            if self._db is None:
+                return False
+            return self._db.execute(
+                "SELECT 1 FROM traces WHERE chain_id = ? AND tx = ?", key
+            ).fetchone() is not None
+
+    def put(
+        self, chain_id: int, txhash: str, result: Optional[Dict[str, Any]], expires: Optional[float] = None
+    ) -> None:
+        """Store a verdict; with `expires` (wall clock) it is provisional and never persisted."""
+        key = (int(chain_id), txhash.lower())
+        with self._lock:
+            self._remember(key, result)
+            if expires is not None:
+                self._expires[key] = expires
+                return
+            self._expires.pop(key, None)
+            if self._db is not None:
+                self._db.execute(
+                    "INSERT OR REPLACE INTO traces (chain_id, tx, result) VALUES (?, ?, ?)",
+                    (key[0], key[1], json.dumps(result) if result else None),
+                )
+                self._db.commit()
+
+    def _remember(self, key: Tuple[int, str], value: Optional[Dict[str, Any]]) -> None:
+        self._lru[key] = value
+        self._lru.move_to_end(key)
+        while len(self._lru) > self.maxsize:
+            self._expires.pop(self._lru.popitem(last=False)[0], None)
+
+    def clear(self) -> None:
+        """Forget every verdict (memory and file) and reset the counters."""
+        with self._lock:
+            self._lru.clear()
+            self._expires.clear()
+            self.hits = self.misses = 0
+            if self._db is not None:
+                self._db.execute("DELETE FROM traces")
+                self._db.commit()
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            total = self.hits + self.misses
+            return {
+                "size": len(self._lru),
+                "maxsize": self.maxsize,
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_ratio": round(self.hits / total, 4) if total else None,
+                "persistent": self._db is not None,
+            }
+
+
+_default: Optional[TraceCache] = None
+_default_lock = threading.Lock()
+
+
+def default_cache(path: Optional[str] = None) -> TraceCache:
+    """Process-wide cache configured from TRACE_CACHE_SIZE / TRACE_CACHE_FILE.
+
+    `path` stands in for TRACE_CACHE_FILE; it only counts on the first call,
+    which creates the cache.
+    """
+    global _default
+    with _default_lock:
+        if _default is None:
+            _default = TraceCache(
+                maxsize=int(os.environ.get("TRACE_CACHE_SIZE", "50000")),
+                path=path or os.environ.get("TRACE_CACHE_FILE") or None,
+            )
+        return _default
@@ -0,0 +1,76 @@
+"""Warm-start helpers for the serverless functions (api/scan.py, api/latest.py).
+
+A function invocation may run on a fresh container, but warm containers keep
+/tmp, and KV (when configured) outlives both. Keeping the block cursor there
+turns each invocation into one incremental txlist query for blocks after
+the cursor, instead of a multi-page sweep from the newest transaction
+backwards. The functions open the internal-trace cache on a SQLite file in
+/tmp for the same reason (see trace_cache_path).
+
+Env: SERVERLESS_STATE_FILE (default: <tmp>/contract-scanner-serverless.json),
+TRACE_CACHE_FILE (default: <tmp>/contract-scanner-traces.db).
+"""
+
+import json
+import os
+import tempfile
+from typing import Any, Dict, List, Optional, Set, Tuple
+
+from app.scan import latest_tx_block, scan_latest_created_contract, scan_new_created_contracts
+
+
+def trace_cache_path() -> str:
+    """Where the functions keep the trace cache: pass to default_cache() before the first scan."""
+    return os.environ.get("TRACE_CACHE_FILE") or os.path.join(tempfile.gettempdir(), "contract-scanner-traces.db")
+
+
+def _state_path() -> str:
+    return os.environ.get("SERVERLESS_STATE_FILE") or os.path.join(
+        tempfile.gettempdir(), "contract-scanner-serverless.json"
+    )
+
+
+def load_local() -> Dict[str, Any]:
+    """State left in /tmp by an earlier invocation on this container ({} when cold)."""
+    try:
+        with open(_state_path(), "r", encoding="utf-8") as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return {}
+
+
+def save_local(state: Dict[str, Any]) -> None:
+    path = _state_path()
+    try:
+        fd, tmp = tempfile.mkstemp(prefix=".serverless-", dir=os.path.dirname(os.path.abspath(path)))
+        with os.fdopen(fd, "w", encoding="utf-8") as f:
+            json.dump(state, f)
+        os.replace(tmp, path)
+    except OSError as e:
+        print(f"[warm] failed to write {path}: {e}")
+
+
+def scan_step(
+    cursor: Optional[int],
+    api_key: Optional[str],
+    deployer: Optional[str],
+    chain_id: int,
+    max_pages: int = 10,
+    returned: Optional[Set[str]] = None,
+) -> Tuple[List[Dict[str, str]], int]:
+    """(new results newest first, new cursor).
+
+    Cold (no cursor): pin the deployer's head block, then find the latest
+    creation with up to `max_pages` pages. Warm: only blocks after the cursor;
+    `returned` is scan_new_created_contracts' set of txs already reported
+    above it, kept alongside the cursor.
+    """
+    if cursor is None:
+        head = latest_tx_block(api_key=api_key, deployer=deployer, chain_id=chain_id) or 0
+        latest = scan_latest_created_contract(
+            api_key=api_key, deployer=deployer, chain_id=chain_id, max_pages=max_pages
+        )
+        return ([latest] if latest else []), head
+    return scan_new_created_contracts(
+        cursor, api_key=api_key, deployer=deployer, chain_id=chain_id, max_pages=max_pages, returned=returned
+    )
@@ -1,37 +1,79 @@
+import atexit
+import calendar
+import json
 import os
 import threading
 import time
-from typing import Any, Dict, Optional
+from concurrent.futures import ThreadPoolExecutor
+from itertools import islice
+from typing import Any, Dict, List, Optional, Tuple
 
-import requests
+from flask import Flask, Response, jsonify, render_template, request, abort
 
-from flask import Flask, jsonify, render_template, request, abort
-
-from app.scan import scan_latest_created_contract, ScanError
+from app import metrics
+from app.broadcast import Broadcaster
+from app.cursor import CursorStore
+from app.events import EventStore
+from app.history import Deployment
+from app.httpclient import get_session
+from app.notify import DeliveryError, NotificationQueue, telegram_post
+from app.ratelimit import background, limiter_stats
+from app.rpc import block_number, rpc_url_for, scan_logs_created_contracts
+from app.shared import SharedState
+from app.scan import (
+    chain_head,
+    latest_tx_block,
+    scan_latest_created_contract,
+    scan_created_contracts_before,
+    scan_new_created_contracts,
+    ScanError,
+)
+from app.stream import LogStream, ws_url_for
+from app.targets import ZORA_SLUGS, Target, load_watchlist
+from app.trace_cache import default_cache
 
 
 def create_app() -> Flask:
     app = Flask(__name__)
 
-    # --- Shared state for latest scan ---
-    state: Dict[str, Any] = {
-        "latest": None,  # type: Optional[Dict[str, Any]]
-        "last_run_utc": None,  # type: Optional[str]
-        "last_error": None,  # type: Optional[str]
-        "runs": 0,
-        "started_at": time.strftime("%Y-%m-%d %H:%M:%S", time.gmtime()),
-        "history": [],  # list of recent results, most recent first
-    }
-    lock = threading.Lock()
-
     interval_seconds = int(os.environ.get("SCAN_INTERVAL_SECONDS", "10"))
     chain_id = int(os.environ.get("CHAIN_ID", "8453"))
     deployer = os.environ.get("DEPLOYER")  # default handled by scan function
     history_max = int(os.environ.get("HISTORY_MAX", "50"))
+    # /api/latest and / carry only the newest rows; deeper history is paged through /api/history
+    latest_history = min(history_max, int(os.environ.get("LATEST_HISTORY", "50")))
     bootstrap_count = int(os.environ.get("BOOTSTRAP_COUNT", "5"))
     bootstrap_pages = int(os.environ.get("BOOTSTRAP_MAX_PAGES", "30"))
+    backfill_page_size = int(os.environ.get("BACKFILL_PAGE_SIZE", "25"))  # txs per backfill step
+    # Detections stay "pending" until this many blocks are built on top, then are re-validated
+    confirmations = max(0, int(os.environ.get("CONFIRMATIONS", "0")))
+    alert_on = os.environ.get("ALERT_ON", "confirmed").strip().lower()  # "pending" (fast) or "confirmed" (safe)
+    confirm_gap = int(os.environ.get("CONFIRM_RANGE_GAP", "1000"))
+    confirm_tail = max(0, int(os.environ.get("CONFIRM_TAIL_BLOCKS", "10")))
+
+    # --- Watched (chain, deployer) pairs, each with its own state ---
+    targets = load_watchlist(chain_id, deployer, interval_seconds, history_max, latest_history)
+    targets_by_key = {t.key: t for t in targets}
+    scan_workers = int(os.environ.get("SCAN_WORKERS", str(min(8, len(targets)))))
 
     stop_event = threading.Event()
+    cursors = CursorStore()
+    events = EventStore()
+    # Live UI fan-out. gthread serves an open SSE stream on one of its
+    # GUNICORN_THREADS threads for as long as it is open, so streams get at most
+    # three quarters of them by default; the rest keep serving plain requests
+    gunicorn_threads = int(os.environ.get("GUNICORN_THREADS", "64"))
+    hub = Broadcaster(
+        maxlen=int(os.environ.get("STREAM_BUFFER", "1024")),
+        max_clients=int(os.environ.get("SSE_MAX_CLIENTS") or gunicorn_threads * 3 // 4),
+    )
+    sse_max_seconds = float(os.environ.get("SSE_MAX_SECONDS", "300"))
+    poll_seconds = float(os.environ.get("SSE_POLL_SECONDS", "5"))  # suggested interval for ?poll=1
+    # gunicorn -w N: one worker leads (scans, streams, alerts), the rest mirror it
+    shared = SharedState(feed_max=int(os.environ.get("STREAM_BUFFER", "1024")))
+    leader_started = threading.Event()
+    backfills: Dict[str, threading.Thread] = {}  # target key -> bootstrap backfill thread
+    loops: List[threading.Thread] = []  # scanner and coordinator, joined by stop()
 
     def _get_env_first(*names: str) -> Optional[str]:
         for n in names:
@@ -40,56 +82,91 @@ def create_app() -> Flask:
                 return v
         return None
 
-    def _telegram_send(
-        text: str,
-        parse_mode: str = "HTML",
-        *,
-        token: Optional[str] = None,
-        chat_id_override: Optional[str] = None,
-        reply_markup: Optional[Dict[str, Any]] = None,
-    ) -> bool:
-        token = token or _get_env_first(
+    def _telegram_token() -> Optional[str]:
+        return _get_env_first(
             "TELEGRAM_BOT_TOKEN",
             "TELEGRAM_TOKEN",
             "BOT_TOKEN",
             "TG_BOT_TOKEN",
         )
+
+    def _telegram_payload(
+        text: str,
+        parse_mode: str = "HTML",
+        *,
+        chat_id_override: Optional[str] = None,
+        reply_markup: Optional[Dict[str, Any]] = None,
+    ) -> Optional[Dict[str, Any]]:
         chat_id = chat_id_override or _get_env_first(
             "TELEGRAM_CHAT_ID",
             "TELEGRAM_CHANNEL_ID",
             "TG_CHAT_ID",
         )
-        if not token or not chat_id:
+        if not chat_id:
+            return None  # Not configured
+        payload: Dict[str, Any] = {
+            "chat_id": chat_id,
+            "text": text,
+            "parse_mode": parse_mode,
+            "disable_web_page_preview": True,
+        }
+        if reply_markup:
+            payload["reply_markup"] = reply_markup
+        thread_id = os.environ.get("TELEGRAM_THREAD_ID")
+        if thread_id:
+            try:
+                payload["message_thread_id"] = int(thread_id)
+            except ValueError:
+                pass
+        silent = os.environ.get("TELEGRAM_SILENT", "0").strip().lower() in ("1", "true", "yes")
+        if silent:
+            payload["disable_notification"] = True
+        return payload
+
+    def _telegram_send(
+        text: str,
+        parse_mode: str = "HTML",
+        *,
+        token: Optional[str] = None,
+        chat_id_override: Optional[str] = None,
+        reply_markup: Optional[Dict[str, Any]] = None,
+    ) -> bool:
+        """Synchronous send; only for one-off messages like the test endpoint."""
+        token = token or _telegram_token()
+        payload = _telegram_payload(
+            text, parse_mode, chat_id_override=chat_id_override, reply_markup=reply_markup
+        )
+        if not token or not payload:
             return False  # Not configured
         try:
-            payload: Dict[str, Any] = {
-                "chat_id": chat_id,
-                "text": text,
-                "parse_mode": parse_mode,
-                "disable_web_page_preview": True,
-            }
-            if reply_markup:
-                payload["reply_markup"] = reply_markup
-            thread_id = os.environ.get("TELEGRAM_THREAD_ID")
-            if thread_id:
-                try:
-                    payload["message_thread_id"] = int(thread_id)
-                except ValueError:
-                    pass
-            silent = os.environ.get("TELEGRAM_SILENT", "0").strip().lower() in ("1", "true", "yes")
-            if silent:
-                payload["disable_notification"] = True
-            timeout = int(os.environ.get("TELEGRAM_TIMEOUT", "10"))
-            url = f"https://api.telegram.org/bot{token}/sendMessage"
-            r = requests.post(url, json=payload, timeout=timeout)
-            if not r.ok:
-                print(f"[telegram] sendMessage failed: {r.status_code} {r.text[:200]}")
-                return False
+            telegram_post(token, payload, timeout=int(os.environ.get("TELEGRAM_TIMEOUT", "10")))
             return True
-        except Exception as e:
-            print(f"[telegram] ERROR: {e}")
+        except DeliveryError as e:
+            print(f"[telegram] {e}")
             return False
 
+    def _telegram_deliver(payload: Dict[str, Any]) -> None:
+        # Token is resolved at delivery time so it never lands in the spool file
+        token = _telegram_token()
+        if not token:
+            raise DeliveryError("TELEGRAM_BOT_TOKEN is not set", permanent=True)
+        telegram_post(token, payload, timeout=int(os.environ.get("TELEGRAM_TIMEOUT", "10")))
+
+    def _telegram_enqueue(text: str, reply_markup: Optional[Dict[str, Any]] = None) -> bool:
+        """Hand a message to the delivery queue; never blocks the scanner."""
+        payload = _telegram_payload(text, reply_markup=reply_markup)
+        if not _telegram_token() or not payload:
+            return False  # Not configured
+        notifier.submit(payload)
+        return True
+
+    notifier = NotificationQueue(
+        _telegram_deliver,
+        workers=int(os.environ.get("NOTIFY_WORKERS", "1")),
+        maxsize=int(os.environ.get("NOTIFY_QUEUE_MAX", "1000")),
+        max_attempts=int(os.environ.get("NOTIFY_MAX_ATTEMPTS", "8")),
+    )
+
     def _short_hex(s: Optional[str], left: int = 6, right: int = 4) -> str:
         if not s:
             return ""
@@ -97,7 +174,7 @@ def create_app() -> Flask:
             return s
         return f"{s[:left]}…{s[-right:]}"
 
-    def _telegram_send_new(latest: Optional[Dict[str, Any]]) -> None:
+    def _telegram_send_new(latest: Optional[Dict[str, Any]], target: Target) -> None:
         if not latest:
             return
         contract = latest.get("contract") or ""
@@ -107,187 +184,999 @@ def create_app() -> Flask:
         short_c = _short_hex(contract, 8, 6)
         short_t = _short_hex(tx, 8, 6)
         show_buttons = os.environ.get("TELEGRAM_BUTTONS", "1").strip().lower() in ("1", "true", "yes")
+        explorer = target.explorer
+        zora_slug = ZORA_SLUGS.get(target.chain_id)
         # Base header + deployer
         text = (
             "<b>New contract deployed on Zora.co</b>\n\n"
-            f"👤 <b>Deployer</b>\n<code>{(deployer or 'default')}</code>\n\n"
+            f"👤 <b>Deployer</b>\n<code>{target.deployer}</code>\n\n"
         )
+        if len(targets) > 1:
+            text += f"🧭 <b>Chain</b>\n<code>{target.chain_id}</code>\n\n"
         # Only include the long link sections if buttons are disabled
         if not show_buttons:
             text += (
-                f"📄 <b>Contract</b>\n<a href=\"https://basescan.org/address/{contract}\">{short_c}</a>\n\n"
-                f"🔗 <b>Tx</b>\n<a href=\"https://basescan.org/tx/{tx}\">{short_t}</a>\n\n"
+                f"📄 <b>Contract</b>\n<a href=\"{explorer}/address/{contract}\">{short_c}</a>\n\n"
+                f"🔗 <b>Tx</b>\n<a href=\"{explorer}/tx/{tx}\">{short_t}</a>\n\n"
             )
         # Always include block and UTC; add Zora Project section only when not using buttons
         text += f"⛓ <b>Block</b>\n<code>{block}</code>\n\n"
-        if not show_buttons:
+        if not show_buttons and zora_slug:
             text += (
-                f"🌐 <b>Zora Project</b>\n<a href=\"https://zora.co/coin/base:{contract}\">zora.co/coin/base:{short_c}</a>\n\n"
+                f"🌐 <b>Zora Project</b>\n<a href=\"https://zora.co/coin/{zora_slug}:{contract}\">zora.co/coin/{zora_slug}:{short_c}</a>\n\n"
             )
         text += f"🕰 <b>UTC</b>\n<code>{utc}</code>"
 
         markup: Optional[Dict[str, Any]] = None
         if show_buttons:
-            markup = {
-                "inline_keyboard": [
-                    [
-                        {"text": "Address", "url": f"https://basescan.org/address/{contract}"},
-                        {"text": "Tx", "url": f"https://basescan.org/tx/{tx}"},
-                    ],
-                    [
-                        {"text": "Zora Project", "url": f"https://zora.co/coin/base:{contract}"}
-                    ],
-                ]
-            }
-        _telegram_send(text, reply_markup=markup)
+            rows: List[List[Dict[str, str]]] = [
+                [
+                    {"text": "Address", "url": f"{explorer}/address/{contract}"},
+                    {"text": "Tx", "url": f"{explorer}/tx/{tx}"},
+                ],
+            ]
+            if zora_slug:
+                rows.append([{"text": "Zora Project", "url": f"https://zora.co/coin/{zora_slug}:{contract}"}])
+            markup = {"inline_keyboard": rows}
+        _telegram_enqueue(text, reply_markup=markup)
 
-    def scanner_loop():
-        # Initial slight delay so app can start before first scan logs
-        time.sleep(1.0)
-        while not stop_event.is_set():
-            started = time.time()
-            started_utc = time.strftime("%Y-%m-%d %H:%M:%S", time.gmtime(started))
-            latest = None
-            err: Optional[str] = None
-            try:
-                api_key = os.environ.get("ETHERSCAN_API_KEY") or "WNX3XI8JS1WEC7WGMU8S3DS1UMYD1ZG4FZ"
-                # Bootstrap: on first run, prefill last N deployments
-                first_run = int(state.get("runs", 0)) == 0 and not state.get("history")
-                if first_run and bootstrap_count > 0:
-                    from app.scan import scan_recent_created_contracts
-
-                    recent = scan_recent_created_contracts(
-                        api_key=api_key,
+    def _telegram_send_reorged(item: Dict[str, Any], target: Target) -> None:
+        """Retract a pending-stage alert whose tx was reorged out."""
+        text = (
+            "⚠️ <b>Deployment reorged out</b>\n\n"
+            f"📄 <b>Contract</b>\n<code>{item.get('contract') or ''}</code>\n\n"
+            f"🔗 <b>Tx</b>\n<code>{item.get('tx') or ''}</code>\n\n"
+            f"⛓ <b>Block</b>\n<code>{item.get('block') or ''}</code>"
+        )
+        if len(targets) > 1:
+            text += f"\n\n🧭 <b>Chain</b>\n<code>{target.chain_id}</code>"
+        _telegram_enqueue(text)
+
+    def _api_key() -> str:
+        return (
+            os.environ.get("ETHERSCAN_API_KEYS")
+            or os.environ.get("ETHERSCAN_API_KEY")
+            or "WNX3XI8JS1WEC7WGMU8S3DS1UMYD1ZG4FZ"
+        )
+
+    def _poll_etherscan(target: Target, started_utc: str, tag: str) -> Tuple[List[Dict[str, Any]], bool]:
+        """Etherscan txlist/txlistinternal backend. Returns (found newest-first, bootstrapped).
+
+        The bootstrap never holds up head tracking: the first run pins the
+        cursor and scans from there at once, while the last N deployments
+        below it are backfilled by a background task (_backfill).
+        """
+        chain_id, deployer = target.chain_id, target.deployer
+        api_key = _api_key()
+        cursor = cursors.get(chain_id, deployer)
+        first_run = int(target.status.get("runs", 0)) == 0 and not len(target.history)
+        if first_run and cursor is None and bootstrap_count <= 0:
+            # No history wanted: just seed the latest deployment
+            head = latest_tx_block(api_key=api_key, deployer=deployer, chain_id=chain_id)
+            latest = scan_latest_created_contract(
+                api_key=api_key,
+                deployer=deployer,
+                chain_id=chain_id,
+            )
+            cursors.set(chain_id, deployer, head or 0)
+            return ([latest] if latest else []), False
+        if cursor is None:
+            cursor = latest_tx_block(api_key=api_key, deployer=deployer, chain_id=chain_id) or 0
+            cursors.set(chain_id, deployer, cursor)
+        if first_run and bootstrap_count > 0 and cursors.get(chain_id, deployer, kind="backfill") is None:
+            # Everything above the cursor is the live scan's; the backfill takes the rest
+            for kind in ("backfill_skip", "backfill_found"):
+                cursors.clear(chain_id, deployer, kind=kind)
+            cursors.set(chain_id, deployer, cursor, kind="backfill")
+            print(f"[bootstrap {started_utc}]{tag} Backfilling recent deployments up to block {cursor} in the background")
+        if cursors.get(chain_id, deployer, kind="backfill") is not None:
+            _start_backfill(target)  # new, or resumed after a restart or a leader change
+        # Regular incremental scan: only blocks after the cursor
+        found, cursor = scan_new_created_contracts(
+            cursor,
+            api_key=api_key,
+            deployer=deployer,
+            chain_id=chain_id,
+            returned=target.returned,
+        )
+        cursors.set(chain_id, deployer, cursor)
+        return found, False
+
+    def _start_backfill(target: Target) -> None:
+        thread = backfills.get(target.key)
+        if thread is not None and thread.is_alive():
+            return
+        thread = threading.Thread(target=_backfill, args=(target,), name=f"backfill-{target.chain_id}", daemon=True)
+        backfills[target.key] = thread
+        thread.start()
+
+    def _backfill(target: Target) -> None:
+        """Bootstrap in the background: walk txlist down from the backfill marker.
+
+        One BACKFILL_PAGE_SIZE page per step at background rate priority
+        (head tracking goes first), merged into history by block and
+        checkpointed in the cursor store, so a restart or a new leader carries
+        on where this stopped. Done after BOOTSTRAP_MAX_PAGES pages of 100
+        txs, once it has found BOOTSTRAP_COUNT deployments (live detections
+        do not count), or at the deployer's first tx.
+        """
+        chain_id, deployer = target.chain_id, target.deployer
+        tag = f" [{target.key}]" if len(targets) > 1 else ""
+        pages = 0
+        max_pages = max(1, bootstrap_pages * 100 // max(1, backfill_page_size))
+        loaded = 0
+        head: Optional[int] = None
+        with background():
+            while not stop_event.is_set() and shared.is_leader:
+                before = cursors.get(chain_id, deployer, kind="backfill")
+                if before is None:
+                    return
+                # Txs of the marker block already read, and deployments found so far
+                skip = cursors.get(chain_id, deployer, kind="backfill_skip") or 0
+                backfilled = cursors.get(chain_id, deployer, kind="backfill_found") or 0
+                wanted = bootstrap_count - backfilled
+                if pages >= max_pages or wanted <= 0:
+                    break
+                try:
+                    if confirmations > 0 and head is None:
+                        head = chain_head(api_key=_api_key(), chain_id=chain_id)
+                    found, step = scan_created_contracts_before(
+                        before,
+                        api_key=_api_key(),
                         deployer=deployer,
                         chain_id=chain_id,
-                        max_pages=bootstrap_pages,
-                        limit=bootstrap_count,
+                        page_size=backfill_page_size,
+                        limit=wanted,
+                        skip=skip,
                     )
-                    if recent:
-                        latest = recent[0]
-                        print(
-                            f"[bootstrap {started_utc}] Loaded {len(recent)} recent deployments; latest {latest['contract']}"
-                        )
-                        with lock:
-                            # dedupe + cap
-                            seen = set()
-                            deduped = []
-                            for item in recent:
-                                txh = item.get("tx")
-                                if not txh or txh in seen:
-                                    continue
-                                seen.add(txh)
-                                deduped.append(item)
-                                if len(deduped) >= history_max:
-                                    break
-                            state["history"] = deduped
-                            state["latest"] = latest
-                            state["last_run_utc"] = started_utc
-                            state["last_error"] = None
-                            state["runs"] = int(state.get("runs", 0)) + 1
-                    else:
-                        print(f"[bootstrap {started_utc}] No recent deployments found for bootstrap.")
+                except ScanError as e:
+                    print(f"[bootstrap]{tag} backfill ERROR: {e}")
+                    stop_event.wait(target.interval_seconds)
+                    continue
+                pages += 1
+                loaded += _merge_backfill(target, found, head)
+                if step is None:
+                    break
+                cursors.set(chain_id, deployer, backfilled + len(found), kind="backfill_found")
+                cursors.set(chain_id, deployer, step[1], kind="backfill_skip")
+                cursors.set(chain_id, deployer, step[0], kind="backfill")
+            else:
+                return  # stopping, or the lease moved: the marker stays for whoever resumes
+        for kind in ("backfill", "backfill_skip", "backfill_found"):
+            cursors.clear(chain_id, deployer, kind=kind)
+        print(f"[bootstrap]{tag} Backfill done: loaded {loaded} deployment(s) from {pages} page(s)")
+
+    def _merge_backfill(target: Target, found: List[Dict[str, Any]], head: Optional[int]) -> int:
+        """Merge older results into history by block, without alerts; returns how many were new."""
+        if not found or not shared.is_leader:
+            return 0
+        state = target.state
+        items = []
+        for item in found:
+            # Already CONFIRMATIONS deep when read: nothing left to wait for
+            deep = confirmations <= 0 or (head is not None and int(item.get("block") or 0) <= head - confirmations)
+            items.append({**item, "status": "confirmed" if deep else "pending", "quiet": True})
+        with target.lock:
+            fresh = target.history.merge(items)
+            if not fresh:
+                return 0
+            events.add(target.chain_id, target.deployer, fresh)
+            if not state.get("latest"):
+                state["latest"] = target.history.newest().to_dict()
+            target.status = {
+                **target.status, "backfill_block": cursors.get(target.chain_id, target.deployer, kind="backfill")
+            }
+            state["history_version"] += 1
+            state["version"] += 1
+            _publish(target, [("backfill", {"items": fresh}), _status_event(target)])
+        return len(fresh)
+
+    def _poll_rpc(target: Target, started_utc: str, tag: str) -> Tuple[List[Dict[str, Any]], bool]:
+        """JSON-RPC eth_getLogs backend (factory event logs)."""
+        chain_id = target.chain_id
+        factory = os.environ.get("RPC_FACTORY") or target.deployer
+        cursor = cursors.get(chain_id, target.deployer)
+        first_run = int(target.status.get("runs", 0)) == 0 and not len(target.history)
+        bootstrapped = False
+        max_chunks = 10
+        if cursor is None:
+            url = rpc_url_for(chain_id)
+            if not url:
+                raise ScanError(f"RPC_URL is not set for chain {chain_id}")
+            # First run: seed from the last RPC_BOOTSTRAP_BLOCKS blocks of logs
+            span = int(os.environ.get("RPC_BOOTSTRAP_BLOCKS", "5000"))
+            cursor = max(0, block_number(url) - span)
+            max_chunks = max(max_chunks, -(-span // int(os.environ.get("RPC_LOG_RANGE", "2000"))))
+            bootstrapped = first_run
+        found, cursor = scan_logs_created_contracts(cursor, factory, chain_id=chain_id, max_chunks=max_chunks)
+        cursors.set(chain_id, target.deployer, cursor)
+        if bootstrapped:
+            if bootstrap_count > 0:
+                found = found[:bootstrap_count]
+            print(f"[bootstrap {started_utc}]{tag} Loaded {len(found)} recent deployments from logs")
+        return found, bootstrapped
+
+    def _scan_target(target: Target) -> None:
+        """One scan tick for a watched pair: bootstrap on first run, then incremental."""
+        chain_id, deployer = target.chain_id, target.deployer
+        started = time.time()
+        started_utc = time.strftime("%Y-%m-%d %H:%M:%S", time.gmtime(started))
+        tag = f" [{chain_id}:{deployer[:10]}]" if len(targets) > 1 else ""
+        found: List[Dict[str, Any]] = []  # newest first
+        bootstrapped = False
+        err: Optional[str] = None
+        try:
+            if target.backend == "rpc":
+                found, bootstrapped = _poll_rpc(target, started_utc, tag)
+            else:
+                found, bootstrapped = _poll_etherscan(target, started_utc, tag)
+            if found:
+                latest = found[0]
+                print(
+                    f"[scan {started_utc}]{tag} Contract {latest['contract']} | Block {latest['block']} | Tx {latest['tx']}"
+                    + (f" (+{len(found) - 1} more)" if len(found) > 1 else "")
+                )
+            else:
+                print(f"[scan {started_utc}]{tag} No new contract creation found.")
+        except ScanError as e:
+            err = str(e)
+            print(f"[scan {started_utc}]{tag} ERROR: {err}")
+        metrics.SCAN_SECONDS.observe(time.time() - started, target.backend, "error" if err else "ok")
+        _commit(target, found, bootstrapped=bootstrapped, err=err, run_utc=started_utc)
+        if not err:
+            _confirm(target)
+
+    def _publish(target: Target, feed: List[Tuple[str, Dict[str, Any]]], seq: Optional[int] = None) -> None:
+        """Swap in the target's snapshot and fan out `feed` here and to follower workers.
+
+        Call with target.lock held. `seq` forces the first event id (a new
+        leader continuing after the previous one's last event). The snapshot
+        is only rebuilt, and handed to followers, when the state's version
+        moved; a status-only tick reaches them as a feed row.
+        """
+        changed = target.snapshot.version != target.state["version"]
+        if changed:
+            target.publish()
+        rows = []
+        for kind, data in feed:
+            rows.append((hub.publish(target.key, kind, data, seq=seq), target.key, kind, data))
+            seq = None
+        shared.put(target.key, target.snapshot.etag, target.snapshot.body() if changed else None, rows)
+
+    def _commit(
+        target: Target,
+        found: List[Dict[str, Any]],
+        *,
+        bootstrapped: bool = False,
+        err: Optional[str] = None,
+        run_utc: Optional[str] = None,
+    ) -> None:
+        """Merge results (newest first) into the target's state and alert on new ones.
+
+        run_utc marks a completed scan tick; stream pushes pass None.
+        """
+        if not shared.is_leader:
+            return  # lost the lease mid-scan; the new leader covers this range
+        state = target.state
+        status = "pending" if confirmations > 0 else "confirmed"
+        # Bootstrap results are history, not news: never alerted or retracted
+        found = [{**item, "status": status, **({"quiet": True} if bootstrapped else {})} for item in found]
+        notify: List[Dict[str, Any]] = []
+        with target.lock:
+            history_version = state["history_version"]
+            latest = state.get("latest")
+            if bootstrapped:
+                events.add(target.chain_id, target.deployer, found)
+                target.history.replace(found)
+                state["history_version"] += 1
+            elif found:
+                # Update history with unseen txs only (dedupe by tx hash)
+                notify = target.history.add(found)
+                events.add(target.chain_id, target.deployer, notify)
+                if notify:
+                    state["history_version"] += 1
+            if found:
+                state["latest"] = found[0]
+            if state["history_version"] != history_version or state["latest"] != latest:
+                state["version"] += 1
+            stats = dict(target.status)
+            if run_utc:
+                stats["last_run_utc"] = run_utc
+                stats["last_error"] = err
+                stats["runs"] = int(stats.get("runs", 0)) + 1
+            stats["cursor_block"] = cursors.get(target.chain_id, target.deployer)
+            stats["backfill_block"] = cursors.get(target.chain_id, target.deployer, kind="backfill")
+            stats["trace_cache"] = default_cache().stats()
+            stats["rate_limit"] = limiter_stats()
+            stats["notify"] = notifier.stats()
+            stats["events"] = events.stats()
+            if target.stream is not None:
+                stats["stream"] = target.stream.stats()
+            target.status = stats
+            feed: List[Tuple[str, Dict[str, Any]]] = []
+            if bootstrapped:
+                feed.append(("reset", {"version": state["version"]}))
+            feed += [("deployment", item) for item in reversed(notify)]
+            feed.append(_status_event(target))
+            _publish(target, feed)
+
+        now = time.time()
+        for item in notify:
+            try:
+                block_ts = calendar.timegm(time.strptime(item.get("utc") or "", "%Y-%m-%d %H:%M:%S"))
+            except ValueError:
+                continue
+            metrics.DETECTION_LAG.observe(max(0.0, now - block_ts), str(target.chain_id))
+
+        if status == "pending" and alert_on != "pending":
+            return  # alerted by _settle once confirmed
+        # Alert oldest first so the channel reads chronologically
+        for item in reversed(notify):
+            _telegram_send_new(item, target)
+
+    def _status_event(target: Target) -> Tuple[str, Dict[str, Any]]:
+        """Run counters and stats, plus the versions a viewer compares to its copy of /api/latest."""
+        state = target.state
+        return (
+            "status",
+            {
+                "version": state["version"],
+                "history_version": state["history_version"],
+                "latest": state.get("latest"),
+                **target.status,
+            },
+        )
+
+    def _pending(target: Target) -> List[Deployment]:
+        return list(target.snapshot.pending)
+
+    def _block_ranges(blocks: List[int], cursor: Optional[int]) -> List[Tuple[int, int]]:
+        """Sorted blocks merged into [lo, hi] ranges wherever the gap is <= CONFIRM_RANGE_GAP.
+
+        Each range runs CONFIRM_TAIL_BLOCKS past its last block (never past the
+        cursor), so a tx re-included a few blocks later than first seen is still found.
+        """
+        ranges: List[List[int]] = []
+        for b in blocks:
+            if ranges and b - ranges[-1][1] <= confirm_gap:
+                ranges[-1][1] = b
+            else:
+                ranges.append([b, b])
+        out: List[Tuple[int, int]] = []
+        for lo, hi in ranges:
+            tail = hi + confirm_tail if cursor is None else max(hi, min(hi + confirm_tail, cursor))
+            if out and lo <= out[-1][1]:
+                out[-1] = (out[-1][0], tail)  # tails overlap the next range
+            else:
+                out.append((lo, tail))
+        return out
+
+    def _recheck(target: Target, lo: int, hi: int) -> Tuple[List[Dict[str, Any]], int]:
+        """Deployments in blocks lo..hi as the chain has them now, plus the last block re-read.
+
+        Each read is capped (max_pages / max_chunks), so this continues from the
+        returned cursor until it reaches hi or stops advancing. Cached CREATEs
+        are reused with the block and time the tx has now; everything else is
+        looked up again (refresh).
+        """
+        found: List[Dict[str, Any]] = []
+        cursor = lo - 1
+        while cursor < hi:
+            if target.backend == "rpc":
+                factory = os.environ.get("RPC_FACTORY") or target.deployer
+                step = int(os.environ.get("RPC_LOG_RANGE", "2000"))
+                page, nxt = scan_logs_created_contracts(
+                    cursor, factory, chain_id=target.chain_id, head=hi, max_chunks=-(-(hi - cursor) // step)
+                )
+            else:
+                page, nxt = scan_new_created_contracts(
+                    cursor, api_key=_api_key(), deployer=target.deployer, chain_id=target.chain_id,
+                    end_block=hi, refresh=True,
+                )
+            found = page + found
+            if nxt <= cursor:
+                break
+            cursor = nxt
+        return found, min(cursor, hi)
+
+    def _confirm(target: Target) -> None:
+        """Re-validate pending deployments that are CONFIRMATIONS blocks deep.
+
+        One head lookup, then one re-read per block range of due deployments:
+        those still deploying the same way are confirmed. One missing from two
+        re-reads in a row was reorged out; a single miss may just be the
+        explorer lagging. Due deployments past where a re-read got to stay
+        pending for the next tick. Deployments the re-read turns up that we never
+        saw (txs the reorg brought in) are committed as new pending ones.
+        """
+        pending = _pending(target)
+        if confirmations <= 0 or not pending or not shared.is_leader:
+            target.misses = {}
+            return
+        waiting = {rec.tx for rec in pending}
+        target.misses = {tx: n for tx, n in target.misses.items() if tx in waiting}
+        tag = f"[{target.key}]"
+        try:
+            if target.backend == "rpc":
+                url = rpc_url_for(target.chain_id)
+                if not url:
+                    raise ScanError(f"RPC_URL is not set for chain {target.chain_id}")
+                head = block_number(url)
+            else:
+                head = chain_head(api_key=_api_key(), chain_id=target.chain_id)
+            due = [rec for rec in pending if int(rec.block or 0) <= head - confirmations]
+            if not due:
+                return
+            cursor = cursors.get(target.chain_id, target.deployer)
+            rechecked: Dict[str, Dict[str, Any]] = {}
+            known = set()
+            unread: List[Tuple[int, int]] = []  # (after, up to) blocks a truncated re-read never reached
+            for lo, hi in _block_ranges(sorted({int(rec.block or 0) for rec in due}), cursor):
+                found, reached = _recheck(target, lo, hi)
+                for item in found:
+                    rechecked.setdefault(item["tx"].lower(), item)
+                if reached < hi:
+                    unread.append((reached, hi))
+                known.update(r["tx"] for r in events.range(target.chain_id, target.deployer, lo, hi, limit=100000))
+        except ScanError as e:
+            print(f"[confirm] {tag} ERROR: {e}")  # stay pending; retried next tick
+            return
+        confirmed: List[Dict[str, Any]] = []
+        dropped: List[Dict[str, Any]] = []
+        for rec in due:
+            item = rechecked.pop(rec.tx.lower(), None)
+            if item is not None:
+                target.misses.pop(rec.tx, None)
+                confirmed.append({**item, "status": "confirmed", **({"quiet": True} if rec.quiet else {})})
+            elif not any(after < int(rec.block or 0) <= upto for after, upto in unread):
+                target.misses[rec.tx] = target.misses.get(rec.tx, 0) + 1
+                if target.misses[rec.tx] >= 2:
+                    target.misses.pop(rec.tx)
+                    dropped.append(rec.to_dict())
                 else:
-                    # Regular incremental scan: just fetch the latest and insert when new
-                    latest = scan_latest_created_contract(
-                        api_key=api_key,
-                        deployer=deployer,
-                        chain_id=chain_id,
-                    )
-                if latest:
-                    print(
-                        f"[scan {started_utc}] Contract {latest['contract']} | Block {latest['block']} | Tx {latest['tx']}"
-                    )
+                    print(f"[confirm] {tag} {rec.tx} missing from the re-read; checking again next tick")
+        unseen = [
+            item for tx, item in rechecked.items()
+            if tx not in known and item["tx"] not in target.history
+        ]
+        _settle(target, confirmed, dropped)
+        if unseen:
+            print(f"[confirm] {tag} {len(unseen)} deployment(s) appeared in re-read blocks")
+            _commit(target, unseen)
+
+    def _settle(target: Target, confirmed: List[Dict[str, Any]], dropped: List[Dict[str, Any]]) -> None:
+        """Apply confirmation results (newest first) to history, the event store and the feed.
+
+        Alerts (or retractions) go out for live detections only, never for
+        quiet bootstrap/backfill rows.
+        """
+        if not shared.is_leader:
+            return
+        state = target.state
+        with target.lock:
+            for item in confirmed:
+                target.history.update(item)
+            for item in dropped:
+                target.history.remove(item["tx"])
+            events.confirm(target.chain_id, confirmed)
+            events.remove(target.chain_id, dropped)
+            latest = state.get("latest") or {}
+            changed = {item["tx"]: item for item in confirmed}
+            if latest.get("tx") in changed:
+                state["latest"] = changed[latest["tx"]]
+            elif any(item["tx"] == latest.get("tx") for item in dropped):
+                newest = target.history.newest()
+                state["latest"] = newest.to_dict() if newest else None
+            state["history_version"] += 1
+            state["version"] += 1
+            feed: List[Tuple[str, Dict[str, Any]]] = [("reorged", item) for item in reversed(dropped)]
+            feed += [("confirmed", item) for item in reversed(confirmed)]
+            feed.append(_status_event(target))
+            _publish(target, feed)
+        metrics.CONFIRMATIONS.inc("confirmed", amount=len(confirmed))
+        metrics.CONFIRMATIONS.inc("reorged", amount=len(dropped))
+        for item in dropped:
+            print(f"[reorg] [{target.key}] Contract {item['contract']} | Block {item['block']} | Tx {item['tx']} dropped")
+        if confirmed:
+            print(f"[confirm] [{target.key}] {len(confirmed)} deployment(s) confirmed; newest {confirmed[0]['contract']}")
+        if alert_on == "pending":
+            # Already alerted when first seen; only retract what the reorg took back
+            for item in reversed(dropped):
+                if not item.get("quiet"):
+                    _telegram_send_reorged(item, target)
+            return
+        for item in reversed(confirmed):
+            if item.get("quiet"):
+                continue
+            _telegram_send_new(item, target)
+
+    def _run_target(target: Target) -> None:
+        try:
+            with target.scan_lock:
+                if target.stream is not None and target.stream.connected:
+                    _confirm(target)  # pushes cover detection; only settle what they found
                 else:
-                    print(f"[scan {started_utc}] No recent contract creation found.")
-            except ScanError as e:
-                err = str(e)
-                print(f"[scan {started_utc}] ERROR: {err}")
-
-            notify_latest: Optional[Dict[str, Any]] = None
-            with lock:
-                prev_latest = state.get("latest") or {}
-                # Update history on change (dedupe by tx hash)
-                if latest and latest.get("tx") and latest.get("tx") != prev_latest.get("tx"):
-                    hist = state.get("history") or []
-                    # Insert newest at the beginning
-                    hist.insert(0, latest)
-                    # Dedupe by tx while preserving order and cap to history_max
-                    seen = set()
-                    deduped = []
-                    for item in hist:
-                        txh = item.get("tx")
-                        if not txh or txh in seen:
-                            continue
-                        seen.add(txh)
-                        deduped.append(item)
-                        if len(deduped) >= history_max:
-                            break
-                    state["history"] = deduped
-                    notify_latest = latest
-                state["latest"] = latest
-                state["last_run_utc"] = started_utc
-                state["last_error"] = err
-                state["runs"] = int(state.get("runs", 0)) + 1
-
-            # Sleep until next interval, but allow fast shutdown via event
-            if notify_latest:
-                _telegram_send_new(notify_latest)
-            stop_event.wait(interval_seconds)
-
-    # Start background thread
-    t = threading.Thread(target=scanner_loop, name="scanner", daemon=True)
-    t.start()
-    # Print a startup message immediately (compatible with Flask 2.x/3.x)
-    print(
-        f"Scanner started. Interval={interval_seconds}s, Chain={chain_id}, Deployer={deployer or 'default'}"
+                    _scan_target(target)
+        except Exception as e:  # keep the scheduler alive whatever one target does
+            print(f"[scan] [{target.key}] unexpected ERROR: {e}")
+        finally:
+            target.running = False
+
+    def scanner_loop():
+        """Single scheduler for all targets; scans share the HTTP pool and rate budget."""
+        # Initial slight delay so app can start before first scan logs
+        time.sleep(1.0)
+        with ThreadPoolExecutor(max_workers=max(1, scan_workers), thread_name_prefix="scan") as pool:
+            while not stop_event.is_set():
+                if not shared.is_leader:
+                    stop_event.wait(1.0)  # lease lost; resume if it comes back
+                    continue
+                now = time.time()
+                for target in targets:
+                    if target.running or target.next_due > now:
+                        continue
+                    if target.stream is not None and target.stream.connected and not _pending(target):
+                        continue  # pushes arrive live; polling only fills gaps after a disconnect
+                    # Fixed-rate schedule; a slow scan delays only its own next tick
+                    target.running = True
+                    target.next_due = now + target.interval_seconds
+                    try:
+                        pool.submit(_run_target, target)
+                    except RuntimeError:  # interpreter shutting down
+                        return
+                next_due = min(t.next_due for t in targets)
+                # Sleep until the next target is due, but allow fast shutdown via event
+                stop_event.wait(min(1.0, max(0.05, next_due - time.time())))
+
+    def _start_stream(target: Target) -> None:
+        """Live eth_subscribe stream for an rpc target that has a WebSocket endpoint."""
+        ws_url = ws_url_for(target.chain_id)
+        topic = os.environ.get("RPC_EVENT_TOPIC")
+        if not ws_url or not topic:
+            return
+
+        def on_connect() -> None:
+            # Gap fill with the polling backend from the persisted cursor
+            with target.scan_lock:
+                _scan_target(target)
+
+        def on_head(block: int) -> None:
+            cur = cursors.get(target.chain_id, target.deployer)
+            if cur is not None and block > cur:
+                cursors.set(target.chain_id, target.deployer, block)
+
+        def on_found(found: List[Dict[str, Any]]) -> None:
+            item = found[0]
+            print(f"[stream] [{target.key}] Contract {item['contract']} | Block {item['block']} | Tx {item['tx']}")
+            _commit(target, found)
+
+        target.stream = LogStream(
+            ws_url,
+            os.environ.get("RPC_FACTORY") or target.deployer,
+            topic,
+            os.environ.get("RPC_CONTRACT_FIELD") or "topic:1",
+            on_connect=on_connect,
+            on_head=on_head,
+            on_found=on_found,
+            stop_event=stop_event,
+            name=f"stream-{target.chain_id}",
+        )
+        target.stream.start()
+
+    def _warm_start(target: Target) -> None:
+        """Restore history from the event store so a restart skips the bootstrap scan."""
+        hist = events.recent(target.chain_id, target.deployer, history_max)
+        if not hist:
+            return
+        with target.lock:
+            target.history.replace(hist)
+            target.state["latest"] = hist[0]
+            target.state["history_version"] += 1
+            target.state["version"] += 1
+            target.publish()
+        if cursors.get(target.chain_id, target.deployer) is None:
+            # No cursor file (e.g. fresh disk): resume after the newest stored block
+            cursors.set(target.chain_id, target.deployer, events.max_block(target.chain_id, target.deployer) or 0)
+        print(f"[events] [{target.key}] restored {len(hist)} deployment(s) from {events.path}")
+
+    def _start_leading() -> None:
+        """This worker holds the lease: take over scanning, streams and alert delivery."""
+        cursors.reload()  # the previous leader may have moved them
+        _mirror()  # carry on from the last published state, even as a freshly started worker
+        for target in targets:
+            if not len(target.history):
+                _warm_start(target)  # a follower already holds the mirrored state
+            with target.lock:
+                target.state["version"] += 1
+                # Viewers resync from this worker; event ids continue after the previous leader's
+                _publish(target, [("reset", {"version": target.state["version"]})], seq=shared.last_seq() + 1)
+        notifier.start()  # stopped whenever the lease is lost, so restarted every term
+        if leader_started.is_set():
+            return  # lease regained: the threads from the first term are still running
+        leader_started.set()
+        for target in targets:
+            if target.backend == "rpc":
+                _start_stream(target)
+        t = threading.Thread(target=scanner_loop, name="scanner", daemon=True)
+        loops.append(t)
+        t.start()
+        # Print a startup message immediately (compatible with Flask 2.x/3.x)
+        if len(targets) == 1:
+            print(
+                f"Scanner started. Interval={interval_seconds}s, Chain={chain_id}, Deployer={deployer or 'default'}"
+            )
+        else:
+            print(f"Scanner started. Interval={interval_seconds}s, Targets={len(targets)}, Workers={scan_workers}")
+        # Optional startup ping to Telegram
+        tg_token_present = bool(
+            _get_env_first("TELEGRAM_BOT_TOKEN", "TELEGRAM_TOKEN", "BOT_TOKEN", "TG_BOT_TOKEN")
+        )
+        tg_chat_present = bool(
+            _get_env_first("TELEGRAM_CHAT_ID", "TELEGRAM_CHANNEL_ID", "TG_CHAT_ID")
+        )
+        print(
+            f"Telegram configured: token={'Y' if tg_token_present else 'N'}, chat={'Y' if tg_chat_present else 'N'}"
+        )
+        if os.environ.get("TELEGRAM_STARTUP_PING", "0").strip().lower() in ("1", "true", "yes"):
+            _telegram_enqueue(
+                (
+                    "✅ Contract scanner started\n"
+                    + (
+                        f"Chain: {chain_id}\n"
+                        f"Deployer: <code>{(deployer or 'default')}</code>\n"
+                        if len(targets) == 1
+                        else f"Targets: {len(targets)}\n"
+                    )
+                    + f"Interval: {interval_seconds}s"
+                )
+            )
+
+    def _mirror() -> None:
+        """Follower: adopt the leader's snapshots, then replay its new events."""
+        etags = {t.key: t.snapshot.etag for t in targets}
+        for key, etag, body in shared.changed_snapshots(etags):
+            target = targets_by_key.get(key)
+            if target is None:
+                continue
+            state = json.loads(body)
+            with target.lock:
+                target.history.replace(state.pop("history", None) or [])
+                target.state.clear()
+                target.state.update(state)
+                target.publish(etag=etag)
+        for seq, key, kind, data in shared.feed_after(hub.seq):
+            target = targets_by_key.get(key)
+            if kind == "status" and target is not None:
+                target.status = {k: v for k, v in data.items() if k not in ("version", "history_version", "latest")}
+            hub.publish(key, kind, data, seq=seq)
+
+    def coordinator() -> None:
+        """Renew (or contend for) the lease; mirror the leader while following."""
+        renew_at = 0.0
+        while not stop_event.is_set():
+            if time.time() >= renew_at:
+                was_leader = shared.is_leader
+                if shared.try_lead() and not was_leader:
+                    print(f"[shared] worker {os.getpid()} is the scanner leader")
+                    _start_leading()
+                elif was_leader and not shared.is_leader:
+                    print(f"[shared] worker {os.getpid()} lost the leader lease; scanning and alerts paused")
+                    notifier.stop()  # the new leader drains the spool
+                renew_at = time.time() + shared.ttl / 3
+            if not shared.is_leader:
+                try:
+                    _mirror()
+                except Exception as e:  # keep following whatever one poll does
+                    print(f"[shared] mirror failed: {e}")
+            stop_event.wait(shared.poll_seconds)
+
+    def stop(timeout: float = 5.0) -> None:
+        """Stop every thread this app started and give up the lease.
+
+        gunicorn workers just exit; this is for processes that create apps
+        and outlive them, such as the tests.
+        """
+        stop_event.set()
+        hub.wake_all()  # open streams see the stop at once
+        for target in targets:
+            if target.stream is not None:
+                target.stream.stop(timeout)
+        for thread in loops + list(backfills.values()):
+            thread.join(timeout)
+        notifier.stop(timeout)
+        events.stop(timeout)
+        shared.release()
+
+    app.extensions["scanner_stop"] = stop
+
+    events.start()
+    if shared.enabled:
+        atexit.register(shared.release)
+        loops.append(threading.Thread(target=coordinator, name="coordinator", daemon=True))
+        loops[-1].start()
+    else:
+        _start_leading()
+
+    # --- Scrape-time gauges for state that already lives elsewhere ---
+    def _per_target(field: str) -> Dict[Tuple[str, ...], Optional[float]]:
+        return {(str(t.chain_id), t.deployer): t.status.get(field) for t in targets}
+
+    def _per_key(field: str) -> Dict[Tuple[str, ...], Optional[float]]:
+        return {(k,): v.get(field) for k, v in limiter_stats()["keys"].items()}
+
+    metrics.callback(
+        "scanner_trace_cache_lookups_total",
+        "Internal-trace cache lookups by result",
+        lambda: {("hit",): default_cache().stats()["hits"], ("miss",): default_cache().stats()["misses"]},
+        ("result",),
+        kind="counter",
     )
-    # Optional startup ping to Telegram
-    tg_token_present = bool(
-        _get_env_first("TELEGRAM_BOT_TOKEN", "TELEGRAM_TOKEN", "BOT_TOKEN", "TG_BOT_TOKEN")
+    metrics.callback(
+        "scanner_trace_cache_entries",
+        "Entries in the in-memory trace cache",
+        lambda: {(): default_cache().stats()["size"]},
     )
-    tg_chat_present = bool(
-        _get_env_first("TELEGRAM_CHAT_ID", "TELEGRAM_CHANNEL_ID", "TG_CHAT_ID")
+    metrics.callback(
+        "scanner_rate_limit_hits_total",
+        "Etherscan rate-limit responses per API key",
+        lambda: _per_key("rate_limit_hits"),
+        ("key",),
+        kind="counter",
     )
-    print(
-        f"Telegram configured: token={'Y' if tg_token_present else 'N'}, chat={'Y' if tg_chat_present else 'N'}"
+    metrics.callback(
+        "scanner_throttle_wait_seconds_total",
+        "Time spent waiting on the local rate limiter per API key",
+        lambda: _per_key("throttle_wait_seconds"),
+        ("key",),
+        kind="counter",
+    )
+    metrics.callback(
+        "scanner_rate_limit_effective_rps",
+        "Current adaptive request rate per API key",
+        lambda: _per_key("effective_rate"),
+        ("key",),
+    )
+    metrics.callback(
+        "scanner_api_key_used_today",
+        "Etherscan calls per API key since 00:00 UTC (ETHERSCAN_DAILY_LIMIT applies)",
+        lambda: _per_key("used_today"),
+        ("key",),
+    )
+    metrics.callback(
+        "scanner_api_key_active",
+        "1 while the API key is in rotation, 0 while it sits out (invalid or daily quota spent)",
+        lambda: {(k,): int(not v["disabled"]) for k, v in limiter_stats()["keys"].items()},
+        ("key",),
+    )
+    metrics.callback(
+        "scanner_notify_queue",
+        "Alerts waiting in the delivery queue by state",
+        lambda: {(k,): v for k, v in notifier.stats().items() if k in ("queued", "pending", "dead")},
+        ("state",),
+    )
+    metrics.callback(
+        "scanner_cursor_block",
+        "Highest fully scanned block per target",
+        lambda: _per_target("cursor_block"),
+        ("chain_id", "deployer"),
+    )
+    metrics.callback(
+        "scanner_runs_total",
+        "Completed scan ticks per target",
+        lambda: _per_target("runs"),
+        ("chain_id", "deployer"),
+        kind="counter",
+    )
+    metrics.callback(
+        "scanner_pending_deployments",
+        "Detected deployments waiting for CONFIRMATIONS blocks",
+        lambda: {(str(t.chain_id), t.deployer): len(_pending(t)) for t in targets},
+        ("chain_id", "deployer"),
+    )
+    metrics.callback(
+        "scanner_stream_connected",
+        "1 while the WebSocket push stream is connected",
+        lambda: {(str(t.chain_id), t.deployer): int(t.stream.connected) for t in targets if t.stream is not None},
+        ("chain_id", "deployer"),
+    )
+    metrics.callback(
+        "scanner_leader", "1 in the worker that holds the scanner lease", lambda: {(): int(shared.is_leader)}
+    )
+    metrics.callback("scanner_sse_clients", "Open /api/stream connections", lambda: {(): hub.stats()["clients"]})
+    metrics.callback(
+        "scanner_events_written_total",
+        "Rows written to the event store",
+        lambda: {(): events.written},
+        kind="counter",
     )
-    if os.environ.get("TELEGRAM_STARTUP_PING", "0").strip().lower() in ("1", "true", "yes"):
-        _telegram_send(
-            (
-                "✅ Contract scanner started\n"
-                f"Chain: {chain_id}\n"
-                f"Deployer: <code>{(deployer or 'default')}</code>\n"
-                f"Interval: {interval_seconds}s"
-            )
-        )
 
     # Add no-cache headers so clients always see fresh JSON and HTML
     @app.after_request
     def _no_cache(resp):  # type: ignore[override]
+        if resp.get_etag()[0]:
+            # Versioned responses may be cached but must be revalidated (If-None-Match -> 304)
+            resp.headers["Cache-Control"] = "no-cache"
+            return resp
         resp.headers["Cache-Control"] = "no-store, no-cache, must-revalidate, max-age=0"
         resp.headers["Pragma"] = "no-cache"
         resp.headers["Expires"] = "0"
         return resp
 
+    def _selected_target() -> Target:
+        """Target picked by ?chain=&deployer= (first watched pair by default)."""
+        chain = request.args.get("chain")
+        addr = request.args.get("deployer")
+        if not chain and not addr:
+            return targets[0]
+        try:
+            key = f"{int(chain or chain_id)}:{(addr or targets[0].deployer).lower()}"
+        except ValueError:
+            abort(400)
+        target = targets_by_key.get(key)
+        if target is None:
+            abort(404)
+        return target
+
     @app.route("/")
     def index():  # type: ignore[override]
-        with lock:
-            view = dict(state)  # shallow copy for template
-        view.update(
-            {
-                "interval_seconds": interval_seconds,
-                "chain_id": chain_id,
-                "deployer": deployer or "0x048ef1062cbb39B338Ac2685dA72adf104b4cEF5",
-                "history_max": history_max,
-            }
-        )
+        target = _selected_target()
+        view = dict(target.snapshot.state)  # shallow copy for template
+        view.update(target.status)
+        view.update({"history_max": latest_history, "targets": len(targets)})
         return render_template("index.html", **view)
 
     @app.route("/api/latest")
     def api_latest():  # type: ignore[override]
-        with lock:
-            return jsonify(state)
+        """Target state; ?history=0 leaves out the history list (see /api/history)."""
+        target = _selected_target()
+        with_history = request.args.get("history", "1") != "0"
+        snap = target.snapshot  # published by the scanner; no lock, no per-request encoding
+        etag = snap.etag if with_history else snap.etag + "-h0"
+        if etag in request.if_none_match:
+            # Unchanged since the client's copy: no body
+            resp = app.response_class(status=304)
+        else:
+            resp = app.response_class(snap.body(with_history), mimetype="application/json")
+        resp.set_etag(etag)
+        return resp
+
+    @app.route("/api/status")
+    def api_status():  # type: ignore[override]
+        """Run counters and scanner stats; they change every tick, so unlike /api/latest no ETag."""
+        return jsonify(_status_event(_selected_target())[1])
+
+    def _history_page(
+        target: Target,
+        since_block: Optional[int],
+        before: Optional[Tuple[int, str]],
+        limit: int,
+    ) -> List[Dict[str, Any]]:
+        """Newest-first keyset page: the published head of history first, then older rows
+        from the event store or, without one, from the full in-memory history."""
+
+        def key(item: Dict[str, Any]) -> Tuple[int, str]:
+            return int(item.get("block") or 0), str(item.get("tx") or "").lower()
+
+        def wanted(rec: Deployment) -> bool:
+            k = (int(rec.block or 0), rec.tx.lower())
+            if since_block is not None and k[0] <= since_block:
+                return False
+            return before is None or k < before
+
+        snap = target.snapshot
+        page = [rec.to_dict() for rec in snap.state["history"] if wanted(rec)]
+        # The head holds the newest rows, so a full page from it is exact; otherwise merge
+        # in the store (which may lag memory by one write batch)
+        older: List[Dict[str, Any]] = []
+        if len(page) < limit and events.enabled:
+            older = events.page(target.chain_id, target.deployer, since_block, before, limit)
+        elif len(page) < limit and len(snap.state["history"]) < snap.state.get("history_size", 0):
+            with target.lock:  # walks history up to the page: O(depth), only without a store
+                older = [rec.to_dict() for rec in islice((r for r in target.history if wanted(r)), limit)]
+        if older:
+            known = {key(item)[1] for item in page}
+            for item in older:
+                if key(item)[1] not in known:
+                    page.append(item)
+        page.sort(key=key, reverse=True)
+        return page[:limit]
+
+    @app.route("/api/history")
+    def api_history():  # type: ignore[override]
+        """Deployments newest first: ?since_block=&limit=&cursor= (cursor from next_cursor)."""
+        target = _selected_target()
+        try:
+            since = request.args.get("since_block")
+            since_block = int(since) if since else None
+            limit = max(1, min(500, int(request.args.get("limit") or 50)))
+            before: Optional[Tuple[int, str]] = None
+            cursor = request.args.get("cursor")
+            if cursor:
+                blk, _, txh = cursor.partition(":")
+                before = (int(blk), txh.lower())
+        except ValueError:
+            abort(400)
+        items = _history_page(target, since_block, before, limit)
+        next_cursor = f"{items[-1]['block']}:{items[-1]['tx']}" if len(items) == limit else None
+        version = target.snapshot.state["history_version"]
+        return jsonify({"items": items, "next_cursor": next_cursor, "history_version": version})
+
+    @app.route("/api/stream")
+    def api_stream():  # type: ignore[override]
+        """Live updates: Server-Sent Events, or polling with ?poll=1&since=<id>.
+
+        Events: "deployment" (a new result), "status" (scan tick / version
+        change) and "reset" (state replaced or the client fell behind; reload
+        /api/latest). Resume with Last-Event-ID or ?since=.
+
+        A poll answers at once with what is newer than `since`, the id to ask
+        from next and `retry_ms` (SSE_POLL_SECONDS), so a polling viewer holds
+        no thread between requests. ?wait= (max 60s) makes it a long poll,
+        which, like a stream, holds a thread and counts against SSE_MAX_CLIENTS.
+        """
+        target = _selected_target()
+        try:
+            since_arg = request.headers.get("Last-Event-ID") or request.args.get("since")
+            since = int(since_arg) if since_arg else None
+            wait = max(0.0, min(60.0, float(request.args.get("wait") or 0)))
+        except ValueError:
+            abort(400)
+        start = hub.seq if since is None else since
+
+        if request.args.get("poll") == "1":
+            # With every slot taken, a long poll is answered at once too
+            joined = wait > 0 and hub.try_join()
+            try:
+                got, upto = hub.wait(target.key, start, wait if joined else 0.0)
+            finally:
+                if joined:
+                    hub.leave()
+            retry_ms = int(poll_seconds * 1000)
+            if got is None:
+                return jsonify(
+                    {"events": [{"id": hub.seq, "event": "reset", "data": {}}], "last_id": hub.seq, "retry_ms": retry_ms}
+                )
+            return jsonify(
+                {
+                    "events": [{"id": i, "event": k, "data": d} for i, k, d in got],
+                    "last_id": upto,
+                    "retry_ms": retry_ms,
+                }
+            )
+
+        if not hub.try_join():
+            resp = jsonify({"error": "too many live viewers (SSE_MAX_CLIENTS); use ?poll=1"})
+            resp.status_code = 503
+            resp.headers["Retry-After"] = "30"
+            return resp
+
+        def generate():
+            last = start
+            # Streams are time-boxed so threads recycle; EventSource reconnects with Last-Event-ID
+            deadline = time.time() + sse_max_seconds
+            yield "retry: 3000\n\n"
+            while not stop_event.is_set() and time.time() < deadline:
+                got, upto = hub.wait(target.key, last, min(15.0, max(0.0, deadline - time.time())))
+                if got is None:
+                    last = upto
+                    yield f"id: {last}\nevent: reset\ndata: {{}}\n\n"
+                    continue
+                for i, kind, data in got:
+                    yield f"id: {i}\nevent: {kind}\ndata: {json.dumps(data)}\n\n"
+                if not got or upto > got[-1][0]:
+                    # Carry the id past other targets' events, so a reconnect of a
+                    # quiet target resumes here instead of falling out of the ring
+                    yield f"id: {upto}\n: keepalive\n\n"
+                last = upto
+
+        resp = Response(generate(), mimetype="text/event-stream")
+        resp.call_on_close(hub.leave)  # runs on normal end and on client disconnect
+        resp.headers["X-Accel-Buffering"] = "no"
+        return resp
+
+    @app.route("/api/targets")
+    def api_targets():  # type: ignore[override]
+        return jsonify({"targets": [t.summary() for t in targets], "count": len(targets)})
 
     @app.route("/api/test_telegram")
     def api_test_telegram():  # type: ignore[override]
@@ -345,7 +1234,7 @@ def create_app() -> Flask:
         timeout = int(os.environ.get("TELEGRAM_TIMEOUT", "10"))
         url = f"https://api.telegram.org/bot{token}/sendMessage"
         try:
-            r = requests.post(url, json=payload, timeout=timeout)
+            r = get_session().post(url, json=payload, timeout=timeout)
             body = r.text[:500]
             return jsonify({"ok": bool(r.ok), "status": r.status_code, "body": body})
         except Exception as e:
@@ -397,6 +1286,10 @@ def create_app() -> Flask:
     def healthz():  # type: ignore[override]
         return "ok"
 
+    @app.route("/metrics")
+    def metrics_endpoint():  # type: ignore[override]
+        return Response(metrics.render(), mimetype="text/plain; version=0.0.4")
+
     return app
 
 
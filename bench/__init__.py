@@ -0,0 +1 @@
+"""Offline benchmarks: the scanner against a local Etherscan stub (python -m bench)."""
@@ -0,0 +1,337 @@
+"""Run the scanner against the local Etherscan stub and report what it cost.
+
+  python -m bench                                   # all scenarios, synthetic fixture
+  python -m bench --scenario recent --latency-ms 80 --error-rate 0.02
+  python -m bench --fixture base.json --json out.json
+
+Scenarios:
+  latest  scan_latest_created_contract, trace cache cleared before each run
+  recent  scan_recent_created_contracts (--limit results), same
+  loop    the web app's scanner_loop: after the first scan the stub mines a
+          block every --mine-every seconds while the bootstrap backfill
+          runs in the background (reported: time to first scan and to
+          backfill done); detection latency is mined -> the
+          deployment event reaching an /api/stream long-poll client. With
+          --confirmations N it also reports mined -> confirmed event, and
+          --reorg-every K drops the newest block before every Kth block
+          (reorged deployments must be retracted, never confirmed)
+
+Reported per scenario: requests per scan, wall time p50/p99 and (loop)
+detection latency p50/p99. Scanner tunables (SCAN_CONCURRENCY,
+INTERNAL_MODE, HTTP_BACKOFF, ...) are read from the environment as usual;
+ETHERSCAN_RPS defaults to --rps here, and --prefilter sets FACTORY_ADDRESSES
+and DEPLOY_SELECTORS to the synthetic fixture's factory and deploy selector.
+"""
+
+import argparse
+import json
+import math
+import os
+import tempfile
+import threading
+import time
+from typing import Any, Dict, List, Optional
+
+from bench import fixtures
+from bench.stub import EtherscanStub
+
+
+def _pct(values: List[float], p: float) -> Optional[float]:
+    """Nearest-rank percentile; None for no samples."""
+    if not values:
+        return None
+    ordered = sorted(values)
+    return ordered[max(0, math.ceil(p / 100.0 * len(ordered)) - 1)]
+
+
+def _ms(seconds: Optional[float]) -> Optional[float]:
+    return None if seconds is None else round(seconds * 1000.0, 1)
+
+
+def _summary(name: str, walls: List[float], requests: List[int], errors: int, stub: EtherscanStub) -> Dict[str, Any]:
+    return {
+        "scenario": name,
+        "runs": len(walls),
+        "errors": errors,
+        "requests_per_scan": round(sum(requests) / len(requests), 2) if requests else None,
+        "wall_ms_p50": _ms(_pct(walls, 50)),
+        "wall_ms_p99": _ms(_pct(walls, 99)),
+        "calls": dict(stub.calls),
+        "injected": dict(stub.injected),
+    }
+
+
+def _one_shot(name: str, stub: EtherscanStub, args: argparse.Namespace) -> Dict[str, Any]:
+    from app.scan import ScanError, scan_latest_created_contract, scan_recent_created_contracts
+    from app.trace_cache import default_cache
+
+    walls: List[float] = []
+    requests: List[int] = []
+    errors = 0
+    stub.reset_counters()
+    for _ in range(args.runs):
+        if not args.warm:
+            default_cache().clear()
+        before = stub.total_calls
+        t0 = time.perf_counter()
+        try:
+            if name == "latest":
+                scan_latest_created_contract(deployer=stub.deployer, chain_id=stub.chain_id, api_base=stub.url)
+            else:
+                scan_recent_created_contracts(
+                    deployer=stub.deployer, chain_id=stub.chain_id, api_base=stub.url, limit=args.limit
+                )
+        except ScanError as e:
+            errors += 1
+            print(f"[bench] {name}: {e}")
+        walls.append(time.perf_counter() - t0)
+        requests.append(stub.total_calls - before)
+    return _summary(name, walls, requests, errors, stub)
+
+
+def _failed_scans() -> int:
+    from app import metrics
+
+    return int(
+        sum(
+            v
+            for name, labels, v in metrics.SCAN_SECONDS.samples()
+            if name.endswith("_count") and labels.get("outcome") == "error"
+        )
+    )
+
+
+def _loop(stub: EtherscanStub, args: argparse.Namespace) -> Dict[str, Any]:
+    from app.web import create_app
+
+    boot = time.time()
+    client = create_app().test_client()
+
+    def status() -> Dict[str, Any]:
+        return client.get("/api/status").get_json()
+
+    def runs() -> int:
+        return int(status().get("runs") or 0)
+
+    deadline = time.time() + 120
+    while runs() < 1:  # head tracking is live from here on
+        if time.time() > deadline:
+            raise SystemExit("[bench] loop: first scan did not finish within 120s")
+        time.sleep(0.05)
+    first_scan = time.time() - boot
+    backfilled: List[float] = []
+
+    def watch_backfill() -> None:
+        while time.time() < deadline + 300:
+            if status().get("backfill_block") is None:
+                backfilled.append(time.time() - boot)
+                return
+            time.sleep(0.05)
+
+    threading.Thread(target=watch_backfill, name="bench-backfill", daemon=True).start()
+
+    seen: Dict[str, Dict[str, float]] = {"deployment": {}, "confirmed": {}, "reorged": {}}
+    stop = threading.Event()
+
+    def listen() -> None:
+        since = 0
+        while not stop.is_set():
+            body = client.get(f"/api/stream?poll=1&since={since}&wait=2").get_json()
+            now = time.time()
+            for ev in body.get("events", []):
+                if ev.get("event") in seen:
+                    seen[ev["event"]].setdefault((ev.get("data") or {}).get("tx") or "", now)
+            since = body.get("last_id", since)
+
+    listener = threading.Thread(target=listen, name="bench-listener", daemon=True)
+    listener.start()
+    stub.reset_counters()
+    runs_before, failed_before = runs(), _failed_scans()
+    started = time.time()
+    mined: List[str] = []
+    dropped: List[str] = []
+    blocks = 0
+    while time.time() - started < args.duration:
+        blocks += 1
+        if args.reorg_every and blocks % args.reorg_every == 0:
+            gone = stub.reorg(1)
+            dropped += gone
+            mined = [h for h in mined if h not in gone]
+        mined += stub.mine(args.block_txs, args.mine_create_ratio)
+        time.sleep(args.mine_every)
+    # Keep the chain moving so the last deployments can reach CONFIRMATIONS
+    # (and reorged ones their second, retracting re-read)
+    final = "confirmed" if args.confirmations else "deployment"
+    grace = time.time() + 3 * args.interval + (args.confirmations + 2) * args.mine_every + 5
+
+    def settling() -> bool:
+        if any(h not in seen[final] for h in mined):
+            return True
+        # A deployment reorged out before any scan saw it has nothing to retract
+        return bool(args.confirmations) and any(h in seen["deployment"] and h not in seen["reorged"] for h in dropped)
+
+    while time.time() < grace and settling():
+        if args.confirmations:
+            stub.mine(0)
+        time.sleep(args.mine_every if args.confirmations else 0.05)
+    stop.set()
+    elapsed = time.time() - started
+    scans = max(1, runs() - runs_before)
+
+    lags = [seen["deployment"][h] - stub.created_at[h] for h in mined if h in seen["deployment"]]
+    out = _summary("loop", [], [], _failed_scans() - failed_before, stub)
+    out.update(
+        {
+            "runs": scans,
+            "requests_per_scan": round(stub.total_calls / scans, 2),
+            "wall_ms_p50": None,
+            "wall_ms_p99": None,
+            "elapsed_seconds": round(elapsed, 1),
+            "first_scan_ms": _ms(first_scan),
+            "backfill_ms": _ms(backfilled[0]) if backfilled else None,
+            "deployments": len(mined),
+            "missed": sum(1 for h in mined if h not in seen["deployment"]),
+            "detect_ms_p50": _ms(_pct(lags, 50)),
+            "detect_ms_p99": _ms(_pct(lags, 99)),
+        }
+    )
+    if args.confirmations:
+        waits = [seen["confirmed"][h] - stub.created_at[h] for h in mined if h in seen["confirmed"]]
+        out.update(
+            {
+                "unconfirmed": sum(1 for h in mined if h not in seen["confirmed"]),
+                "confirm_ms_p50": _ms(_pct(waits, 50)),
+                "confirm_ms_p99": _ms(_pct(waits, 99)),
+            }
+        )
+    if args.reorg_every:
+        out.update(
+            {
+                "reorged": len(dropped),
+                "retracted": sum(1 for h in dropped if h in seen["reorged"]),
+                "confirmed_after_reorg": sum(1 for h in dropped if h in seen["confirmed"]),
+            }
+        )
+    return out
+
+
+def _print(result: Dict[str, Any]) -> None:
+    line = (
+        f"[bench] {result['scenario']:<6} runs={result['runs']} errors={result['errors']}"
+        f" requests/scan={result['requests_per_scan']}"
+    )
+    if result.get("wall_ms_p50") is not None:
+        line += f" wall p50={result['wall_ms_p50']}ms p99={result['wall_ms_p99']}ms"
+    if "first_scan_ms" in result:
+        line += f" first_scan={result['first_scan_ms']}ms backfill_done={result['backfill_ms'] or '-'}ms"
+    if "detect_ms_p50" in result:
+        line += (
+            f" detect p50={result['detect_ms_p50']}ms p99={result['detect_ms_p99']}ms"
+            f" ({result['deployments']} deployments, {result['missed']} missed)"
+        )
+    if "confirm_ms_p50" in result:
+        line += (
+            f" confirm p50={result['confirm_ms_p50']}ms p99={result['confirm_ms_p99']}ms"
+            f" ({result['unconfirmed']} unconfirmed)"
+        )
+    if "reorged" in result:
+        line += (
+            f" reorged={result['reorged']} retracted={result['retracted']}"
+            f" confirmed_after_reorg={result['confirmed_after_reorg']}"
+        )
+    print(line)
+    print(f"         calls={result['calls']} injected={result['injected']}")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Offline scanner benchmarks against a local Etherscan stub")
+    parser.add_argument("--scenario", default="latest,recent,loop", help="comma-separated: latest, recent, loop")
+    parser.add_argument("--fixture", help="recorded fixture JSON (default: synthetic, see bench/fixtures.py)")
+    parser.add_argument("--blocks", type=int, default=300, help="synthetic fixture size in blocks")
+    parser.add_argument("--create-ratio", type=float, default=0.1, help="share of txs that deploy a contract")
+    parser.add_argument("--runs", type=int, default=5, help="runs per one-shot scenario")
+    parser.add_argument("--limit", type=int, default=5, help="results per scan_recent run")
+    parser.add_argument("--warm", action="store_true", help="keep the trace cache between runs")
+    parser.add_argument("--latency-ms", type=float, default=20.0)
+    parser.add_argument("--jitter-ms", type=float, default=10.0)
+    parser.add_argument("--error-rate", type=float, default=0.0)
+    parser.add_argument("--rate-limit-rate", type=float, default=0.0)
+    parser.add_argument("--server-rps", type=float, default=0.0, help="stub-side rate limit (0: none)")
+    parser.add_argument("--rps", type=float, default=50.0, help="client rate limit per key (ETHERSCAN_RPS)")
+    parser.add_argument("--keys", type=int, default=1, help="API keys in the pool (ETHERSCAN_API_KEYS)")
+    parser.add_argument("--prefilter", action="store_true", help="only trace calls to the synthetic deploy selector")
+    parser.add_argument("--interval", type=int, default=1, help="loop: SCAN_INTERVAL_SECONDS")
+    parser.add_argument("--duration", type=float, default=20.0, help="loop: seconds of mining")
+    parser.add_argument("--mine-every", type=float, default=1.0, help="loop: seconds between blocks")
+    parser.add_argument("--block-txs", type=int, default=2, help="loop: deployer txs per mined block")
+    parser.add_argument("--mine-create-ratio", type=float, default=0.5, help="loop: share of mined txs that deploy")
+    parser.add_argument("--confirmations", type=int, default=0, help="loop: CONFIRMATIONS")
+    parser.add_argument("--reorg-every", type=int, default=0, help="loop: drop the newest block before every Kth block")
+    parser.add_argument("--seed", type=int, default=1)
+    parser.add_argument("--json", dest="json_out", help="also write the results to this file")
+    args = parser.parse_args()
+
+    if args.fixture:
+        fixture = fixtures.load(args.fixture)
+    else:
+        fixture = fixtures.synthetic(blocks=args.blocks, create_ratio=args.create_ratio, seed=args.seed)
+    stub = EtherscanStub(
+        fixture,
+        latency_ms=args.latency_ms,
+        jitter_ms=args.jitter_ms,
+        error_rate=args.error_rate,
+        rate_limit_rate=args.rate_limit_rate,
+        server_rps=args.server_rps,
+        seed=args.seed,
+    )
+    url = stub.start()
+
+    # Must be in place before app.* is imported (module-level defaults)
+    workdir = tempfile.mkdtemp(prefix="contract-scanner-bench-")
+    os.environ.update(
+        ETHERSCAN_API_URL=url,
+        ETHERSCAN_API_KEY="bench",
+        ETHERSCAN_API_KEYS=",".join(f"bench{i}" for i in range(args.keys)) if args.keys > 1 else "",
+        DEPLOYER=stub.deployer,
+        CHAIN_ID=str(stub.chain_id),
+        SCAN_INTERVAL_SECONDS=str(max(1, args.interval)),
+        TRACE_CACHE_FILE="",
+        EVENTS_FILE="",
+        SHARED_STATE_FILE="",
+        CURSOR_FILE=os.path.join(workdir, "cursors.json"),
+        NOTIFY_SPOOL_FILE=os.path.join(workdir, "spool.json"),
+        CONFIRMATIONS=str(args.confirmations),
+    )
+    if args.prefilter:
+        os.environ.update(FACTORY_ADDRESSES=fixtures.FACTORY, DEPLOY_SELECTORS=fixtures.DEPLOY_SELECTOR)
+    os.environ.setdefault("ETHERSCAN_RPS", str(args.rps))
+    os.environ.setdefault("ETHERSCAN_BURST", str(max(1, int(args.rps))))
+    for var in ("TELEGRAM_BOT_TOKEN", "TELEGRAM_TOKEN", "BOT_TOKEN", "TG_BOT_TOKEN", "WATCHLIST", "WATCHLIST_FILE"):
+        os.environ.pop(var, None)
+
+    print(
+        f"[bench] stub {url}: {len(fixture['txs'])} txs, {len(fixture['internal'])} internal rows;"
+        f" latency={args.latency_ms}±{args.jitter_ms}ms errors={args.error_rate}"
+        f" rate_limited={args.rate_limit_rate} server_rps={args.server_rps or '-'}"
+    )
+    results: List[Dict[str, Any]] = []
+    scenarios = [s.strip() for s in args.scenario.split(",") if s.strip()]
+    # The loop leaves the app's threads running, so it goes last
+    for name in sorted(scenarios, key=lambda s: s == "loop"):
+        if name in ("latest", "recent"):
+            result = _one_shot(name, stub, args)
+        elif name == "loop":
+            result = _loop(stub, args)
+        else:
+            raise SystemExit(f"unknown scenario {name!r}")
+        _print(result)
+        results.append(result)
+
+    if args.json_out:
+        with open(args.json_out, "w", encoding="utf-8") as f:
+            json.dump({"args": vars(args), "results": results}, f, indent=2)
+    stub.stop()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,129 @@
+"""Fixtures for the Etherscan stub: recorded from the real API, or synthetic.
+
+A fixture is one JSON object:
+  {"chain_id": 8453, "deployer": "0x...",
+   "txs": [txlist rows, oldest first],
+   "internal": [txlistinternal rows, each with the parent "hash"]}
+
+Rows keep Etherscan's own field names, so the stub can replay them as-is.
+
+Record (spends API quota once; needs ETHERSCAN_API_KEY):
+  python -m bench.fixtures --deployer 0x... --chain-id 8453 --pages 2 --out base.json
+"""
+
+import argparse
+import json
+import os
+import random
+from typing import Any, Dict, List, Optional
+
+FACTORY = "0x777777751622c0d3258f214f9df38e35bf45baf3"
+# Synthetic txs that deploy call the factory with this selector; the others
+# use random ones (python -m bench --prefilter uses it as DEPLOY_SELECTORS)
+DEPLOY_SELECTOR = "0x0d3a4e51"
+
+
+def load(path: str) -> Dict[str, Any]:
+    with open(path, "r", encoding="utf-8") as f:
+        fixture = json.load(f)
+    fixture["txs"].sort(key=lambda t: (int(t.get("blockNumber") or 0), int(t.get("transactionIndex") or 0)))
+    return fixture
+
+
+def make_tx(
+    deployer: str, block: int, index: int, ts: int, rng: random.Random, selector: Optional[str] = None
+) -> Dict[str, Any]:
+    return {
+        "blockNumber": str(block),
+        "timeStamp": str(ts),
+        "hash": "0x%064x" % rng.getrandbits(256),
+        "transactionIndex": str(index),
+        "from": deployer,
+        "to": FACTORY,
+        "input": selector or "0x" + "%08x" % rng.getrandbits(32),
+        "isError": "0",
+        "contractAddress": "",
+    }
+
+
+def make_create(tx: Dict[str, Any], rng: random.Random) -> Dict[str, Any]:
+    return {
+        "blockNumber": tx["blockNumber"],
+        "timeStamp": tx["timeStamp"],
+        "hash": tx["hash"],
+        "from": FACTORY,
+        "to": "",
+        "contractAddress": "0x%040x" % rng.getrandbits(160),
+        "type": "create2",
+        "isError": "0",
+    }
+
+
+def synthetic(
+    deployer: str = "0x048ef1062cbb39b338ac2685da72adf104b4cef5",
+    chain_id: int = 8453,
+    blocks: int = 300,
+    txs_per_block: int = 2,
+    create_ratio: float = 0.1,
+    start_block: int = 20_000_000,
+    start_ts: int = 1_700_000_000,
+    seed: int = 1,
+) -> Dict[str, Any]:
+    """Deterministic fixture: `create_ratio` of the deployer's txs deploy a contract."""
+    rng = random.Random(seed)
+    txs: List[Dict[str, Any]] = []
+    internal: List[Dict[str, Any]] = []
+    for b in range(blocks):
+        for i in range(txs_per_block):
+            creates = rng.random() < create_ratio
+            tx = make_tx(deployer, start_block + b, i, start_ts + 2 * b, rng, DEPLOY_SELECTOR if creates else None)
+            txs.append(tx)
+            if creates:
+                internal.append(make_create(tx, rng))
+    return {"chain_id": chain_id, "deployer": deployer.lower(), "txs": txs, "internal": internal}
+
+
+def record(
+    api_key: str,
+    deployer: str,
+    chain_id: int,
+    pages: int = 1,
+    page_size: int = 100,
+    api_base: Optional[str] = None,
+) -> Dict[str, Any]:
+    """The deployer's newest `pages` txlist pages plus the internal traces of each tx."""
+    from app.scan import ETHERSCAN_V2, _fetch_internal_for_tx, _fetch_txs_page
+
+    base = api_base or ETHERSCAN_V2
+    txs: List[Dict[str, Any]] = []
+    for page in range(1, pages + 1):
+        rows = _fetch_txs_page(api_key, chain_id, deployer.lower(), page, page_size, api_base=base)
+        txs.extend(rows)
+        if len(rows) < page_size:
+            break
+    internal: List[Dict[str, Any]] = []
+    for tx in txs:
+        for row in _fetch_internal_for_tx(api_key, chain_id, tx["hash"], api_base=base):
+            internal.append({**row, "hash": tx["hash"]})
+    txs.reverse()  # txlist pages are newest first
+    return {"chain_id": chain_id, "deployer": deployer.lower(), "txs": txs, "internal": internal}
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Record an Etherscan fixture for the benchmarks")
+    parser.add_argument("--deployer", required=True)
+    parser.add_argument("--chain-id", type=int, default=8453)
+    parser.add_argument("--pages", type=int, default=1)
+    parser.add_argument("--out", required=True)
+    args = parser.parse_args()
+    api_key = os.environ.get("ETHERSCAN_API_KEY")
+    if not api_key:
+        raise SystemExit("ETHERSCAN_API_KEY is not set")
+    fixture = record(api_key, args.deployer, args.chain_id, args.pages)
+    with open(args.out, "w", encoding="utf-8") as f:
+        json.dump(fixture, f)
+    print(f"[bench] recorded {len(fixture['txs'])} txs, {len(fixture['internal'])} internal rows -> {args.out}")
+
+
+if __name__ == "__main__":
+    main()
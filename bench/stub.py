@@ -0,0 +1,211 @@
+"""Local Etherscan stub that replays a fixture (see bench/fixtures.py).
+
+Answers the queries the scanner makes — txlist, txlistinternal?txhash=,
+txlistinternal?address= and the eth_blockNumber proxy — with Etherscan's
+paging, sorting and "No transactions found" quirks. reorg() drops the newest
+blocks, as a chain reorganisation would. Faults are injected per request:
+  latency_ms / jitter_ms  added delay before answering
+  error_rate              share of requests answered with HTTP 502
+  rate_limit_rate         share answered with Etherscan's in-band rate-limit payload
+  server_rps              in-band rate limit whenever one API key exceeds this rate
+Random choices come from a seeded RNG so runs are repeatable.
+"""
+
+import json
+import random
+import threading
+import time
+import urllib.parse
+from bisect import bisect_left, bisect_right
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Any, Dict, List, Optional
+
+from bench.fixtures import DEPLOY_SELECTOR, make_create, make_tx
+
+_EMPTY = {"status": "0", "message": "No transactions found", "result": []}
+_RATE_LIMITED = {"status": "0", "message": "NOTOK", "result": "Max calls per sec rate limit reached (5/sec)"}
+
+
+class EtherscanStub:
+    def __init__(
+        self,
+        fixture: Dict[str, Any],
+        latency_ms: float = 0.0,
+        jitter_ms: float = 0.0,
+        error_rate: float = 0.0,
+        rate_limit_rate: float = 0.0,
+        server_rps: float = 0.0,
+        seed: int = 1,
+    ):
+        self.chain_id = int(fixture.get("chain_id") or 8453)
+        self.deployer = str(fixture["deployer"]).lower()
+        self.latency = latency_ms / 1000.0
+        self.jitter = jitter_ms / 1000.0
+        self.error_rate = error_rate
+        self.rate_limit_rate = rate_limit_rate
+        self.server_rps = server_rps
+        self._rng = random.Random(seed)
+        self._lock = threading.Lock()
+        self._txs: List[Dict[str, Any]] = list(fixture["txs"])  # oldest first
+        self._blocks = [int(t["blockNumber"]) for t in self._txs]
+        self._head = self._blocks[-1] if self._blocks else 0  # chain head; blocks may hold no deployer tx
+        self._internal: Dict[str, List[Dict[str, Any]]] = {}
+        for row in fixture.get("internal", []):
+            self._internal.setdefault(row["hash"].lower(), []).append(row)
+        self.created_at: Dict[str, float] = {}  # tx hash -> wall time it was mined
+        self.calls: Dict[str, int] = {}
+        self.injected = {"error": 0, "rate_limited": 0}
+        self._buckets: Dict[str, List[float]] = {}  # apikey -> [tokens, last refill]
+        self._server: Optional[ThreadingHTTPServer] = None
+        self.url = ""
+
+    # --- chain ---
+
+    @property
+    def head(self) -> int:
+        with self._lock:
+            return self._head
+
+    def mine(self, txs: int = 1, create_ratio: float = 1.0) -> List[str]:
+        """Append a block of deployer txs stamped now; returns the hashes that deploy."""
+        now = time.time()
+        created: List[str] = []
+        with self._lock:
+            self._head += 1
+            block = self._head
+            for i in range(txs):
+                creates = self._rng.random() < create_ratio
+                tx = make_tx(self.deployer, block, i, int(now), self._rng, DEPLOY_SELECTOR if creates else None)
+                if creates:
+                    self._internal[tx["hash"]] = [make_create(tx, self._rng)]
+                    self.created_at[tx["hash"]] = now
+                    created.append(tx["hash"])
+                self._txs.append(tx)
+                self._blocks.append(block)
+        return created
+
+    def reorg(self, depth: int = 1) -> List[str]:
+        """Drop the txs of the newest `depth` blocks; the head stays, so the next
+        mine() builds on the replacement chain. Returns the dropped deploying hashes."""
+        dropped: List[str] = []
+        with self._lock:
+            cut = bisect_left(self._blocks, self._head - depth + 1)
+            for tx in self._txs[cut:]:
+                if self._internal.pop(tx["hash"], None):
+                    self.created_at.pop(tx["hash"], None)
+                    dropped.append(tx["hash"])
+            del self._txs[cut:]
+            del self._blocks[cut:]
+        return dropped
+
+    def reset_counters(self) -> None:
+        with self._lock:
+            self.calls = {}
+            self.injected = {"error": 0, "rate_limited": 0}
+
+    @property
+    def total_calls(self) -> int:
+        with self._lock:
+            return sum(self.calls.values())
+
+    # --- HTTP ---
+
+    def start(self) -> str:
+        stub = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def log_message(self, *args: Any) -> None:
+                pass
+
+            def do_GET(self) -> None:
+                query = dict(urllib.parse.parse_qsl(urllib.parse.urlparse(self.path).query))
+                status, body = stub.handle(query)
+                payload = json.dumps(body).encode()
+                self.send_response(status)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(payload)))
+                self.end_headers()
+                self.wfile.write(payload)
+
+        self._server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+        self._server.daemon_threads = True
+        threading.Thread(target=self._server.serve_forever, name="etherscan-stub", daemon=True).start()
+        self.url = f"http://127.0.0.1:{self._server.server_address[1]}/v2/api"
+        return self.url
+
+    def stop(self) -> None:
+        if self._server is not None:
+            self._server.shutdown()
+            self._server.server_close()
+            self._server = None
+
+    def _throttled(self, apikey: str) -> bool:
+        """Server-side token bucket per API key, like Etherscan's (caller holds the lock)."""
+        if self.server_rps <= 0:
+            return False
+        now = time.monotonic()
+        bucket = self._buckets.setdefault(apikey, [self.server_rps, now])
+        bucket[0] = min(self.server_rps, bucket[0] + (now - bucket[1]) * self.server_rps)
+        bucket[1] = now
+        if bucket[0] < 1.0:
+            return True
+        bucket[0] -= 1.0
+        return False
+
+    def handle(self, q: Dict[str, str]):
+        """(HTTP status, JSON body) for one query."""
+        action = q.get("action") or ""
+        with self._lock:
+            self.calls[action] = self.calls.get(action, 0) + 1
+            delay = self.latency + (self._rng.random() * self.jitter if self.jitter else 0.0)
+            fail = self._rng.random() < self.error_rate
+            limited = self._rng.random() < self.rate_limit_rate or self._throttled(q.get("apikey") or "")
+        if delay:
+            time.sleep(delay)
+        if fail:
+            with self._lock:
+                self.injected["error"] += 1
+            return 502, {"error": "injected"}
+        if limited:
+            with self._lock:
+                self.injected["rate_limited"] += 1
+            return 200, _RATE_LIMITED
+        with self._lock:
+            if action == "txlist":
+                rows = self._txlist(q)
+            elif action == "txlistinternal" and q.get("txhash"):
+                rows = list(self._internal.get(q["txhash"].lower(), []))
+            elif action == "txlistinternal" and q.get("address"):
+                rows = self._internal_for_address(q)
+            elif action == "eth_blockNumber":
+                return 200, {"jsonrpc": "2.0", "id": 83, "result": hex(self._head)}
+            else:
+                return 200, {"status": "0", "message": "NOTOK", "result": f"Unsupported action {action!r}"}
+        return 200, ({"status": "1", "message": "OK", "result": rows} if rows else _EMPTY)
+
+    def _range(self, q: Dict[str, str]) -> List[Dict[str, Any]]:
+        lo = bisect_left(self._blocks, int(q.get("startblock") or 0))
+        hi = bisect_right(self._blocks, int(q.get("endblock") or 99999999))
+        return self._txs[lo:hi]
+
+    @staticmethod
+    def _page(rows: List[Dict[str, Any]], q: Dict[str, str], default_offset: int) -> List[Dict[str, Any]]:
+        if (q.get("sort") or "asc") == "desc":
+            rows = rows[::-1]
+        page = max(1, int(q.get("page") or 1))
+        offset = max(1, int(q.get("offset") or default_offset))
+        return rows[(page - 1) * offset : page * offset]
+
+    def _txlist(self, q: Dict[str, str]) -> List[Dict[str, Any]]:
+        if (q.get("address") or "").lower() != self.deployer:
+            return []
+        return self._page(self._range(q), q, 10000)
+
+    def _internal_for_address(self, q: Dict[str, str]) -> List[Dict[str, Any]]:
+        address = q["address"].lower()
+        rows = []
+        for tx in self._range(q):
+            for row in self._internal.get(tx["hash"].lower(), []):
+                if address in ((row.get("from") or "").lower(), (row.get("to") or "").lower()):
+                    rows.append(row)
+        return self._page(rows, q, 10000)
@@ -0,0 +1,26 @@
+"""gunicorn settings for the Procfile (gunicorn -c gunicorn.conf.py).
+
+One worker unless SHARED_STATE_FILE is set: several workers need the shared
+lease file to agree on a single leader. WEB_CONCURRENCY and GUNICORN_THREADS
+override the defaults; -w / --threads on the command line override both.
+Whatever count gunicorn actually runs is exported to the workers, so
+app.shared turns coordination on for -w N > 1 and the SSE cap follows --threads.
+"""
+
+import os
+
+bind = f"0.0.0.0:{os.environ.get('PORT', '8000')}"
+worker_class = "gthread"
+workers = int(os.environ.get("WEB_CONCURRENCY") or (4 if os.environ.get("SHARED_STATE_FILE") else 1))
+threads = int(os.environ.get("GUNICORN_THREADS") or 64)
+
+
+def on_starting(server) -> None:
+    """Runs in the master before the first fork; workers inherit its environment."""
+    os.environ["WEB_CONCURRENCY"] = str(server.cfg.workers)
+    os.environ["GUNICORN_THREADS"] = str(server.cfg.threads)
+
+
+def nworkers_changed(server, new_value: int, old_value) -> None:
+    """TTIN/TTOU: workers forked from now on see the new count."""
+    os.environ["WEB_CONCURRENCY"] = str(new_value)
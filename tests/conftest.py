@@ -0,0 +1,60 @@
+import os
+import sys
+
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.trace_cache import default_cache  # noqa: E402
+from bench.fixtures import synthetic  # noqa: E402
+from bench.stub import EtherscanStub  # noqa: E402
+from tests.rpc_stub import RPCStub  # noqa: E402
+from tests.ws_stub import FakeWSServer  # noqa: E402
+
+
+@pytest.fixture
+def rpc_stub():
+    stub = RPCStub()
+    stub.start()
+    yield stub
+    stub.stop()
+
+
+@pytest.fixture
+def ws_stub():
+    server = FakeWSServer()
+    server.start()
+    yield server
+    server.stop()
+
+
+@pytest.fixture
+def etherscan_stub(monkeypatch):
+    """bench's Etherscan stub over a small synthetic fixture, with a fresh trace cache."""
+    monkeypatch.setenv("ETHERSCAN_API_KEY", "test")
+    monkeypatch.setenv("ETHERSCAN_RPS", "1000")
+    monkeypatch.setenv("ETHERSCAN_BURST", "1000")
+    for name in ("ETHERSCAN_API_KEYS", "INTERNAL_MODE", "SWEEP_ADDRESS", "FACTORY_ADDRESSES", "DEPLOY_SELECTORS"):
+        monkeypatch.delenv(name, raising=False)
+    stub = EtherscanStub(synthetic(blocks=60, create_ratio=0.3), seed=2)  # mined hashes differ from the fixture
+    stub.start()
+    default_cache().clear()
+    yield stub
+    stub.stop()
+    default_cache().clear()
+
+
+@pytest.fixture
+def make_app():
+    """create_app() for one test; every app it made is stopped at teardown, threads and all."""
+    from app.web import create_app
+
+    apps = []
+
+    def make():
+        apps.append(create_app())
+        return apps[-1]
+
+    yield make
+    for app in apps:
+        app.extensions["scanner_stop"]()
@@ -0,0 +1,128 @@
+"""Local JSON-RPC stub for app.rpc: eth_blockNumber, eth_getLogs, eth_getBlockByNumber.
+
+Serves a list of factory logs over a chain whose head the test moves with
+mine(). Batched requests (a JSON list) get a batched reply, like a node.
+With max_range set, eth_getLogs over a wider block span is refused with the
+-32005 error most providers use; logs_error makes every eth_getLogs fail
+with that error object instead. Every POST is recorded in `posts` as the
+list of (method, params) it carried.
+"""
+
+import json
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Any, Dict, List, Optional, Tuple
+
+FACTORY = "0x" + "fa" * 20
+TOPIC = "0x" + "ab" * 32
+GENESIS_TS = 1_700_000_000
+
+
+def block_ts(block: int) -> int:
+    return GENESIS_TS + 2 * block
+
+
+class RPCStub:
+    def __init__(self, head: int = 0, max_range: Optional[int] = None):
+        self.head = head
+        self.max_range = max_range
+        self.logs_error: Optional[Dict[str, Any]] = None
+        self.logs: List[Dict[str, Any]] = []
+        self.posts: List[List[Tuple[str, List[Any]]]] = []
+        self._lock = threading.Lock()
+        self._server: Optional[ThreadingHTTPServer] = None
+        self.url = ""
+
+    # --- chain ---
+
+    def add_log(self, block: int, tx: str, contract: str, log_index: int = 0) -> Dict[str, Any]:
+        """A deployment event at `block` naming `contract` in topic 1; moves the head up to it."""
+        log = {
+            "address": FACTORY,
+            "topics": [TOPIC, "0x" + "0" * 24 + contract[2:].lower()],
+            "data": "0x",
+            "blockNumber": hex(block),
+            "transactionHash": tx,
+            "logIndex": hex(log_index),
+            "removed": False,
+        }
+        with self._lock:
+            self.logs.append(log)
+            self.head = max(self.head, block)
+        return log
+
+    def mine(self, blocks: int = 1) -> int:
+        with self._lock:
+            self.head += blocks
+            return self.head
+
+    def calls(self, method: str) -> List[List[Any]]:
+        """Params of every `method` call so far, in order."""
+        with self._lock:
+            return [params for post in self.posts for m, params in post if m == method]
+
+    # --- JSON-RPC ---
+
+    def _reply(self, req: Dict[str, Any]) -> Dict[str, Any]:
+        method, params = req.get("method"), req.get("params") or []
+        out: Dict[str, Any] = {"jsonrpc": "2.0", "id": req.get("id")}
+        if method == "eth_blockNumber":
+            out["result"] = hex(self.head)
+        elif method == "eth_getBlockByNumber":
+            number = int(params[0], 16)
+            out["result"] = {"number": hex(number), "timestamp": hex(block_ts(number))} if number <= self.head else None
+        elif method == "eth_getLogs":
+            flt = params[0]
+            lo, hi = int(flt["fromBlock"], 16), int(flt["toBlock"], 16)
+            if self.logs_error is not None:
+                out["error"] = self.logs_error
+            elif self.max_range is not None and hi - lo + 1 > self.max_range:
+                out["error"] = {"code": -32005, "message": f"query exceeds max block range {self.max_range}"}
+            else:
+                topic = (flt.get("topics") or [None])[0]
+                out["result"] = [
+                    lg for lg in self.logs
+                    if lo <= int(lg["blockNumber"], 16) <= hi
+                    and lg["address"] == str(flt.get("address") or "").lower()
+                    and (topic is None or lg["topics"][0] == topic)
+                ]
+        else:
+            out["error"] = {"code": -32601, "message": f"method {method} not found"}
+        return out
+
+    def handle(self, body: Any) -> Any:
+        reqs = body if isinstance(body, list) else [body]
+        with self._lock:
+            self.posts.append([(r.get("method"), r.get("params") or []) for r in reqs])
+            replies = [self._reply(r) for r in reqs]
+        return replies if isinstance(body, list) else replies[0]
+
+    # --- HTTP ---
+
+    def start(self) -> str:
+        stub = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def log_message(self, *args: Any) -> None:
+                pass
+
+            def do_POST(self) -> None:
+                body = json.loads(self.rfile.read(int(self.headers.get("Content-Length") or 0)))
+                payload = json.dumps(stub.handle(body)).encode()
+                self.send_response(200)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(payload)))
+                self.end_headers()
+                self.wfile.write(payload)
+
+        self._server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+        self._server.daemon_threads = True
+        threading.Thread(target=self._server.serve_forever, name="rpc-stub", daemon=True).start()
+        self.url = f"http://127.0.0.1:{self._server.server_address[1]}"
+        return self.url
+
+    def stop(self) -> None:
+        if self._server is not None:
+            self._server.shutdown()
+            self._server.server_close()
+            self._server = None
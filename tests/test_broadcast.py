@@ -0,0 +1,44 @@
+import threading
+
+from app.broadcast import Broadcaster
+
+
+def test_quiet_viewer_keeps_up_with_a_busy_ring():
+    hub = Broadcaster(maxlen=4)
+    last = 0
+    for _ in range(10):
+        hub.publish("busy", "status", {})
+        got, last = hub.wait("quiet", last, 0.0)
+        assert got == []  # never a reset, though the ring has long moved past seq 0
+    assert last == hub.seq
+
+    seq = hub.publish("quiet", "deployment", {"tx": "0x1"})
+    got, last = hub.wait("quiet", last, 0.0)
+    assert got == [(seq, "deployment", {"tx": "0x1"})]
+    assert last == seq
+
+
+def test_waiting_viewer_skips_other_keys_and_wakes_on_its_own():
+    hub = Broadcaster(maxlen=2)
+    result = {}
+
+    def viewer():
+        result["got"] = hub.wait("quiet", 0, 10.0)
+
+    thread = threading.Thread(target=viewer)
+    thread.start()
+    for _ in range(5):
+        hub.publish("busy", "status", {})  # more than the ring holds while it waits
+    seq = hub.publish("quiet", "deployment", {})
+    thread.join(10.0)
+
+    assert result["got"] == ([(seq, "deployment", {})], seq)
+
+
+def test_only_missing_own_events_resets():
+    hub = Broadcaster(maxlen=2)
+    for _ in range(5):
+        hub.publish("busy", "status", {})
+    assert hub.wait("quiet", 1, 0.0) == ([], 5)
+    assert hub.wait("busy", 1, 0.0) == (None, 5)  # seqs 2 and 3 are gone
+    assert hub.wait("busy", 3, 0.0) == ([(4, "status", {}), (5, "status", {})], 5)
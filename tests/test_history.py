@@ -0,0 +1,59 @@
+from app.history import History
+
+
+def _item(n: int, block: int, status: str = "confirmed"):
+    return {"contract": f"0x{n:040x}", "tx": f"0x{n:064x}", "block": str(block), "utc": "", "status": status}
+
+
+def _txs(records):
+    return [int(rec.tx, 16) for rec in records]
+
+
+def test_add_dedupes_and_evicts_the_oldest():
+    h = History(3)
+    assert [i["tx"] for i in h.add([_item(2, 20), _item(1, 10)])] == [_item(2, 20)["tx"], _item(1, 10)["tx"]]
+    assert h.add([_item(2, 20)]) == []
+    h.add([_item(4, 40), _item(3, 30)])
+    assert _txs(h) == [4, 3, 2]
+    assert _item(1, 10)["tx"] not in h
+
+
+def test_update_and_remove_keep_positions_and_the_pending_index():
+    h = History(10)
+    h.add([_item(n, n * 10, "pending") for n in range(5, 0, -1)])
+    assert sorted(_txs(h.pending())) == [1, 2, 3, 4, 5]
+    published = h.head(5)
+
+    assert h.update(_item(3, 30, "confirmed"))
+    assert h.remove(_item(4, 40)["tx"])
+    assert not h.remove(_item(4, 40)["tx"])
+
+    assert _txs(h) == [5, 3, 2, 1]
+    assert [rec.status for rec in h] == ["pending", "confirmed", "pending", "pending"]
+    assert sorted(_txs(h.pending())) == [1, 2, 5]
+    assert published[2].status == "pending"  # records already published are never mutated
+    assert len(h) == 4 and _txs(h.head(2)) == [5, 3] and h.newest().tx == _item(5, 50)["tx"]
+
+
+def test_removed_slots_do_not_count_towards_the_cap():
+    h = History(3)
+    h.add([_item(3, 30), _item(2, 20), _item(1, 10)])
+    h.remove(_item(2, 20)["tx"])
+    h.add([_item(4, 40)])
+    assert _txs(h) == [4, 3, 1]
+
+    h = History(1000)
+    h.add([_item(n, n, "pending") for n in range(200, 0, -1)])
+    for n in range(2, 152):  # empties slots in the middle
+        h.remove(_item(n, n)["tx"])
+    assert len(h) == 50 and len(h._items) <= 2 * len(h)  # compacted whenever half are empty
+    assert _txs(h.head(3)) == [200, 199, 198] and _txs(h)[-1] == 1
+    assert len(h.pending()) == 50
+
+def test_merge_places_backfill_by_block():
+    h = History(4)
+    h.add([_item(5, 50), _item(2, 20)])
+    fresh = h.merge([_item(4, 40), _item(1, 10), _item(6, 60)])
+    assert len(fresh) == 3
+    assert _txs(h) == [6, 5, 4, 2]  # full: block 10 is older than everything kept
+    assert h.merge([_item(0, 5)]) == []
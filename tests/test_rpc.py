@@ -0,0 +1,121 @@
+import time
+
+import pytest
+
+from app.rpc import scan_logs_created_contracts
+from app.scan import ScanError
+from tests.rpc_stub import FACTORY, TOPIC, block_ts
+
+
+def _tx(n: int) -> str:
+    return "0x" + f"{n:064x}"
+
+
+def _contract(n: int) -> str:
+    return "0x" + f"{n:040x}"
+
+
+def _scan(stub, since, **kw):
+    return scan_logs_created_contracts(since, FACTORY, rpc_url=stub.url, topic=TOPIC, **kw)
+
+
+def _ranges(stub):
+    return [(int(p[0]["fromBlock"], 16), int(p[0]["toBlock"], 16)) for p in stub.calls("eth_getLogs")]
+
+
+def test_chunks_from_cursor_to_head(rpc_stub):
+    for n, block in enumerate((10, 2500, 4500), 1):
+        rpc_stub.add_log(block, _tx(n), _contract(n))
+
+    found, cursor = _scan(rpc_stub, 0, max_range=1000)
+
+    assert cursor == 4500
+    assert _ranges(rpc_stub) == [(1, 1000), (1001, 2000), (2001, 3000), (3001, 4000), (4001, 4500)]
+    assert [r["block"] for r in found] == ["4500", "2500", "10"]  # newest first
+    assert found[0] == {
+        "contract": _contract(3),
+        "tx": _tx(3),
+        "block": "4500",
+        "utc": time.strftime("%Y-%m-%d %H:%M:%S", time.gmtime(block_ts(4500))),
+    }
+
+
+def test_max_chunks_returns_the_block_it_got_to(rpc_stub):
+    rpc_stub.add_log(10, _tx(1), _contract(1))
+    rpc_stub.add_log(4500, _tx(2), _contract(2))
+
+    found, cursor = _scan(rpc_stub, 0, max_range=1000, max_chunks=2)
+    assert cursor == 2000
+    assert [r["tx"] for r in found] == [_tx(1)]
+
+    found, cursor = _scan(rpc_stub, cursor, max_range=1000)
+    assert cursor == 4500
+    assert [r["tx"] for r in found] == [_tx(2)]
+
+
+def test_up_to_date_cursor_asks_for_no_logs(rpc_stub):
+    rpc_stub.add_log(100, _tx(1), _contract(1))
+
+    assert _scan(rpc_stub, 100) == ([], 100)
+    assert rpc_stub.calls("eth_getLogs") == []
+
+
+def test_splits_ranges_the_node_rejects(rpc_stub):
+    rpc_stub.max_range = 300
+    blocks = (1, 299, 301, 700, 999, 1000, 1600)
+    for n, block in enumerate(blocks, 1):
+        rpc_stub.add_log(block, _tx(n), _contract(n))
+
+    found, cursor = _scan(rpc_stub, 0, max_range=1000)
+
+    assert cursor == 1600
+    assert sorted(int(r["block"]) for r in found) == list(blocks)
+    ranges = _ranges(rpc_stub)
+    assert ranges[:3] == [(1, 1000), (1, 500), (1, 250)]  # halved until the node accepts it
+    accepted = [(lo, hi) for lo, hi in ranges if hi - lo + 1 <= 300]
+    assert all(hi - lo + 1 == 250 for lo, hi in accepted[:-1])  # the smaller span sticks
+    assert accepted[0][0] == 1 and accepted[-1][1] == 1600
+    assert all(b[0] == a[1] + 1 for a, b in zip(accepted, accepted[1:]))  # no gaps, no overlap
+
+
+def test_other_rpc_errors_are_not_split(rpc_stub):
+    rpc_stub.add_log(5, _tx(1), _contract(1))
+    rpc_stub.logs_error = {"code": -32000, "message": "header not found"}
+
+    with pytest.raises(ScanError, match="header not found"):
+        _scan(rpc_stub, 0, max_range=4)
+    assert _ranges(rpc_stub) == [(1, 4)]
+
+    rpc_stub.logs_error = None
+    rpc_stub.max_range = 0  # refuses even a single block
+    with pytest.raises(ScanError, match="max block range"):
+        _scan(rpc_stub, 0, max_range=4)
+    assert _ranges(rpc_stub)[1:] == [(1, 4), (1, 2), (1, 1)]
+
+
+def test_block_times_in_one_batch(rpc_stub):
+    rpc_stub.add_log(20, _tx(1), _contract(1))
+    rpc_stub.add_log(20, _tx(2), _contract(2), log_index=1)
+    rpc_stub.add_log(35, _tx(3), _contract(3))
+    rpc_stub.add_log(90, _tx(4), _contract(4))
+
+    found, _ = _scan(rpc_stub, 0)
+
+    batches = [post for post in rpc_stub.posts if post[0][0] == "eth_getBlockByNumber"]
+    assert len(batches) == 1
+    assert sorted(int(params[0], 16) for _, params in batches[0]) == [20, 35, 90]
+    utc = {r["block"]: r["utc"] for r in found}
+    assert utc["35"] == time.strftime("%Y-%m-%d %H:%M:%S", time.gmtime(block_ts(35)))
+    # Same block: higher log index first, as newest-first ordering puts it
+    assert [r["tx"] for r in found] == [_tx(4), _tx(3), _tx(2), _tx(1)]
+
+
+def test_first_deployment_per_tx_and_removed_logs_skipped(rpc_stub):
+    rpc_stub.add_log(50, _tx(1), _contract(1), log_index=0)
+    rpc_stub.add_log(50, _tx(1), _contract(2), log_index=1)
+    rpc_stub.add_log(60, _tx(2), _contract(3))["removed"] = True
+
+    found, cursor = _scan(rpc_stub, 0)
+
+    assert cursor == 60
+    assert [(r["tx"], r["contract"]) for r in found] == [(_tx(1), _contract(1))]
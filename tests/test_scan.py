@@ -0,0 +1,148 @@
+import pytest
+
+from app import scan
+from app.ratelimit import background
+from app.scan import ScanError, scan_created_contracts_before, scan_new_created_contracts, scan_recent_created_contracts
+from app.trace_cache import default_cache
+from bench.fixtures import FACTORY
+
+
+def _recent(stub, **kw):
+    return scan_recent_created_contracts(
+        deployer=stub.deployer, chain_id=stub.chain_id, api_base=stub.url, limit=1000, **kw
+    )
+
+
+def _created(stub):
+    return {h for h, rows in stub._internal.items() if rows}
+
+
+def test_address_mode_needs_a_sweep_address(etherscan_stub):
+    with pytest.raises(ScanError, match="SWEEP_ADDRESS"):
+        _recent(etherscan_stub, internal_mode="address")
+    assert etherscan_stub.total_calls == 0
+
+
+def test_address_mode_sweeps_the_factory(etherscan_stub, monkeypatch):
+    monkeypatch.setenv("SWEEP_ADDRESS", FACTORY)
+
+    found = _recent(etherscan_stub, internal_mode="address")
+
+    assert {r["tx"] for r in found} == _created(etherscan_stub)
+    assert etherscan_stub.calls["txlistinternal"] == etherscan_stub.calls["txlist"]  # one sweep per page
+    assert default_cache().stats()["size"] == len(found)  # only the CREATEs are cached
+
+
+def test_sweep_negatives_are_not_cached(etherscan_stub):
+    # The deployer is not the factory: its sweep sees no CREATE rows at all
+    assert _recent(etherscan_stub, internal_mode="address", sweep_address=etherscan_stub.deployer) == []
+    assert default_cache().stats()["size"] == 0
+
+    found = _recent(etherscan_stub, internal_mode="tx")
+    assert {r["tx"] for r in found} == _created(etherscan_stub)
+
+
+def _new(stub, since, **kw):
+    return scan_new_created_contracts(since, deployer=stub.deployer, chain_id=stub.chain_id, api_base=stub.url, **kw)
+
+
+def test_held_back_blocks_are_not_reported_twice(etherscan_stub):
+    stub = etherscan_stub
+    head = stub.head
+    (a,) = stub.mine(1, create_ratio=1.0)
+    stub.mine(1, create_ratio=0.0)  # a young "no CREATE": the cursor waits before it
+    (b,) = stub.mine(1, create_ratio=1.0)
+    returned: set = set()
+
+    found, cursor = _new(stub, head, returned=returned)
+    assert [r["tx"] for r in found] == [b, a]
+    assert cursor == head + 1
+    assert returned == {b}
+
+    assert _new(stub, cursor, returned=returned) == ([], head + 1)
+    (c,) = stub.mine(1, create_ratio=1.0)
+    found, _ = _new(stub, cursor, returned=returned)
+    assert [r["tx"] for r in found] == [c]
+
+    # Without the set, the re-read block is reported again
+    assert [r["tx"] for r in _new(stub, cursor)[0]] == [c, b]
+
+
+def test_full_last_page_is_not_reported_twice(etherscan_stub):
+    stub = etherscan_stub
+    head = stub.head
+    (a,) = stub.mine(1, create_ratio=1.0)
+    b, c = stub.mine(2, create_ratio=1.0)
+    returned: set = set()
+
+    found, cursor = _new(stub, head, returned=returned, page_size=2, max_pages=1)
+    assert [r["tx"] for r in found] == [b, a]
+    assert cursor == head + 1  # the page ended inside block head + 2
+
+    found, cursor = _new(stub, cursor, returned=returned)
+    assert [r["tx"] for r in found] == [c]
+    assert cursor == head + 2
+    assert returned == set()
+
+
+def test_refresh_reuses_cached_creates_at_their_current_block(etherscan_stub):
+    stub = etherscan_stub
+    head = stub.head
+    a, b = stub.mine(2, create_ratio=1.0)
+    found, _ = _new(stub, head)
+    lookups = stub.calls["txlistinternal"]
+    # As if first seen in another block before a reorg moved it
+    stale = next(r for r in found if r["tx"] == a)
+    default_cache().put(stub.chain_id, a, {**stale, "block": "1"})
+
+    again, _ = _new(stub, head, end_block=head + 1, refresh=True)
+
+    assert {r["tx"]: r["block"] for r in again} == {a: str(head + 1), b: str(head + 1)}
+    assert stub.calls["txlistinternal"] == lookups  # nothing looked up again
+
+
+def test_bounded_range_is_read_to_its_end(etherscan_stub):
+    stub = etherscan_stub
+    head = stub.head
+    stub.mine(1, create_ratio=1.0)
+    stub.reorg(1)  # the block is gone; nothing left in the range
+    stub.mine(0)
+
+    assert _new(stub, head, end_block=head + 2, refresh=True) == ([], head + 2)
+
+
+def _backfill(stub, before, **kw):
+    """Walk scan_created_contracts_before down from `before` to the first tx; returns every step's results."""
+    found, step = [], (before, 0)
+    while step is not None:
+        rows, step = scan_created_contracts_before(
+            step[0], deployer=stub.deployer, chain_id=stub.chain_id, api_base=stub.url, skip=step[1], **kw
+        )
+        found.extend(r["tx"] for r in rows)
+    return found
+
+
+def test_backfill_steps_resume_where_the_last_one_stopped(etherscan_stub):
+    stub = etherscan_stub
+    stub.mine(20, create_ratio=0.5)  # one block spanning several pages
+    everything = _backfill(stub, stub.head, page_size=1000)
+    lookups = stub.calls["txlistinternal"]
+    default_cache().clear()
+
+    with background():  # as the app's backfill runs: one lookup at a time
+        found = _backfill(stub, stub.head, page_size=7, limit=2)
+
+    assert found == everything  # newest first, no step repeating an earlier one
+    assert set(found) == _created(stub)
+    assert stub.calls["txlistinternal"] == 2 * lookups  # each tx looked up once more, not per step
+
+
+def test_backfill_finishes_an_oversized_block_oldest_first(etherscan_stub, monkeypatch):
+    monkeypatch.setattr(scan, "_TXLIST_CAP", 10)
+    stub = etherscan_stub
+    big = stub.mine(14, create_ratio=1.0)
+
+    found = _backfill(stub, stub.head, page_size=4, limit=3)
+
+    assert set(big) <= set(found)  # read from both ends, nothing skipped
+    assert set(found) == _created(stub)
@@ -0,0 +1,48 @@
+import runpy
+from pathlib import Path
+from types import SimpleNamespace
+
+import pytest
+
+from app.shared import _default_path
+
+CONF = str(Path(__file__).resolve().parent.parent / "gunicorn.conf.py")
+
+
+@pytest.fixture
+def env(monkeypatch):
+    for name in ("SHARED_STATE_FILE", "WEB_CONCURRENCY", "GUNICORN_THREADS", "SERVER_SOFTWARE", "PORT"):
+        monkeypatch.setenv(name, "")  # recorded, so what on_starting exports is undone too
+        monkeypatch.delenv(name)
+    return monkeypatch
+
+
+def _gunicorn(workers: int, threads: int = 64) -> None:
+    """Run the config's master hook as gunicorn -w `workers` would."""
+    conf = runpy.run_path(CONF)
+    conf["on_starting"](SimpleNamespace(cfg=SimpleNamespace(workers=workers, threads=threads)))
+
+
+def test_one_worker_unless_the_lease_file_is_set(env):
+    assert runpy.run_path(CONF)["workers"] == 1
+    env.setenv("SHARED_STATE_FILE", "/tmp/shared.db")
+    assert runpy.run_path(CONF)["workers"] == 4
+    env.setenv("WEB_CONCURRENCY", "2")
+    assert runpy.run_path(CONF)["workers"] == 2
+
+
+def test_coordination_follows_gunicorns_worker_count(env):
+    env.setenv("SERVER_SOFTWARE", "gunicorn/21.2.0")
+    _gunicorn(workers=4, threads=8)  # e.g. gunicorn -c gunicorn.conf.py -w 4, nothing exported
+    assert _default_path().endswith("contract-scanner-shared.db")
+
+    _gunicorn(workers=1)
+    assert _default_path() == ""
+
+
+def test_gunicorn_without_the_config_coordinates(env):
+    assert _default_path() == ""  # not under gunicorn: always leads
+    env.setenv("SERVER_SOFTWARE", "gunicorn/21.2.0")
+    assert _default_path().endswith("contract-scanner-shared.db")
+    env.setenv("SHARED_STATE_FILE", "")
+    assert _default_path() == ""  # turned off explicitly
@@ -0,0 +1,142 @@
+import threading
+import time
+
+from app.stream import LogStream
+from tests.rpc_stub import FACTORY, TOPIC, block_ts
+from tests.test_rpc import _contract, _tx
+
+
+def _wait_until(pred, timeout: float = 10.0) -> bool:
+    deadline = time.time() + timeout
+    while time.time() < deadline:
+        if pred():
+            return True
+        time.sleep(0.05)
+    return pred()
+
+
+def _log(block: int, n: int):
+    """A factory log shaped like the RPC stub's, for pushing without a node behind it."""
+    return {
+        "address": FACTORY,
+        "topics": [TOPIC, "0x" + "0" * 24 + _contract(n)[2:]],
+        "data": "0x",
+        "blockNumber": hex(block),
+        "transactionHash": _tx(n),
+        "logIndex": "0x0",
+        "removed": False,
+    }
+
+
+def test_stream_reports_pushes_and_refills_after_reconnect(ws_stub):
+    connects, heads, found = [], [], []
+    stop = threading.Event()
+    stream = LogStream(
+        ws_stub.url,
+        FACTORY,
+        TOPIC,
+        "topic:1",
+        on_connect=lambda: connects.append(time.time()),
+        on_head=heads.append,
+        on_found=found.extend,
+        stop_event=stop,
+        name="stream-test",
+    )
+    stream.start()
+    try:
+        assert ws_stub.wait_subscribed(1)
+        ws_stub.push_head(10, block_ts(10))
+        ws_stub.push_log(_log(10, 1))
+        assert _wait_until(lambda: len(found) == 1)
+        assert found[0] == {
+            "contract": _contract(1),
+            "tx": _tx(1),
+            "block": "10",
+            "utc": time.strftime("%Y-%m-%d %H:%M:%S", time.gmtime(block_ts(10))),  # from the pushed head
+        }
+        assert heads == [9]  # a head only vouches for the blocks before it
+
+        removed = _log(11, 2)
+        removed["removed"] = True
+        ws_stub.push_log(removed)
+
+        ws_stub.drop()
+        assert ws_stub.wait_subscribed(2)  # back after the 1s backoff
+        assert _wait_until(lambda: len(connects) == 2)  # gap fill runs on every connect
+        ws_stub.push_log(_log(12, 3))
+        assert _wait_until(lambda: len(found) == 2)
+        assert [r["tx"] for r in found] == [_tx(1), _tx(3)]
+        assert stream.stats()["connected"] and stream.stats()["reconnects"] == 1
+    finally:
+        stop.set()
+        ws_stub.drop()
+
+
+def _app_env(monkeypatch, rpc_stub, ws_stub, tmp_path) -> None:
+    for name, value in {
+        "SCAN_BACKEND": "rpc",
+        "RPC_URL": rpc_stub.url,
+        "RPC_WS_URL": ws_stub.url,
+        "RPC_EVENT_TOPIC": TOPIC,
+        "DEPLOYER": FACTORY,
+        "SCAN_INTERVAL_SECONDS": "3600",
+        "EVENTS_FILE": "",
+        "SHARED_STATE_FILE": "",
+        "TRACE_CACHE_FILE": "",
+        "CURSOR_FILE": str(tmp_path / "cursors.json"),
+        "NOTIFY_SPOOL_FILE": str(tmp_path / "spool.json"),
+    }.items():
+        monkeypatch.setenv(name, value)
+    for name in ("WATCHLIST", "WATCHLIST_FILE", "RPC_FACTORY", "CONFIRMATIONS", "WEB_CONCURRENCY"):
+        monkeypatch.delenv(name, raising=False)
+
+
+def test_app_fills_the_gap_after_a_disconnect(rpc_stub, ws_stub, monkeypatch, tmp_path, make_app):
+    _app_env(monkeypatch, rpc_stub, ws_stub, tmp_path)
+    client = make_app().test_client()
+
+    def history():
+        return [r["tx"] for r in client.get("/api/latest").get_json()["history"]]
+
+    # First connect: the gap fill bootstraps from an empty chain
+    assert ws_stub.wait_subscribed(1)
+    assert _wait_until(lambda: (client.get("/api/status").get_json() or {}).get("runs", 0) >= 1)
+
+    # A arrives by push (the node has it too)
+    ws_stub.push_log(rpc_stub.add_log(10, _tx(1), _contract(1)))
+    ws_stub.push_head(11, block_ts(11))
+    rpc_stub.mine()
+    assert _wait_until(lambda: history() == [_tx(1)])
+
+    # B and C land while the socket is down: only polling can see them
+    ws_stub.drop()
+    rpc_stub.add_log(12, _tx(2), _contract(2))
+    rpc_stub.add_log(13, _tx(3), _contract(3))
+    assert ws_stub.wait_subscribed(2)
+    assert _wait_until(lambda: history() == [_tx(3), _tx(2), _tx(1)])
+
+    # D arrives by push again on the new connection
+    ws_stub.push_log(rpc_stub.add_log(14, _tx(4), _contract(4)))
+    ws_stub.push_head(15, block_ts(15))
+    assert _wait_until(lambda: history() == [_tx(4), _tx(3), _tx(2), _tx(1)])
+
+    events = client.get("/api/stream?poll=1&since=0").get_json()["events"]
+    deployed = [e["data"]["tx"] for e in events if e["event"] == "deployment"]
+    assert deployed == [_tx(1), _tx(2), _tx(3), _tx(4)]  # each once, oldest first
+
+
+def test_stopped_app_leaves_no_threads(rpc_stub, ws_stub, monkeypatch, tmp_path, make_app):
+    _app_env(monkeypatch, rpc_stub, ws_stub, tmp_path)
+    before = set(threading.enumerate())
+    app = make_app()
+    assert ws_stub.wait_subscribed(1)
+    assert _wait_until(lambda: (app.test_client().get("/api/status").get_json() or {}).get("runs", 0) >= 1)
+    started = [
+        t for t in set(threading.enumerate()) - before
+        if t.name.startswith(("scan", "coordinator", "stream-", "backfill-", "notify-", "events-"))
+    ]
+    assert {"scanner", "stream-8453", "notify-0"} <= {t.name for t in started}
+
+    app.extensions["scanner_stop"]()
+
+    assert [t.name for t in started if t.is_alive()] == []
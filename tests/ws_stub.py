@@ -0,0 +1,180 @@
+"""Fake eth_subscribe WebSocket server for app.stream (stdlib only).
+
+Speaks just enough RFC 6455 for websocket-client: the upgrade handshake,
+masked client text frames, unmasked server text frames, ping and close.
+Answers eth_subscribe for newHeads and logs, then pushes whatever the test
+hands to push_head() / push_log() to every subscribed connection. drop()
+cuts all connections without a close frame, as a node restart or a network
+blip would; the listener stays up, so the client can reconnect.
+"""
+
+import base64
+import hashlib
+import json
+import socket
+import struct
+import threading
+from typing import Any, Dict, List, Optional
+
+_GUID = "258EAFA5-E914-47DA-95CA-C5AB0DC85B11"
+
+
+def _recv_exact(conn: socket.socket, n: int) -> bytes:
+    buf = b""
+    while len(buf) < n:
+        chunk = conn.recv(n - len(buf))
+        if not chunk:
+            raise ConnectionError("peer closed")
+        buf += chunk
+    return buf
+
+
+def _send_frame(conn: socket.socket, payload: bytes, opcode: int = 0x1) -> None:
+    n = len(payload)
+    if n < 126:
+        header = struct.pack("!BB", 0x80 | opcode, n)
+    elif n < 1 << 16:
+        header = struct.pack("!BBH", 0x80 | opcode, 126, n)
+    else:
+        header = struct.pack("!BBQ", 0x80 | opcode, 127, n)
+    conn.sendall(header + payload)
+
+
+def _recv_frame(conn: socket.socket):
+    b0, b1 = _recv_exact(conn, 2)
+    n = b1 & 0x7F
+    if n == 126:
+        n = struct.unpack("!H", _recv_exact(conn, 2))[0]
+    elif n == 127:
+        n = struct.unpack("!Q", _recv_exact(conn, 8))[0]
+    mask = _recv_exact(conn, 4) if b1 & 0x80 else b"\0\0\0\0"
+    data = bytes(c ^ mask[i % 4] for i, c in enumerate(_recv_exact(conn, n)))
+    return b0 & 0x0F, data
+
+
+class FakeWSServer:
+    def __init__(self) -> None:
+        self.connections = 0  # handshakes completed so far
+        self._subs: List[Dict[str, Any]] = []  # live connections: {"conn", "newHeads", "logs"}
+        self._cond = threading.Condition()
+        self._sock: Optional[socket.socket] = None
+        self.url = ""
+
+    def start(self) -> str:
+        self._sock = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+        self._sock.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+        self._sock.bind(("127.0.0.1", 0))
+        self._sock.listen(8)
+        threading.Thread(target=self._accept, name="ws-stub", daemon=True).start()
+        self.url = f"ws://127.0.0.1:{self._sock.getsockname()[1]}"
+        return self.url
+
+    def stop(self) -> None:
+        self.drop()
+        if self._sock is not None:
+            self._sock.close()
+            self._sock = None
+
+    def wait_subscribed(self, connections: int, timeout: float = 10.0) -> bool:
+        """Wait until the `connections`-th connection has both subscriptions."""
+        with self._cond:
+            return self._cond.wait_for(
+                lambda: self.connections >= connections and any("logs" in s and "newHeads" in s for s in self._subs),
+                timeout,
+            )
+
+    # --- pushes ---
+
+    def push_head(self, number: int, timestamp: int) -> None:
+        self._push("newHeads", {"number": hex(number), "timestamp": hex(timestamp)})
+
+    def push_log(self, log: Dict[str, Any]) -> None:
+        self._push("logs", log)
+
+    def drop(self) -> None:
+        with self._cond:
+            subs, self._subs = self._subs, []
+        for s in subs:
+            try:
+                s["conn"].shutdown(socket.SHUT_RDWR)
+            except OSError:
+                pass
+            s["conn"].close()
+
+    def _push(self, kind: str, result: Dict[str, Any]) -> None:
+        with self._cond:
+            subs = [s for s in self._subs if kind in s]
+        for s in subs:
+            msg = {"jsonrpc": "2.0", "method": "eth_subscription", "params": {"subscription": s[kind], "result": result}}
+            try:
+                _send_frame(s["conn"], json.dumps(msg).encode())
+            except OSError:
+                pass
+
+    # --- server side ---
+
+    def _accept(self) -> None:
+        while self._sock is not None:
+            try:
+                conn, _ = self._sock.accept()
+            except OSError:
+                return
+            threading.Thread(target=self._serve, args=(conn,), name="ws-stub-conn", daemon=True).start()
+
+    def _handshake(self, conn: socket.socket) -> None:
+        request = b""
+        while b"\r\n\r\n" not in request:
+            chunk = conn.recv(4096)
+            if not chunk:
+                raise ConnectionError("closed during handshake")
+            request += chunk
+        key = ""
+        for line in request.decode("latin-1").split("\r\n")[1:]:
+            name, _, value = line.partition(":")
+            if name.strip().lower() == "sec-websocket-key":
+                key = value.strip()
+        accept = base64.b64encode(hashlib.sha1((key + _GUID).encode()).digest()).decode()
+        conn.sendall(
+            (
+                "HTTP/1.1 101 Switching Protocols\r\n"
+                "Upgrade: websocket\r\n"
+                "Connection: Upgrade\r\n"
+                f"Sec-WebSocket-Accept: {accept}\r\n\r\n"
+            ).encode()
+        )
+
+    def _serve(self, conn: socket.socket) -> None:
+        entry: Dict[str, Any] = {"conn": conn}
+        try:
+            self._handshake(conn)
+            with self._cond:
+                self.connections += 1
+                n = self.connections
+                self._subs.append(entry)
+                self._cond.notify_all()
+            while True:
+                opcode, data = _recv_frame(conn)
+                if opcode == 0x8:  # close
+                    _send_frame(conn, b"", 0x8)
+                    return
+                if opcode == 0x9:  # ping
+                    _send_frame(conn, data, 0xA)
+                    continue
+                if opcode != 0x1:
+                    continue
+                req = json.loads(data)
+                if req.get("method") != "eth_subscribe":
+                    continue
+                kind = req["params"][0]
+                sub_id = f"0x{n:x}{len(entry)}"
+                _send_frame(conn, json.dumps({"jsonrpc": "2.0", "id": req["id"], "result": sub_id}).encode())
+                with self._cond:
+                    entry[kind] = sub_id
+                    self._cond.notify_all()
+        except (OSError, ConnectionError, ValueError):
+            pass
+        finally:
+            with self._cond:
+                if entry in self._subs:
+                    self._subs.remove(entry)
+            conn.close()